@@ -4,19 +4,19 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.database import get_db
 from app.models.user import User, UserRole
+from app.core.principals import Principal, load_principal
 from app.core.security import decode_access_token
 
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user_optional(
+async def get_current_principal_optional(
     db: Annotated[AsyncSession, Depends(get_db)],
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-) -> User | None:
+) -> Principal | None:
     if not credentials:
         return None
     payload = decode_access_token(credentials.credentials)
@@ -25,8 +25,32 @@ async def get_current_user_optional(
     user_id = payload.get("sub")
     if not user_id:
         return None
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    principal = await load_principal(db, int(user_id))
+    if principal is None or not principal.is_active:
+        return None
+    return principal
+
+
+async def get_current_principal(
+    principal: Annotated[Principal | None, Depends(get_current_principal_optional)],
+) -> Principal:
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+# Full ORM user, for endpoints that read or modify profile fields beyond the cached principal
+async def get_current_user_optional(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    principal: Annotated[Principal | None, Depends(get_current_principal_optional)],
+) -> User | None:
+    if principal is None:
+        return None
+    user = await db.get(User, principal.id)
     if not user or not user.is_active:
         return None
     return user
@@ -44,8 +68,8 @@ async def get_current_user(user: Annotated[User | None, Depends(get_current_user
 
 def require_role(role: UserRole):
     async def _require_role(
-        current_user: Annotated[User, Depends(get_current_user)],
-    ) -> User:
+        current_user: Annotated[Principal, Depends(get_current_principal)],
+    ) -> Principal:
         if current_user.role != role:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return current_user
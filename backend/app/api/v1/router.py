@@ -1,11 +1,14 @@
 """Aggregate all v1 API routers."""
 from fastapi import APIRouter
 
-from app.api.v1.routers import auth, users, blog, settings, notifications
+from app.api.v1.routers import auth, users, blog, exports, feeds, settings, notifications
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="")
 api_router.include_router(users.router, prefix="")
+# Before blog: /blog/{post_id} would otherwise claim /blog/feed.xml
+api_router.include_router(feeds.router, prefix="")
 api_router.include_router(blog.router, prefix="")
 api_router.include_router(settings.router, prefix="")
-api_router.include_router(notifications.router, prefix="")
\ No newline at end of file
+api_router.include_router(notifications.router, prefix="")
+api_router.include_router(exports.router, prefix="")
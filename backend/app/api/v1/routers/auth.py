@@ -1,9 +1,11 @@
 """Auth endpoints: login, signup, Google, verify email, refresh."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
+from app.core.conditional import PRIVATE_REVALIDATE, conditional_response, make_etag
+from app.core.rate_limit import client_address, login_throttle
 from app.models.user import User
 from app.schemas.auth import LoginRequest, SignupRequest, TokenResponse, VerifyEmailRequest, GoogleAuthRequest
 from app.schemas.user import UserResponse
@@ -15,11 +17,22 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/login", response_model=TokenResponse)
 async def login(
     data: LoginRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
+    client_ip = client_address(request)
+    retry_after = login_throttle.check(data.email, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
     user = await auth_service.login(db, data)
     if not user:
+        login_throttle.record_failure(data.email, client_ip)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
+    login_throttle.record_success(data.email, client_ip)
     return auth_service.tokens_for_user(user)
 
 
@@ -59,8 +72,15 @@ async def refresh(data: RefreshRequest):
 
 
 @router.get("/me", response_model=UserResponse)
-async def me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def me(request: Request, current_user: User = Depends(get_current_user)):
+    return conditional_response(
+        request,
+        make_etag("users", current_user.id, current_user.updated_at),
+        lambda: UserResponse.model_validate(current_user).model_dump_json().encode(),
+        last_modified=current_user.updated_at,
+        cache_control=PRIVATE_REVALIDATE,
+        vary="Authorization",
+    )
 
 
 # Google: exchange code for tokens then create/update user (frontend sends id_token or code)
@@ -69,41 +89,25 @@ async def google_auth(
     data: GoogleAuthRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    import httpx
     from app.config import get_settings
+    from app.core import google
     settings = get_settings()
     if not settings.google_client_id or not settings.google_client_secret:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Google auth not configured")
 
     id_token = data.id_token
     if data.code and not id_token:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": data.code,
-                    "client_id": settings.google_client_id,
-                    "client_secret": settings.google_client_secret,
-                    "redirect_uri": settings.google_redirect_uri or f"{settings.frontend_url}/auth/callback",
-                    "grant_type": "authorization_code",
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            if r.status_code != 200:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Google token exchange failed")
-            id_token = r.json().get("id_token")
+        id_token = await google.exchange_code(data.code)
+        if not id_token:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Google token exchange failed")
 
     if not id_token:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="id_token or code required")
 
-    async with httpx.AsyncClient() as client:
-        r = await client.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"id_token": id_token},
-        )
-        if r.status_code != 200:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Google token")
-        claims = r.json()
+    try:
+        claims = await google.verifier.verify(id_token)
+    except google.GoogleTokenError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Google token")
     email = claims.get("email")
     sub = claims.get("sub")
     name = (claims.get("name") or "").strip()
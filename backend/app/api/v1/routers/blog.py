@@ -1,72 +1,190 @@
 """Blog: public list/detail + admin CRUD."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user_optional, get_current_user, RequireAdmin
-from app.models.user import User
-from app.schemas.blog import BlogPostCreate, BlogPostUpdate, BlogPostResponse, BlogPostListResponse
-from app.services import blog_service
+from app.core.principals import Principal
+from app.core.conditional import conditional_response
+from app.core.pagination import Page
+from app.core.response_cache import CachedResponse, request_key, response_cache
+from app.models.blog import BlogPost
+from app.schemas.blog import (
+    BlogPostCreate,
+    BlogPostDiffResponse,
+    BlogPostListResponse,
+    BlogPostResponse,
+    BlogPostRevisionListResponse,
+    BlogPostRevisionResponse,
+    BlogPostUpdate,
+    BlogPostVersionResponse,
+)
+from app.services import blog_cache, blog_service, revision_service
 
 router = APIRouter(prefix="/blog", tags=["blog"])
 
 
+def _cached_post_response(request: Request, cached: CachedResponse) -> Response:
+    return conditional_response(request, cached.meta["etag"], cached.body, last_modified=cached.meta["last_modified"])
+
+
+def _post_response(request: Request, key: str, post: BlogPost, generation: int) -> Response:
+    # A matching validator answers 304 before the post is serialized or cached
+    return conditional_response(
+        request,
+        blog_cache.post_etag(post),
+        lambda: blog_cache.cache_post(key, post, generation).body,
+        last_modified=post.updated_at,
+    )
+
+
 @router.get("", response_model=BlogPostListResponse)
 async def list_posts(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: str | None = Query(None),
     public_only: bool = Query(True),
+    after: str | None = Query(None, description="Cursor: page of posts older than this one"),
+    before: str | None = Query(None, description="Cursor: page of posts newer than this one"),
+    include_total: bool = Query(True),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary omits content"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,title,slug"),
+):
+    key = request_key(
+        request,
+        skip=skip,
+        limit=limit,
+        search=search,
+        public_only=public_only,
+        after=after,
+        before=before,
+        include_total=include_total,
+        total_mode=total_mode,
+        view=view,
+        fields=fields,
+    )
+    cached = response_cache.get(key)
+    if cached:
+        return conditional_response(request, cached.meta["etag"], cached.body)
+    generation = response_cache.generation()
+    selected = blog_cache.select_fields(view, fields)
+    page = await blog_service.list_posts(
+        db,
+        skip=skip,
+        limit=limit,
+        search=search,
+        public_only=public_only,
+        after=after,
+        before=before,
+        total_mode=total_mode if include_total else "none",
+        fields=selected,
+    )
+    entry = blog_cache.cache_list(key, page, search, selected, generation)
+    return conditional_response(request, entry.meta["etag"], entry.body)
+
+
+@router.get("/trending", response_model=BlogPostListResponse)
+async def trending_posts(
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(10, ge=1, le=50),
 ):
-    if public_only:
-        items, total = await blog_service.list_posts(db, skip=skip, limit=limit, search=search, public_only=True)
-    else:
-        items, total = await blog_service.list_posts(db, skip=skip, limit=limit, search=search, public_only=False)
-    return BlogPostListResponse(items=[BlogPostResponse.model_validate(p) for p in items], total=total)
+    """Most viewed published posts, with older views counting for less (see TRENDING_HALF_LIFE_HOURS)."""
+    posts = await blog_service.trending_posts(db, limit=limit, fields=blog_cache.SUMMARY_FIELDS)
+    return blog_cache.list_response(Page(items=posts, total=None), None, blog_cache.SUMMARY_FIELDS)
 
 
 @router.get("/slug/{slug}", response_model=BlogPostResponse)
 async def get_post_by_slug(
     slug: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
+    key = request_key(request)
+    cached = response_cache.get(key)
+    if cached:
+        blog_service.record_view(cached.meta["post_id"])
+        return _cached_post_response(request, cached)
+    generation = response_cache.generation()
     post = await blog_service.get_post_by_slug(db, slug, public_only=True)
     if not post:
+        current = await blog_service.get_current_slug(db, slug, public_only=True)
+        if current:
+            url = request.url.replace(path=request.url.path.removesuffix(slug) + current)
+            return RedirectResponse(str(url), status_code=status.HTTP_301_MOVED_PERMANENTLY)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     await blog_service.increment_view_count(db, post)
-    return post
+    return _post_response(request, key, post, generation)
 
 
 @router.get("/{post_id}", response_model=BlogPostResponse)
 async def get_post(
     post_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
+    key = request_key(request)
+    cached = response_cache.get(key)
+    if cached:
+        blog_service.record_view(post_id)
+        return _cached_post_response(request, cached)
+    generation = response_cache.generation()
     post = await blog_service.get_post_by_id(db, post_id, public_only=True)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     await blog_service.increment_view_count(db, post)
-    return post
+    return _post_response(request, key, post, generation)
+
+
+@router.get("/{post_id}/related", response_model=BlogPostListResponse)
+async def related_posts(
+    post_id: int,
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(5, ge=1, le=20),
+):
+    posts = await blog_service.related_posts(db, post_id, limit=limit, fields=blog_cache.SUMMARY_FIELDS)
+    if posts is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+    return blog_cache.list_response(Page(items=posts, total=None), None, blog_cache.SUMMARY_FIELDS)
 
 
 # Admin only (more specific route first so "/admin/list" is not captured as post_id)
 @router.get("/admin/list", response_model=BlogPostListResponse)
 async def admin_list_posts(
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=500),
     search: str | None = Query(None),
+    after: str | None = Query(None),
+    before: str | None = Query(None),
+    include_total: bool = Query(True),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: str | None = Query(None),
 ):
-    items, total = await blog_service.list_posts(db, skip=skip, limit=limit, search=search, public_only=False)
-    return BlogPostListResponse(items=[BlogPostResponse.model_validate(p) for p in items], total=total)
+    selected = blog_cache.select_fields(view, fields)
+    page = await blog_service.list_posts(
+        db,
+        skip=skip,
+        limit=limit,
+        search=search,
+        public_only=False,
+        after=after,
+        before=before,
+        total_mode=total_mode if include_total else "none",
+        fields=selected,
+    )
+    return blog_cache.list_response(page, search, selected)
 
 
 @router.get("/admin/{post_id}", response_model=BlogPostResponse)
 async def admin_get_post(
     post_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
     post = await blog_service.get_post_by_id(db, post_id, public_only=False)
     if not post:
@@ -74,11 +192,59 @@ async def admin_get_post(
     return post
 
 
+@router.get("/admin/{post_id}/revisions", response_model=BlogPostRevisionListResponse)
+async def list_revisions(
+    post_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+):
+    rows = await revision_service.list_revisions(db, post_id)
+    return BlogPostRevisionListResponse(
+        items=[BlogPostRevisionResponse.model_validate(r) for r in rows],
+        stored_bytes=sum(r.stored_size for r in rows),
+        full_copy_bytes=sum(r.content_size for r in rows),
+    )
+
+
+@router.get("/admin/{post_id}/revisions/{number}", response_model=BlogPostVersionResponse)
+async def get_revision(
+    post_id: int,
+    number: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+):
+    version = await revision_service.get_version(db, post_id, number)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revision not found")
+    return BlogPostVersionResponse(number=version.number, title=version.title, content=version.content)
+
+
+@router.get("/admin/{post_id}/diff", response_model=BlogPostDiffResponse)
+async def diff_revisions(
+    post_id: int,
+    from_number: int = Query(..., alias="from", ge=1),
+    to_number: int = Query(..., alias="to", ge=1),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+):
+    old = await revision_service.get_version(db, post_id, from_number)
+    new = await revision_service.get_version(db, post_id, to_number)
+    if not old or not new:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Revision not found")
+    return BlogPostDiffResponse(
+        from_number=old.number,
+        to_number=new.number,
+        from_title=old.title,
+        to_title=new.title,
+        diff=revision_service.diff(old, new),
+    )
+
+
 @router.post("", response_model=BlogPostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     data: BlogPostCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
     return await blog_service.create_post(db, data, current_user.id)
 
@@ -88,21 +254,19 @@ async def update_post(
     post_id: int,
     data: BlogPostUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
-    post = await blog_service.get_post_by_id(db, post_id, public_only=False)
+    # Locked: concurrent edits then number their revisions in turn, each diffed against the one before
+    post = await blog_service.get_post_by_id(db, post_id, public_only=False, for_update=True)
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    return await blog_service.update_post(db, post, data)
+    return await blog_service.update_post(db, post, data, editor_id=current_user.id)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(
     post_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
-    from sqlalchemy import delete
-    from app.models.blog import BlogPost
-    await db.execute(delete(BlogPost).where(BlogPost.id == post_id))
-    await db.flush()
+    await blog_service.delete_post(db, post_id)
@@ -0,0 +1,70 @@
+"""Public feeds: RSS, Atom and sitemap, streamed and cached until the next blog write."""
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.conditional import conditional_response, is_not_modified, make_etag, validator_headers
+from app.core.response_cache import request_key, response_cache
+from app.services import blog_cache, feeds
+
+router = APIRouter(tags=["feeds"])
+
+RSS = "application/rss+xml"
+ATOM = "application/atom+xml"
+SITEMAP = "application/xml"
+
+
+async def _encode_and_cache(key: str, chunks: AsyncIterator[str], meta: dict, generation: int) -> AsyncIterator[bytes]:
+    """Stream the document, keeping a copy for the cache only while it stays small enough to be cached."""
+    limit = response_cache.max_bytes // 4
+    parts: list[bytes] | None = []
+    size = 0
+    async for chunk in chunks:
+        data = chunk.encode()
+        yield data
+        if parts is not None:
+            size += len(data)
+            if size > limit:
+                parts = None
+            else:
+                parts.append(data)
+    # Stored under the version read before the build: a write committed meanwhile (in any worker) changes the
+    # version, so the next request rebuilds instead of serving this copy
+    if parts is not None:
+        response_cache.set(key, b"".join(parts), {blog_cache.LIST_TAG}, meta=meta, generation=generation)
+
+
+async def _serve(request: Request, build: Callable[[datetime], AsyncIterator[str]], media_type: str) -> Response:
+    key = request_key(request)
+    # One version query per request: it validates both the client's copy and ours, since a write handled by
+    # another worker does not invalidate this process's cache
+    version, changed_at = await blog_cache.version()
+    etag = make_etag(version, key)
+    if is_not_modified(request, etag, changed_at):
+        return conditional_response(request, etag, b"", last_modified=changed_at, media_type=media_type)
+    cached = response_cache.get(key)
+    if cached and cached.meta["version"] == version:
+        return conditional_response(request, etag, cached.body, last_modified=changed_at, media_type=media_type)
+    meta = {"version": version, "etag": etag, "last_modified": changed_at}
+    return StreamingResponse(
+        _encode_and_cache(key, build(changed_at), meta, response_cache.generation()),
+        media_type=media_type,
+        headers=validator_headers(etag, changed_at),
+    )
+
+
+@router.get("/blog/feed.xml", response_class=Response)
+async def rss_feed(request: Request):
+    return await _serve(request, lambda changed_at: feeds.rss(), RSS)
+
+
+@router.get("/blog/atom.xml", response_class=Response)
+async def atom_feed(request: Request):
+    return await _serve(request, feeds.atom, ATOM)
+
+
+@router.get("/sitemap.xml", response_class=Response)
+async def sitemap(request: Request):
+    return await _serve(request, lambda changed_at: feeds.sitemap(), SITEMAP)
@@ -1,27 +1,64 @@
 """User notifications (list, mark read)."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
-from app.models.user import User
-from app.schemas.notification import NotificationResponse, NotificationUpdate
-from app.services import notification_service
+from app.api.deps import get_db, get_current_principal, get_current_principal_optional
+from app.config import get_settings
+from app.core.conditional import PRIVATE_REVALIDATE, conditional_response, make_etag
+from app.core.principals import Principal
+from app.core.security import create_stream_ticket, decode_token
+from app.schemas.notification import BroadcastCreate, BroadcastResponse, NotificationResponse, NotificationUpdate
+from app.services import broadcast_service, notification_service, notification_stream
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+settings = get_settings()
+
+_notification_list = TypeAdapter(list[NotificationResponse])
+
 
 @router.get("", response_model=list[NotificationResponse])
 async def list_my_notifications(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     unread_only: bool = Query(False),
+    after: str | None = Query(None, description="Cursor: notifications older than this one"),
+    before: str | None = Query(None, description="Cursor: notifications newer than this one"),
+    include_total: bool = Query(False, description="Return the total in X-Total-Count"),
 ):
-    items, _ = await notification_service.list_notifications(
-        db, current_user.id, skip=skip, limit=limit, unread_only=unread_only
+    page = await notification_service.list_notifications(
+        db,
+        current_user.id,
+        skip=skip,
+        limit=limit,
+        unread_only=unread_only,
+        after=after,
+        before=before,
+        total_mode="exact" if include_total else "none",
+    )
+    # The body stays a plain list for compatibility; paging metadata travels in headers
+    headers = {"X-Has-More": "true" if page.has_more else "false"}
+    if page.total is not None:
+        headers["X-Total-Count"] = str(page.total)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        headers["X-Prev-Cursor"] = page.prev_cursor
+    # Notifications are immutable apart from is_read, so ids and read flags version the page
+    etag = make_etag("notifications", current_user.id, page.total, [(n.id, n.is_read) for n in page.items])
+    return conditional_response(
+        request,
+        etag,
+        lambda: _notification_list.dump_json([NotificationResponse.model_validate(n) for n in page.items]),
+        cache_control=PRIVATE_REVALIDATE,
+        vary="Authorization",
+        headers=headers,
     )
-    return [NotificationResponse.model_validate(n) for n in items]
 
 
 @router.patch("/{notification_id}", response_model=NotificationResponse)
@@ -29,7 +66,7 @@ async def mark_notification_read(
     notification_id: int,
     data: NotificationUpdate,
   db: AsyncSession = Depends(get_db),
-  current_user: User = Depends(get_current_user),
+  current_user: Principal = Depends(get_current_principal),
 ):
     n = await notification_service.get_notification(db, notification_id, current_user.id)
     if not n:
@@ -40,12 +77,57 @@ async def mark_notification_read(
 @router.post("/mark-all-read")
 async def mark_all_read(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     await notification_service.mark_all_read(db, current_user.id)
     return {"ok": True}
 
 
+@router.post("/stream/ticket")
+async def create_stream_ticket_route(current_user: Principal = Depends(get_current_principal)):
+    """Short-lived token for `GET /stream?ticket=...`, since EventSource cannot send an Authorization header."""
+    return {"ticket": create_stream_ticket(current_user.id), "expires_in": settings.notification_stream_ticket_seconds}
+
+
+async def _encode(chunks):
+    async for chunk in chunks:
+        yield chunk.encode()
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_notifications(
+    principal: Principal | None = Depends(get_current_principal_optional),
+    ticket: str | None = Query(None),
+    last_event_id: int | None = Query(None, description="Fallback for clients that cannot send Last-Event-ID"),
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """New notifications as Server-Sent Events; a reconnect with Last-Event-ID replays what was missed."""
+    if principal is not None:
+        user_id = principal.id
+    else:
+        payload = decode_token(ticket) if ticket else None
+        if not payload or payload.get("type") != "stream":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired stream ticket")
+        user_id = int(payload["sub"])
+        # A ticket outlives its issue; the account may have been deactivated since
+        if not await notification_stream.is_active(user_id):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired stream ticket")
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    if not notification_stream.hub.has_capacity():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open notification streams",
+            headers={"Retry-After": "30"},
+        )
+    return StreamingResponse(
+        _encode(notification_stream.events(user_id, last_event_id)),
+        media_type="text/event-stream",
+        # Proxies must not buffer or cache the stream
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 # Admin: create notification for a user
 from app.api.deps import RequireAdmin
 from pydantic import BaseModel
@@ -62,11 +144,52 @@ class CreateNotificationRequest(BaseModel):
 async def admin_create_notification(
     data: CreateNotificationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
+):
+    return await notification_service.create_notification(db, data.user_id, data.title, data.message, data.link)
+
+
+@router.post("/admin/broadcasts", response_model=BroadcastResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_broadcast(
+    data: BroadcastCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+):
+    """Send a notification to every user in the audience; runs in the background, poll the job for progress."""
+    return await broadcast_service.create_broadcast(db, data, current_user.id)
+
+
+@router.get("/admin/broadcasts", response_model=list[BroadcastResponse])
+async def list_broadcasts(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+    limit: int = Query(20, ge=1, le=100),
+):
+    return await broadcast_service.list_broadcasts(db, limit)
+
+
+@router.get("/admin/broadcasts/{broadcast_id}", response_model=BroadcastResponse)
+async def get_broadcast(
+    broadcast_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+):
+    job = await broadcast_service.get_broadcast(db, broadcast_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    return job
+
+
+@router.post("/admin/broadcasts/{broadcast_id}/cancel", response_model=BroadcastResponse)
+async def cancel_broadcast(
+    broadcast_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
 ):
-    from app.models.notification import Notification
-    n = Notification(user_id=data.user_id, title=data.title, message=data.message, link=data.link)
-    db.add(n)
-    await db.flush()
-    await db.refresh(n)
-    return n
+    if not await broadcast_service.cancel_broadcast(db, broadcast_id):
+        job = await broadcast_service.get_broadcast(db, broadcast_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Broadcast already {job.status.value}")
+    await db.commit()
+    return await broadcast_service.get_broadcast(db, broadcast_id)
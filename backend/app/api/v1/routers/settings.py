@@ -1,8 +1,10 @@
 """User and admin settings (theme, notifications, profile, app settings)."""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_principal, get_current_user
+from app.core.conditional import PRIVATE_REVALIDATE, body_etag, conditional_response
+from app.core.principals import Principal
 from app.models.user import User
 from app.schemas.setting import SettingResponse, SettingUpdate
 from app.services import setting_service
@@ -12,15 +14,19 @@ router = APIRouter(prefix="/settings", tags=["settings"])
 
 @router.get("", response_model=SettingResponse)
 async def get_my_settings(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    setting = await setting_service.get_or_create_setting(db, current_user)
+    setting = await setting_service.get_or_create_setting(db, current_user.id)
     out = SettingResponse.model_validate(setting)
     out.app_name = setting.app_name
     out.app_logo_url = setting.app_logo_url
     out.meta_description = setting.meta_description
-    return out
+    body = out.model_dump_json().encode()
+    return conditional_response(
+        request, body_etag(body), body, cache_control=PRIVATE_REVALIDATE, vary="Authorization"
+    )
 
 
 @router.patch("", response_model=SettingResponse)
@@ -29,12 +35,13 @@ async def update_my_settings(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    setting = await setting_service.get_or_create_setting(db, current_user)
+    setting = await setting_service.get_or_create_setting(db, current_user.id)
     return await setting_service.update_setting(db, current_user, setting, data)
 
 
 @router.get("/app", response_model=SettingResponse)
 async def get_app_settings_public(
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     from sqlalchemy import select
@@ -42,5 +49,8 @@ async def get_app_settings_public(
     result = await db.execute(select(UserSetting).where(UserSetting.app_name.isnot(None)).limit(1))
     row = result.scalar_one_or_none()
     if not row:
-        return SettingResponse(id=0, user_id=0, theme="light", email_notifications=True, push_notifications=True)
-    return SettingResponse.model_validate(row)
+        out = SettingResponse(id=0, user_id=0, theme="light", email_notifications=True, push_notifications=True)
+    else:
+        out = SettingResponse.model_validate(row)
+    body = out.model_dump_json().encode()
+    return conditional_response(request, body_etag(body), body)
@@ -1,13 +1,21 @@
 """Admin: user management."""
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user, RequireAdmin
-from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserUpdate, UserListResponse
-from app.services import user_service
+from app.core.principals import Principal
+from app.core.projection import parse_fields, project
+from app.schemas.user import (
+    UserCreate,
+    UserImportResponse,
+    UserListResponse,
+    UserResponse,
+    UserTypeaheadItem,
+    UserUpdate,
+)
+from app.services import user_import, user_search, user_service
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -15,20 +23,56 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("", response_model=UserListResponse)
 async def list_users(
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=500),
     search: str | None = Query(None),
+    after: str | None = Query(None, description="Cursor: page of users created before this one"),
+    before: str | None = Query(None, description="Cursor: page of users created after this one"),
+    include_total: bool = Query(True),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,email,full_name"),
 ):
-    items, total = await user_service.list_users(db, skip=skip, limit=limit, search=search)
-    return UserListResponse(items=[UserResponse.model_validate(u) for u in items], total=total)
+    selected = parse_fields(fields, UserResponse.model_fields)
+    page = await user_service.list_users(
+        db,
+        skip=skip,
+        limit=limit,
+        search=search,
+        after=after,
+        before=before,
+        total_mode=total_mode if include_total else "none",
+        fields=selected,
+    )
+    if selected is None:
+        items = [UserResponse.model_validate(u) for u in page.items]
+    else:
+        items = [project(u, selected) for u in page.items]
+    return UserListResponse(
+        items=items,
+        total=page.total,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+    )
+
+
+@router.get("/typeahead", response_model=list[UserTypeaheadItem])
+async def typeahead(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Users whose email or name starts with (or, from 3 characters, contains) `q`; index lookups only."""
+    return await user_search.typeahead(db, q, limit)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
     user = await user_service.get_user_by_id(db, user_id)
     if not user:
@@ -40,7 +84,7 @@ async def get_user(
 async def create_user(
     data: UserCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
     from sqlalchemy import select
     from app.models.user import User as UserModel
@@ -51,12 +95,47 @@ async def create_user(
     return user
 
 
+@router.post(
+    "/import",
+    response_model=UserImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_users(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = RequireAdmin,
+    format: str | None = Query(None, pattern="^(csv|ndjson)$", description="Default: from Content-Type"),
+    send_invites: bool = Query(False, description="Email each created user an invite link"),
+):
+    """Create users from a CSV (header: email,full_name,password,role) or NDJSON body, read as it streams in.
+
+    Existing and repeated emails are skipped and reported per row; each chunk of rows commits on its own.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    parse = user_import.parse_csv if format == "csv" else user_import.parse_ndjson
+    try:
+        return await user_import.import_users(
+            db, parse(request.stream()), send_invites=send_invites, inviter_name=current_user.email
+        )
+    except user_import.ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.patch("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: int,
     data: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = RequireAdmin,
+    current_user: Principal = RequireAdmin,
 ):
     user = await user_service.get_user_by_id(db, user_id)
     if not user:
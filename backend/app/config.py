@@ -2,6 +2,7 @@
 from functools import lru_cache
 from typing import Optional
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -23,6 +24,16 @@ class Settings(BaseSettings):
     mysql_password: str = ""
     mysql_database: str = "freshapp"
 
+    @model_validator(mode="after")
+    def _check_import_hashing(self) -> "Settings":
+        if self.user_import_hash_concurrency is None:
+            self.user_import_hash_concurrency = max(1, self.password_hash_workers - 1)
+        elif self.password_hash_workers > 1 and self.user_import_hash_concurrency >= self.password_hash_workers:
+            raise ValueError(
+                "user_import_hash_concurrency must be below password_hash_workers, or imports starve logins"
+            )
+        return self
+
     @property
     def database_url(self) -> str:
         return (
@@ -51,10 +62,111 @@ class Settings(BaseSettings):
     refresh_token_expire_days: int = 7
     verification_token_expire_minutes: int = 60
     invite_token_expire_minutes: int = 1440
+    verification_token_sweep_interval_seconds: int = 3600
+    verification_token_sweep_batch_size: int = 1000
+    # Verified access tokens kept in memory until they expire (0 disables)
+    token_cache_max_entries: int = 4096
+
+    # Password hashing pool: "thread" or "process"; requests beyond max_pending get a 503
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+
+    # Live notifications (SSE): "local" delivers within one process, "redis" shares events between workers
+    # (needs the redis package). Each stream buffers up to queue_size events before its client must resync.
+    notification_broker: str = "local"
+    redis_url: str = "redis://localhost:6379/0"
+    notification_stream_queue_size: int = 100
+    notification_stream_heartbeat_seconds: float = 15.0
+    notification_stream_max_connections: int = 1000
+    notification_stream_ticket_seconds: int = 60
+
+    # Notification broadcasts: users per INSERT ... SELECT chunk (each its own transaction) and the pause
+    # between chunks, which keeps a large fan-out from monopolising the database
+    broadcast_chunk_size: int = 1000
+    broadcast_pause_seconds: float = 0.05
+
+    # Admin user search: prefixes use the email and normalized-name indexes; queries of 3+ characters can
+    # match anywhere via a trigram table kept in step with user writes (off: infix matches scan the table)
+    user_search_trigrams: bool = True
+
+    # Bulk user import: rows per chunk (one dedupe query and one multi-row INSERT each) and how many
+    # password hashes an import may have in flight, leaving the rest of the pool to logins
+    # (default: one worker less than password_hash_workers; must stay below it)
+    user_import_batch_size: int = 500
+    user_import_hash_concurrency: Optional[int] = None
+
+    # Login throttling (checked before any DB query or password hash). Lockouts apply per (email, client IP) and
+    # per IP, never per email alone, so nobody can lock a victim out from elsewhere. The per-email budget across
+    # all IPs only charges failures and only applies to callers that have failed themselves.
+    login_throttle_enabled: bool = True
+    login_email_attempts_per_minute: int = 10
+    login_email_any_ip_attempts_per_minute: int = 30
+    login_ip_attempts_per_minute: int = 60
+    login_failure_window_seconds: int = 900
+    login_failure_threshold: int = 5
+    login_lockout_seconds: int = 30
+    login_lockout_max_seconds: int = 900
+    # Behind a reverse proxy: the header carrying the client address (e.g. X-Forwarded-For or X-Real-IP) and how
+    # many proxies append to it. Unset, the socket peer is the client; never set it without a proxy in front.
+    trusted_proxy_header: Optional[str] = None
+    trusted_proxy_count: int = 1
+
+    # Blog search: "auto" (MySQL FULLTEXT on MySQL, else in-process index), "mysql" or "memory"; words shorter
+    # than the server's innodb_ft_min_token_size are not in the FULLTEXT index and are matched with LIKE instead
+    search_backend: str = "auto"
+    search_min_token_size: int = 3
+
+    # List totals: write-maintained counters (re-seeded after TTL) and short-lived cached filtered counts
+    total_counter_ttl_seconds: float = 300.0
+    total_filtered_ttl_seconds: float = 30.0
+    total_cache_max_entries: int = 10000
+
+    # Blog view counts are buffered in memory and flushed in batches
+    view_count_flush_interval_seconds: float = 5.0
+    view_count_max_pending: int = 10000
+
+    # Trending posts: views decay with this half-life; only the top `capacity` posts are tracked
+    trending_half_life_hours: float = 24.0
+    trending_capacity: int = 500
+    trending_persist_interval_seconds: float = 300.0
+
+    # Related posts: neighbours kept per post, hashed TF-IDF width (2**bits columns), the share of posts above
+    # which a term is ignored as too common, and how often the index is rebuilt (dropping stale neighbours)
+    related_posts_count: int = 10
+    related_hash_bits: int = 18
+    related_max_df: float = 0.5
+    related_rebuild_interval_seconds: float = 3600.0
+
+    # Derived when a post is saved without an excerpt; list views (view=summary) show it instead of content
+    blog_excerpt_length: int = 280
+    # Newest published posts in /blog/feed.xml and /blog/atom.xml
+    blog_feed_size: int = 50
+    # Every Nth revision of a post is stored in full, bounding how many deltas a reconstruction replays
+    blog_revision_snapshot_interval: int = 20
+
+    # Blog content at rest: when enabled, content of at least this many bytes is stored compressed (existing
+    # rows are converted in the background, in batches). MySQL FULLTEXT cannot see compressed rows, so with it
+    # on, search_backend "auto" uses the in-process index.
+    blog_content_compression: bool = False
+    blog_content_compress_min_bytes: int = 2048
+    blog_content_migration_batch: int = 200
+    blog_content_migration_pause_seconds: float = 0.1
+
+    # Public blog response cache (serialized bodies, invalidated on admin writes)
+    response_cache_max_bytes: int = 32 * 1024 * 1024
+    response_cache_ttl_seconds: float = 300.0
+    response_cache_warmup_posts: int = 20
+
+    # Authenticated-user snapshot cache (saves a users row lookup per request)
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_entries: int = 10000
 
     google_client_id: Optional[str] = None
     google_client_secret: Optional[str] = None
     google_redirect_uri: Optional[str] = None
+    google_jwks_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_token_url: str = "https://oauth2.googleapis.com/token"
 
     sendgrid_api_key: Optional[str] = None
     sendgrid_from_email: str = "noreply@example.com"
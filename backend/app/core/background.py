@@ -0,0 +1,42 @@
+"""Periodic background tasks started and stopped by the app lifespan."""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run `func` every `interval` seconds (`interval` may be changed between runs)."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable[object]]) -> None:
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task | None = None
+
+    def start(self, initial_delay: float | None = None) -> None:
+        if self._task is None or self._task.done():
+            delay = self.interval if initial_delay is None else initial_delay
+            self._task = asyncio.create_task(self._run(delay), name=self.name)
+
+    async def _run(self, delay: float) -> None:
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+            delay = self.interval
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,77 @@
+"""Bounded in-process LRU cache with per-entry expiry."""
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, Hashable
+
+from app.core.metrics import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache whose entries expire after `ttl` seconds (or an explicit per-entry deadline).
+
+    When `name` is given, hits/misses/evictions are counted in the metrics registry as `<name>.hit` etc.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, name: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def _count(self, event: str) -> None:
+        if self.name:
+            metrics.inc(f"{self.name}.{event}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._count("miss")
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                self._count("miss")
+                return default
+            self._data.move_to_end(key)
+        self._count("hit")
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._count("evict")
+
+    def adjust(self, key: Hashable, delta: int) -> None:
+        """Add `delta` to a cached number in place, keeping its expiry; absent entries are left absent."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = (entry[0], entry[1] + delta)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
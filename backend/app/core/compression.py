@@ -0,0 +1,63 @@
+"""Compressed text at rest: a column type that stores large values zlib-compressed inside the same TEXT column."""
+import base64
+import zlib
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+# Stored form of a compressed value: MARKER, codec byte, base64 payload. Base64 keeps the column a valid
+# utf8mb4 TEXT (so existing rows, the FULLTEXT index definition and plain reads keep working) at a 4/3 cost
+# that compression more than repays above the threshold.
+MARKER = "\x01"
+ZLIB = "z"
+COMPRESSION_LEVEL = 6
+
+
+def is_compressed(stored: str) -> bool:
+    return stored.startswith(MARKER)
+
+
+def encode(value: str, min_bytes: int | None) -> str:
+    """Storage form of `value`: compressed when at least `min_bytes` long (None: never) and it actually shrinks.
+
+    A plain value that happens to start with MARKER is always compressed, so reads are never ambiguous.
+    """
+    raw = value.encode()
+    must = is_compressed(value)
+    if not must and (min_bytes is None or len(raw) < min_bytes):
+        return value
+    stored = MARKER + ZLIB + base64.b64encode(zlib.compress(raw, COMPRESSION_LEVEL)).decode("ascii")
+    return stored if must or len(stored) < len(raw) else value
+
+
+def decode(stored: str) -> str:
+    if not is_compressed(stored):
+        return stored
+    codec, payload = stored[1:2], stored[2:]
+    if codec != ZLIB:
+        raise ValueError(f"Unknown compressed text codec {codec!r}")
+    return zlib.decompress(base64.b64decode(payload)).decode()
+
+
+class CompressedText(TypeDecorator):
+    """TEXT that compresses values of `min_bytes` or more on write when `enabled`; reads always decode.
+
+    Reading does not depend on `enabled`, so switching it off leaves existing compressed rows readable
+    (app.services.content_storage converts them back in the background).
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, *args, enabled: bool = False, min_bytes: int = 2048, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode(value, self.min_bytes if self.enabled else None)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decode(value)
@@ -0,0 +1,80 @@
+"""Conditional GET: ETag / Last-Modified validators and 304 responses that skip body serialization."""
+import hashlib
+from collections.abc import Callable
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Shared caches may store these but must revalidate every time (a 304 is cheap)
+PUBLIC_REVALIDATE = "public, no-cache"
+# Per-user responses: browsers only, and a CDN must not serve one user's copy to another
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: object, weak: bool = False) -> str:
+    """ETag from row-version parts such as (table, id, updated_at).
+
+    Weak when the parts do not pin every byte of the body (only strong tags may back Range or If-Match).
+    """
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # MySQL DATETIME comes back naive; stored values are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since; GET uses weak comparison
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(
+    etag: str,
+    last_modified: datetime | None = None,
+    cache_control: str = PUBLIC_REVALIDATE,
+    vary: str | None = None,
+) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def conditional_response(
+    request: Request,
+    etag: str,
+    body: bytes | Callable[[], bytes],
+    last_modified: datetime | None = None,
+    cache_control: str = PUBLIC_REVALIDATE,
+    vary: str | None = None,
+    headers: dict[str, str] | None = None,
+    media_type: str = "application/json",
+) -> Response:
+    """304 when the client's validators match, else the body (a callable is only invoked when needed)."""
+    out = {**(headers or {}), **validator_headers(etag, last_modified, cache_control, vary)}
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=out)
+    return Response(content=body() if callable(body) else body, media_type=media_type, headers=out)
@@ -23,6 +23,24 @@ def send_email(to_email: str, subject: str, html_content: str) -> bool:
         return False
 
 
+def send_bulk_email(to_emails: list[str], subject: str, html_content: str) -> bool:
+    """One API call for up to 1000 recipients, each getting their own copy (no shared To: line)."""
+    if not settings.sendgrid_api_key or not to_emails:
+        return False
+    message = Mail(
+        from_email=(settings.sendgrid_from_email, settings.sendgrid_from_name),
+        to_emails=to_emails,
+        subject=subject,
+        html_content=html_content,
+        is_multiple=True,
+    )
+    try:
+        SendGridAPIClient(settings.sendgrid_api_key).send(message)
+        return True
+    except Exception:
+        return False
+
+
 def send_verification_email(to_email: str, token: str) -> bool:
     link = f"{settings.frontend_url}/verify-email?token={token}"
     html = f"""
@@ -0,0 +1,131 @@
+"""Google sign-in: local id_token verification against a cached JWKS, and OAuth code exchange."""
+import asyncio
+import math
+import re
+import time
+
+import httpx
+from jose import JWTError, jwt
+
+from app.config import get_settings
+from app.core.background import PeriodicTask
+from app.core.http import get_http_client
+from app.core.metrics import metrics
+
+settings = get_settings()
+
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(Exception):
+    pass
+
+
+class JWKSCache:
+    """Signing keys by `kid`, refreshed when the Cache-Control max-age runs out (or an unknown kid shows up)."""
+
+    def __init__(self, url: str, default_max_age: float = 3600, min_refetch_interval: float = 60) -> None:
+        self.url = url
+        self.default_max_age = default_max_age
+        self.min_refetch_interval = min_refetch_interval
+        self._keys: dict[str, dict] = {}
+        self._expires_at = 0.0
+        # Last fetch attempt, successful or not: min_refetch_interval also spaces out retries during an outage
+        self._attempted_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> float:
+        """Fetch the key set; returns seconds until it should be refreshed again."""
+        async with self._lock:
+            return await self._fetch()
+
+    async def _fetch(self) -> float:
+        self._attempted_at = time.monotonic()
+        r = await get_http_client().get(self.url)
+        r.raise_for_status()
+        keys = {k["kid"]: k for k in r.json().get("keys", []) if "kid" in k}
+        match = _MAX_AGE_RE.search(r.headers.get("cache-control", ""))
+        max_age = float(match.group(1)) if match else self.default_max_age
+        self._keys = keys
+        self._expires_at = time.monotonic() + max_age
+        metrics.inc("google_jwks.refresh")
+        # Refresh a bit early so request paths never wait on an expired key set
+        return max(max_age * 0.9, self.min_refetch_interval)
+
+    def _needs_refresh(self, kid: str | None) -> bool:
+        now = time.monotonic()
+        if now - self._attempted_at < self.min_refetch_interval:
+            return False
+        return now >= self._expires_at or kid not in self._keys
+
+    async def get_key(self, kid: str | None) -> dict:
+        if self._needs_refresh(kid):
+            async with self._lock:
+                # Single flight: requests that queued behind a refresh use its result instead of fetching again
+                if self._needs_refresh(kid):
+                    try:
+                        await self._fetch()
+                    except (httpx.HTTPError, ValueError):
+                        # Keep serving the last known keys if Google is briefly unreachable
+                        metrics.inc("google_jwks.refresh_failed")
+        key = self._keys.get(kid)
+        if key is None:
+            raise GoogleTokenError("Unknown signing key")
+        return key
+
+
+class GoogleIdTokenVerifier:
+    def __init__(self, jwks: JWKSCache, client_id: str | None, issuers: tuple[str, ...] = GOOGLE_ISSUERS) -> None:
+        self.jwks = jwks
+        self.client_id = client_id
+        self.issuers = issuers
+
+    async def verify(self, id_token: str) -> dict:
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except JWTError as e:
+            raise GoogleTokenError("Malformed token") from e
+        key = await self.jwks.get_key(header.get("kid"))
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=self.client_id,
+                options={"verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise GoogleTokenError("Invalid token") from e
+        if claims.get("iss") not in self.issuers:
+            raise GoogleTokenError("Invalid issuer")
+        return claims
+
+
+jwks_cache = JWKSCache(settings.google_jwks_url)
+verifier = GoogleIdTokenVerifier(jwks_cache, settings.google_client_id)
+
+
+async def _refresh_jwks() -> None:
+    jwks_refresher.interval = await jwks_cache.refresh()
+
+
+jwks_refresher = PeriodicTask("google-jwks-refresh", jwks_cache.default_max_age, _refresh_jwks)
+
+
+async def exchange_code(code: str) -> str | None:
+    """Exchange an authorization code for an id_token (None on failure)."""
+    r = await get_http_client().post(
+        settings.google_token_url,
+        data={
+            "code": code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": settings.google_redirect_uri or f"{settings.frontend_url}/auth/callback",
+            "grant_type": "authorization_code",
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    if r.status_code != 200:
+        return None
+    return r.json().get("id_token")
@@ -0,0 +1,80 @@
+"""Async password hashing: bcrypt runs in a bounded worker pool instead of on the event loop."""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import get_settings
+from app.core import security
+from app.core.metrics import metrics
+
+settings = get_settings()
+
+
+class HashingOverloaded(Exception):
+    """All hashing slots are busy; the request should be shed (503) rather than queued."""
+
+
+class PasswordHasher:
+    def __init__(self, executor: str = "thread", workers: int = 2, max_pending: int = 32) -> None:
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def start(self) -> None:
+        self._get_executor()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, fn, *args, wait: bool = False):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        # Fail fast when saturated: a login waiting seconds for a slot is worse than a quick 503
+        if self._slots.locked() and not wait:
+            metrics.inc("password_hash.rejected")
+            raise HashingOverloaded()
+        async with self._slots:
+            self._pending += 1
+            metrics.set_gauge("password_hash.queue_depth", self._pending)
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+            finally:
+                self._pending -= 1
+                metrics.set_gauge("password_hash.queue_depth", self._pending)
+                metrics.observe("password_hash.latency", time.perf_counter() - start)
+
+    async def hash(self, password: str, wait: bool = False) -> str:
+        return await self._run(security.get_password_hash, password, wait=wait)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(security.verify_password, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """Verify and, only if the stored hash uses outdated settings, return a replacement hash."""
+        return await self._run(security.verify_and_update_password, password, hashed)
+
+
+hasher = PasswordHasher(
+    executor=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
@@ -0,0 +1,64 @@
+"""In-process metrics: counters, gauges and timings (exposed at /metrics)."""
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+
+class Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict:
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "avg_ms": round(avg * 1000, 3), "max_ms": round(self.max * 1000, 3)}
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.timings: dict[str, Timing] = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing()
+            timing.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": {k: v.as_dict() for k, v in self.timings.items()},
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,88 @@
+"""Keyset (cursor) pagination over (created_at, id), newest first."""
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T] = field(default_factory=list)
+    total: int | None = 0
+    has_more: bool = False
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+async def offset_page(db: AsyncSession, q: Select, skip: int, limit: int) -> Page:
+    """Legacy OFFSET paging; one extra row tells whether another page exists."""
+    rows = list((await db.execute(q.offset(skip).limit(limit + 1))).scalars().all())
+    return Page(items=rows[:limit], has_more=len(rows) > limit)
+
+
+async def keyset_page(
+    db: AsyncSession,
+    q: Select,
+    created_col: Any,
+    id_col: Any,
+    limit: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> Page:
+    """Fetch `limit` rows after (older than) or before (newer than) a cursor; totals are left to the caller.
+
+    `after` walks towards older rows, `before` back towards newer ones. One extra row is fetched to know
+    whether another page exists in the direction of travel.
+    """
+    if after and before:
+        raise InvalidCursor("Use either after or before, not both")
+    backwards = before is not None
+    if after or before:
+        created_at, row_id = decode_cursor(after or before)
+        if backwards:
+            q = q.where(or_(created_col > created_at, and_(created_col == created_at, id_col > row_id)))
+        else:
+            q = q.where(or_(created_col < created_at, and_(created_col == created_at, id_col < row_id)))
+    if backwards:
+        q = q.order_by(created_col.asc(), id_col.asc())
+    else:
+        q = q.order_by(created_col.desc(), id_col.desc())
+    rows = list((await db.execute(q.limit(limit + 1))).scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    page = Page(items=rows, has_more=has_more)
+    if rows:
+        # The cursor row itself lies on the side we came from, so that side always has more
+        older_exist = True if backwards else has_more
+        newer_exist = has_more if backwards else after is not None
+        if older_exist:
+            page.next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        if newer_exist:
+            page.prev_cursor = encode_cursor(rows[0].created_at, rows[0].id)
+    return page
@@ -0,0 +1,46 @@
+"""Cached snapshot of the authenticated user (id, email, role, is_active) keyed by user id."""
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.cache import TTLCache
+from app.database import run_after_commit
+from app.models.user import User, UserRole
+
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+
+principal_cache = TTLCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl=settings.principal_cache_ttl_seconds,
+    name="principal_cache",
+)
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Principal | None:
+    """The cached principal, else the user's row (then cached); None if there is no such user."""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(select(User.id, User.email, User.role, User.is_active).where(User.id == user_id))
+        row = result.one_or_none()
+        if row is None:
+            return None
+        principal = Principal(id=row.id, email=row.email, role=row.role, is_active=row.is_active)
+        principal_cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(db: AsyncSession, user_id: int) -> None:
+    """Drop the cached principal now and again once the write commits (so no stale row is re-cached)."""
+    principal_cache.pop(user_id)
+    run_after_commit(db, lambda: principal_cache.pop(user_id))
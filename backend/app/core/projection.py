@@ -0,0 +1,32 @@
+"""Sparse fieldsets: parse ?fields= and push the projection down into SQL with load_only."""
+from collections.abc import Iterable
+
+from sqlalchemy.orm import load_only
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(raw: str | None, allowed: Iterable[str], always: Iterable[str] = ("id",)) -> list[str] | None:
+    """Requested fields in schema order (plus `always`), or None when the caller wants everything."""
+    if not raw:
+        return None
+    requested = {f.strip() for f in raw.split(",") if f.strip()}
+    allowed = list(allowed)
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.update(always)
+    return [f for f in allowed if f in requested]
+
+
+def load_columns(model, fields: Iterable[str], required: Iterable[str] = ("id", "created_at")):
+    """load_only option for the mapped columns among `fields`; anything else raises instead of lazy-loading."""
+    columns = model.__table__.columns.keys()
+    names = dict.fromkeys([*required, *(f for f in fields if f in columns)])
+    return load_only(*(getattr(model, name) for name in names), raiseload=True)
+
+
+def project(obj, fields: Iterable[str]) -> dict:
+    return {f: getattr(obj, f) for f in fields}
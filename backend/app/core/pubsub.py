@@ -0,0 +1,173 @@
+"""In-process pub/sub hub for per-user push streams, fed by a pluggable broker (local, or Redis across workers)."""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Protocol
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# A message targets {"user_id": id} or every user in {"user_ids": [lo, hi]} (inclusive id range)
+Message = dict
+Deliver = Callable[[Message], None]
+
+
+class HubFull(Exception):
+    """The process is at its stream connection limit."""
+
+
+class Broker(Protocol):
+    async def start(self, deliver: Deliver) -> None: ...
+
+    def publish(self, message: Message) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalBroker:
+    """Single process: publishing is delivery."""
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, message: Message) -> None:
+        if self._deliver is not None:
+            self._deliver(message)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+class RedisBroker:
+    """Every worker subscribes to one Redis channel, so a message published by any worker reaches all of them.
+
+    Delivery is best effort: a stream that misses messages while Redis is unreachable catches up from the
+    database when its client reconnects.
+    """
+
+    def __init__(self, url: str, channel: str) -> None:
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._listener: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    async def start(self, deliver: Deliver) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("notification_broker=redis requires the redis package") from exc
+        self._client = redis.from_url(self.url)
+        self._listener = asyncio.create_task(self._listen(deliver), name="pubsub-redis-listener")
+
+    async def _listen(self, deliver: Deliver) -> None:
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for raw in pubsub.listen():
+                        if raw["type"] == "message":
+                            deliver(json.loads(raw["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis pub/sub connection lost; resubscribing")
+                await asyncio.sleep(1.0)
+
+    def publish(self, message: Message) -> None:
+        task = asyncio.create_task(self._publish(json.dumps(message)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, data: str) -> None:
+        try:
+            await self._client.publish(self.channel, data)
+        except Exception:
+            metrics.inc("pubsub.publish_failed")
+            logger.warning("Redis publish failed", exc_info=True)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class Subscription:
+    """One open stream's inbox; bounded so a slow client cannot make the hub buffer without limit."""
+
+    def __init__(self, user_id: int, maxsize: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(maxsize)
+        # Set when a message was dropped; the stream then tells its client to resync and closes
+        self.overflowed = False
+
+    def offer(self, message: Message) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            metrics.inc("pubsub.overflow")
+
+
+class Hub:
+    def __init__(self, broker: Broker, queue_size: int = 100, max_subscribers: int = 1000) -> None:
+        self.broker = broker
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._count = 0
+
+    async def start(self) -> None:
+        await self.broker.start(self.deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+    def has_capacity(self) -> bool:
+        return self._count < self.max_subscribers
+
+    def subscribe(self, user_id: int) -> Subscription:
+        if not self.has_capacity():
+            raise HubFull()
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers[user_id].add(subscription)
+        self._count += 1
+        metrics.set_gauge("pubsub.subscribers", self._count)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_id]
+        self._count -= 1
+        metrics.set_gauge("pubsub.subscribers", self._count)
+
+    def publish(self, message: Message) -> None:
+        metrics.inc("pubsub.published")
+        self.broker.publish(message)
+
+    def deliver(self, message: Message) -> None:
+        """Hand a broker message to this process's matching subscribers (never blocks)."""
+        if "user_id" in message:
+            targets = list(self._subscribers.get(message["user_id"], ()))
+        else:
+            lo, hi = message["user_ids"]
+            targets = [s for user_id, subs in list(self._subscribers.items()) if lo <= user_id <= hi for s in subs]
+        for subscription in targets:
+            subscription.offer(message)
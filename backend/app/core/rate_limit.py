@@ -0,0 +1,190 @@
+"""Login throttling: token buckets and escalating lockouts per client, checked before any DB or bcrypt work."""
+import math
+import time
+from collections import deque
+from typing import Protocol
+
+from starlette.requests import Request
+
+from app.config import get_settings
+from app.core.metrics import metrics
+
+settings = get_settings()
+
+
+class RateLimitBackend(Protocol):
+    """Storage for buckets, failure windows and lockouts (in-process by default; swap for a shared store)."""
+
+    def take(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        """Consume one token; return 0 if allowed, else seconds until a token is available."""
+
+    def wait(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        """Seconds until `take` would succeed (0 if now), without consuming anything."""
+
+    def add_failure(self, key: str, window: float, now: float) -> int:
+        """Record a failure and return the number of failures inside the sliding window."""
+
+    def failures(self, key: str, window: float, now: float) -> int: ...
+
+    def lock(self, key: str, until: float, now: float) -> None: ...
+
+    def locked_for(self, key: str, now: float) -> float: ...
+
+    def reset(self, key: str) -> None: ...
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._failures: dict[str, deque[float]] = {}
+        self._locks: dict[str, float] = {}
+
+    def _prune(self, store: dict) -> None:
+        # Drop the oldest half once full; dicts keep insertion order so this is cheap and bounded
+        if len(store) >= self.max_keys:
+            for key in list(store)[: len(store) // 2]:
+                del store[key]
+
+    def _prune_locks(self, now: float) -> None:
+        # Only expired locks may go: evicting an active one would lift a lockout early. Active locks are bounded
+        # by how fast the buckets let failures in, so the store cannot grow without limit.
+        if len(self._locks) >= self.max_keys:
+            for key in [key for key, until in self._locks.items() if until <= now]:
+                del self._locks[key]
+
+    def wait(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        tokens, last = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_second)
+        return 0.0 if tokens >= 1 else (1 - tokens) / refill_per_second
+
+    def take(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        tokens, last = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_second)
+        if tokens >= 1:
+            if key not in self._buckets:
+                self._prune(self._buckets)
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / refill_per_second
+
+    def add_failure(self, key: str, window: float, now: float) -> int:
+        failures = self._failures.get(key)
+        if failures is None:
+            self._prune(self._failures)
+            failures = self._failures[key] = deque()
+        failures.append(now)
+        while failures and failures[0] <= now - window:
+            failures.popleft()
+        return len(failures)
+
+    def failures(self, key: str, window: float, now: float) -> int:
+        failures = self._failures.get(key)
+        return 0 if failures is None else sum(1 for at in failures if at > now - window)
+
+    def lock(self, key: str, until: float, now: float) -> None:
+        if key not in self._locks:
+            self._prune_locks(now)
+        self._locks[key] = until
+
+    def locked_for(self, key: str, now: float) -> float:
+        until = self._locks.get(key)
+        if until is None:
+            return 0.0
+        if until <= now:
+            del self._locks[key]
+            return 0.0
+        return until - now
+
+    def reset(self, key: str) -> None:
+        self._failures.pop(key, None)
+        self._locks.pop(key, None)
+
+
+class LoginThrottle:
+    """Per-attempt buckets and failure lockouts for the (email, client IP) pair and the client IP.
+
+    The email alone is never locked and its bucket only charges failures: an attacker spraying one address from
+    many IPs slows down guessing against it, but a caller with no recent failures of its own (the owner, from
+    their own address) is never held back by it.
+    """
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+
+    def _keys(self, email: str, ip: str | None) -> tuple[str, str, str]:
+        email, ip = email.lower(), ip or "unknown"
+        return f"login:account:{email}|{ip}", f"login:ip:{ip}", f"login:email:{email}"
+
+    def _buckets(self, account: str, address: str) -> tuple[tuple[str, int], ...]:
+        return (
+            (account, settings.login_email_attempts_per_minute),
+            (address, settings.login_ip_attempts_per_minute),
+        )
+
+    def check(self, email: str, ip: str | None) -> int:
+        """Return 0 if the attempt may proceed, else the Retry-After in seconds."""
+        if not self.enabled:
+            return 0
+        now = time.monotonic()
+        account, address, email_key = self._keys(email, ip)
+        wait = max(self.backend.locked_for(account, now), self.backend.locked_for(address, now))
+        if not wait and self.backend.failures(account, settings.login_failure_window_seconds, now):
+            per_minute = settings.login_email_any_ip_attempts_per_minute
+            wait = self.backend.wait(email_key, per_minute, per_minute / 60, now)
+        if not wait:
+            # Look before taking, so an attempt one scope rejects does not drain the others
+            buckets = self._buckets(account, address)
+            wait = max(self.backend.wait(key, per_minute, per_minute / 60, now) for key, per_minute in buckets)
+            if not wait:
+                for key, per_minute in buckets:
+                    self.backend.take(key, per_minute, per_minute / 60, now)
+        if wait:
+            metrics.inc("login_throttle.rejected")
+            return max(1, math.ceil(wait))
+        metrics.inc("login_throttle.accepted")
+        return 0
+
+    def record_failure(self, email: str, ip: str | None) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        account, address, email_key = self._keys(email, ip)
+        per_minute = settings.login_email_any_ip_attempts_per_minute
+        self.backend.take(email_key, per_minute, per_minute / 60, now)
+        threshold = settings.login_failure_threshold
+        for key, key_threshold in ((account, threshold), (address, threshold * 4)):
+            failures = self.backend.add_failure(key, settings.login_failure_window_seconds, now)
+            if failures >= key_threshold:
+                # Lockout doubles with every failure past the threshold, up to the configured cap
+                seconds = min(
+                    settings.login_lockout_seconds * 2 ** (failures - key_threshold),
+                    settings.login_lockout_max_seconds,
+                )
+                self.backend.lock(key, now + seconds, now)
+                metrics.inc("login_throttle.lockouts")
+
+    def record_success(self, email: str, ip: str | None) -> None:
+        if self.enabled:
+            self.backend.reset(self._keys(email, ip)[0])
+
+
+def client_address(request: Request) -> str | None:
+    """The caller's address: from the configured proxy header when behind a trusted reverse proxy.
+
+    Each trusted proxy appends the address it received the request from, so the client is the entry
+    `trusted_proxy_count` places from the right; anything further left is client-supplied and ignored.
+    """
+    peer = request.client.host if request.client else None
+    header = settings.trusted_proxy_header
+    if not header:
+        return peer
+    hops = [part.strip() for part in request.headers.get(header, "").split(",") if part.strip()]
+    if len(hops) < settings.trusted_proxy_count:
+        return peer
+    return hops[-settings.trusted_proxy_count]
+
+
+login_throttle = LoginThrottle(MemoryRateLimitBackend(), enabled=settings.login_throttle_enabled)
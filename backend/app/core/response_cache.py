@@ -0,0 +1,139 @@
+"""In-process cache of serialized response bodies: LRU bounded by bytes, TTL, and tag-based invalidation."""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+
+from app.config import get_settings
+from app.core.metrics import metrics
+
+settings = get_settings()
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    tags: frozenset[str]
+    expires: float
+    meta: dict = field(default_factory=dict)
+
+
+def cache_key(path: str, **params) -> str:
+    query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+    return f"{path}?{query}"
+
+
+def request_key(request: Request, **params) -> str:
+    """Path plus the route's own (validated) parameters in a canonical order.
+
+    The raw query string is ignored: ?limit=20, ?limit=020 and no limit at all share an entry, and parameters
+    the route does not declare can neither bypass the cache nor fill it with junk entries.
+    """
+    return cache_key(request.url.path, **params)
+
+
+class ResponseCache:
+    """Bodies are rendered from a read that started before set() runs, and a write may commit in between.
+
+    Callers take generation() before reading and hand it to set(); an invalidation of any of the entry's tags
+    since then means the body may predate the write, so it is returned but not stored.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._by_tag: dict[str, set[str]] = {}
+        # Generation of the last invalidation per tag (and of the last clear), to spot writes that raced a read
+        self._generation = 0
+        self._invalidated: dict[str, int] = {}
+        self._cleared = 0
+        self._bytes = 0
+        self._hits = 0
+        self._lookups = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._discard(key)
+                entry = None
+            self._lookups += 1
+            if entry is not None:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            metrics.set_gauge("response_cache.hit_ratio", round(self._hits / self._lookups, 4))
+        metrics.inc("response_cache.hit" if entry is not None else "response_cache.miss")
+        return entry
+
+    def generation(self) -> int:
+        """Take before the read a cached body is built from; pass to set()."""
+        return self._generation
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: set[str] | frozenset[str],
+        meta: dict | None = None,
+        generation: int | None = None,
+    ) -> CachedResponse:
+        entry = CachedResponse(body=body, tags=frozenset(tags), expires=time.monotonic() + self.ttl, meta=meta or {})
+        if len(body) > self.max_bytes // 4:
+            return entry  # one huge body should not flush the whole cache
+        with self._lock:
+            if generation is not None and self._stale(entry.tags, generation):
+                metrics.inc("response_cache.stale_set")
+                return entry
+            self._discard(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                self._discard(next(iter(self._entries)))
+                metrics.inc("response_cache.evict")
+            metrics.set_gauge("response_cache.bytes", self._bytes)
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self._generation
+                for key in self._by_tag.pop(tag, set()):
+                    self._discard(key)
+            metrics.set_gauge("response_cache.bytes", self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared = self._generation
+            self._invalidated.clear()
+            self._entries.clear()
+            self._by_tag.clear()
+            self._bytes = 0
+
+    def _stale(self, tags: frozenset[str], generation: int) -> bool:
+        if self._cleared > generation:
+            return True
+        return any(self._invalidated.get(tag, 0) > generation for tag in tags)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+response_cache = ResponseCache(max_bytes=settings.response_cache_max_bytes, ttl=settings.response_cache_ttl_seconds)
@@ -1,4 +1,7 @@
 """JWT and password hashing."""
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -6,6 +9,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.core.cache import TTLCache
 
 settings = get_settings()
 # bcrypt_sha256 pre-hashes with HMAC-SHA256 (32 bytes) before bcrypt - no 72-byte limit
@@ -20,6 +24,10 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain, hashed)
+
+
 def create_access_token(subject: str | int, extra: dict[str, Any] | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode = {"sub": str(subject), "exp": expire, "type": "access"}
@@ -41,7 +49,15 @@ def create_verification_token(email: str, token_type: str = "signup_verify") ->
         else settings.invite_token_expire_minutes
     )
     expire = datetime.now(timezone.utc) + timedelta(minutes=minutes)
-    to_encode = {"email": email, "exp": expire, "type": token_type}
+    # jti: tokens for the same email and type minted in the same second must still differ (the ledger key is unique)
+    to_encode = {"email": email, "exp": expire, "type": token_type, "jti": secrets.token_urlsafe(16)}
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+
+def create_stream_ticket(user_id: int) -> str:
+    """Short-lived credential for EventSource, which cannot send an Authorization header (it goes in the URL)."""
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.notification_stream_ticket_seconds)
+    to_encode = {"sub": str(user_id), "exp": expire, "type": "stream"}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -52,8 +68,20 @@ def decode_token(token: str) -> dict | None:
         return None
 
 
+# Verified access-token payloads keyed by token digest; each entry lives until the token's own `exp`.
+# Refresh and verification tokens go through decode_token() and are never cached.
+access_token_cache = TTLCache(max_entries=settings.token_cache_max_entries, ttl=0, name="token_cache")
+
+
 def decode_access_token(token: str) -> dict | None:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = access_token_cache.get(key)
+    if payload is not None:
+        return payload
     payload = decode_token(token)
     if payload and payload.get("type") == "access":
+        remaining = payload.get("exp", 0) - time.time()
+        if remaining > 0:
+            access_token_cache.set(key, payload, ttl=remaining)
         return payload
     return None
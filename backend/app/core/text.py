@@ -0,0 +1,16 @@
+"""Text normalization for case- and accent-insensitive matching."""
+import re
+import unicodedata
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(value: str) -> str:
+    """Casefolded, accents stripped, whitespace collapsed: "  José  Núñez" -> "jose nunez"."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _SPACE.sub(" ", stripped.casefold()).strip()
+
+
+def trigrams(value: str) -> set[str]:
+    return {value[i : i + 3] for i in range(len(value) - 2)}
@@ -0,0 +1,102 @@
+"""List totals without a COUNT(*) per request.
+
+Unfiltered lists use counters seeded by one COUNT and then adjusted on writes (re-seeded every
+`total_counter_ttl_seconds` to bound drift between workers). Filtered lists (search, unread) cache their
+COUNT briefly, and any write to the table retires those entries by bumping a per-table generation.
+"""
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Hashable
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.cache import TTLCache
+from app.database import run_after_commit
+
+settings = get_settings()
+
+TOTAL_MODES = ("exact", "estimate", "none")
+
+
+class Totals:
+    def __init__(self, counter_ttl: float, filtered_ttl: float, max_entries: int) -> None:
+        self._counters = TTLCache(max_entries, counter_ttl, name="totals.counter")
+        self._filtered = TTLCache(max_entries, filtered_ttl, name="totals.filtered")
+        self._generation: dict[str, int] = defaultdict(int)
+
+    async def total(
+        self,
+        db: AsyncSession,
+        key: tuple[Hashable, ...],
+        count: Select | Callable[[], Awaitable[int]],
+        mode: str = "exact",
+        incremental: bool = False,
+    ) -> int | None:
+        """`key[0]` is the table name; `count` is a COUNT statement or a coroutine function computing it.
+
+        `incremental` keys must be kept current via `after_commit(adjust=...)`.
+        """
+        if mode == "none":
+            return None
+        if mode == "estimate" and key[1:] == ("all",):
+            estimate = await self._table_estimate(db, key[0])
+            if estimate is not None:
+                return estimate
+        cache = self._counters if incremental else self._filtered
+        cache_key = key if incremental else (key, self._generation[key[0]])
+        value = cache.get(cache_key)
+        if value is None:
+            if isinstance(count, Select):
+                value = (await db.execute(count)).scalar() or 0
+            else:
+                value = await count()
+            cache.set(cache_key, value)
+        return value
+
+    async def _table_estimate(self, db: AsyncSession, table: str) -> int | None:
+        """InnoDB's row estimate from table statistics: O(1), typically within a few percent."""
+        if db.bind.dialect.name != "mysql":
+            return None
+        row = (
+            await db.execute(
+                text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+                ),
+                {"table": table},
+            )
+        ).first()
+        return int(row[0]) if row and row[0] is not None else None
+
+    def after_commit(
+        self,
+        db: AsyncSession,
+        table: str,
+        adjust: dict[tuple[Hashable, ...], int] | None = None,
+        invalidate: tuple[tuple[Hashable, ...], ...] = (),
+        reset_counters: bool = False,
+    ) -> None:
+        """Record a write to `table`: applied once the transaction commits.
+
+        `reset_counters` drops every counter of the table, for writes spanning too many keys to adjust.
+        """
+
+        def apply() -> None:
+            self._generation[table] += 1
+            for key, delta in (adjust or {}).items():
+                self._counters.adjust(key, delta)
+            for key in invalidate:
+                self._counters.pop(key)
+            if reset_counters:
+                self._counters.pop_where(lambda key: key[0] == table)
+
+        run_after_commit(db, apply)
+
+
+totals = Totals(
+    counter_ttl=settings.total_counter_ttl_seconds,
+    filtered_ttl=settings.total_filtered_ttl_seconds,
+    max_entries=settings.total_cache_max_entries,
+)
@@ -1,9 +1,10 @@
 """Async database session and engine."""
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 
-from sqlalchemy import text
+from sqlalchemy import Connection, event, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.config import get_settings
 
@@ -27,6 +28,47 @@ class Base(DeclarativeBase):
     pass
 
 
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run `callback` once the session's current transaction commits; it is dropped on rollback."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit_callbacks(session: Session) -> None:
+    session.info.pop("after_commit", None)
+
+
+def create_missing_indexes(conn: Connection) -> None:
+    """create_all() skips tables that already exist; add indexes declared since those tables were created."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+
+
+def add_missing_columns(conn: Connection) -> None:
+    """create_all() never alters existing tables; add (nullable) columns declared since they were created."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} ADD COLUMN {ddl}"))
+
+
 async def ensure_database_exists() -> None:
     """Create the configured MySQL database if it does not exist."""
     settings = get_settings()
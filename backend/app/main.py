@@ -1,16 +1,60 @@
 """FastAPI application entrypoint with Swagger docs."""
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
-from app.database import engine, Base
-from app.models import User, BlogPost, UserSetting, Notification, VerificationToken
+from app.core import google
+from app.core.background import PeriodicTask
+from app.core.hashing import HashingOverloaded, hasher
+from app.core.http import close_http_client
+from app.core.pagination import InvalidCursor
+from app.core.projection import InvalidFields
+from app.core.metrics import metrics
+from app.database import engine, Base, add_missing_columns, create_missing_indexes
+from app.models import User, BlogPost, BlogPostSlug, UserSetting, Notification, VerificationToken
 from app.api.v1.router import api_router
+from app.services import (
+    blog_cache,
+    blog_service,
+    broadcast_service,
+    content_storage,
+    notification_stream,
+    related,
+    search_service,
+    token_service,
+    trending,
+    user_search,
+)
+from app.services.view_counter import view_buffer
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+token_sweeper = PeriodicTask(
+    "verification-token-sweeper",
+    settings.verification_token_sweep_interval_seconds,
+    token_service.sweep_expired_tokens,
+)
+view_count_flusher = PeriodicTask(
+    "blog-view-count-flush",
+    settings.view_count_flush_interval_seconds,
+    view_buffer.flush,
+)
+trending_persister = PeriodicTask(
+    "blog-trending-persist",
+    settings.trending_persist_interval_seconds,
+    trending.persist,
+)
+related_rebuilder = PeriodicTask(
+    "related-posts-rebuild",
+    settings.related_rebuild_interval_seconds,
+    related.rebuild,
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,7 +62,41 @@ async def lifespan(app: FastAPI):
     await ensure_database_exists()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(token_service.migrate_legacy_tokens)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+    await blog_service.backfill_derived_fields()
+    await search_service.startup()
+    # A large blog takes seconds to index: build in the background rather than delay serving
+    related_rebuilder.start(initial_delay=0)
+    content_storage.start_migration()
+    user_search.start_backfill()
+    await notification_stream.hub.start()
+    await broadcast_service.resume()
+    await blog_cache.warm()
+    await trending.restore()
+    hasher.start()
+    if settings.google_client_id:
+        # Prime the key set in the background; verification fetches on demand if this hasn't finished
+        google.jwks_refresher.start(initial_delay=0)
+    token_sweeper.start()
+    view_count_flusher.start()
+    trending_persister.start()
     yield
+    await notification_stream.hub.stop()
+    await trending_persister.stop()
+    try:
+        await trending.persist()
+    except Exception:
+        # Losing one snapshot is fine; skipping the view count flush below is not
+        logger.exception("Final trending snapshot failed")
+    await view_count_flusher.stop()
+    await view_buffer.flush()
+    await token_sweeper.stop()
+    await related_rebuilder.stop()
+    await google.jwks_refresher.stop()
+    hasher.shutdown()
+    await close_http_client()
     await engine.dispose()
 
 
@@ -37,10 +115,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Has-More", "X-Total-Count", "ETag", "Last-Modified"],
 )
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
 
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidFields)
+async def invalid_fields_handler(request: Request, exc: InvalidFields):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
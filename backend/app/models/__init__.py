@@ -1,8 +1,19 @@
 """SQLAlchemy models."""
-from app.models.blog import BlogPost
-from app.models.notification import Notification
+from app.models.blog import BlogPost, BlogPostRevision, BlogPostSlug, BlogTrendingScore
+from app.models.notification import Notification, NotificationBroadcast
 from app.models.setting import UserSetting
-from app.models.user import User
+from app.models.user import User, UserSearchGram
 from app.models.verification_token import VerificationToken
 
-__all__ = ["User", "BlogPost", "UserSetting", "Notification", "VerificationToken"]
+__all__ = [
+    "User",
+    "UserSearchGram",
+    "BlogPost",
+    "BlogPostRevision",
+    "BlogPostSlug",
+    "BlogTrendingScore",
+    "UserSetting",
+    "Notification",
+    "NotificationBroadcast",
+    "VerificationToken",
+]
@@ -2,23 +2,59 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.config import get_settings
+from app.core.compression import CompressedText
 from app.database import Base
 
 if TYPE_CHECKING:
     from app.models.user import User
 
+settings = get_settings()
+
 
 class BlogPost(Base):
     __tablename__ = "blog_posts"
+    __table_args__ = (
+        Index("ix_blog_posts_title_content_fulltext", "title", "content", mysql_prefix="FULLTEXT"),
+        # Keyset pagination: (created_at, id) newest first, optionally restricted to published posts
+        Index("ix_blog_posts_created_id", "created_at", "id"),
+        Index("ix_blog_posts_published_created_id", "is_published", "created_at", "id"),
+        # Feed and sitemap validators: latest edit across all posts
+        Index("ix_blog_posts_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     slug: Mapped[str] = mapped_column(String(500), unique=True, index=True, nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(
+        CompressedText(
+            enabled=settings.blog_content_compression, min_bytes=settings.blog_content_compress_min_bytes
+        ),
+        nullable=False,
+    )
     excerpt: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    # Rendered once per edit by app.services.rendering; content_hash tells whether they are current
+    content_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    toc: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    word_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    reading_time_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
     cover_image_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -31,3 +67,43 @@ class BlogPost(Base):
 
     def __repr__(self) -> str:
         return f"<BlogPost id={self.id} title={self.title}>"
+
+
+class BlogPostSlug(Base):
+    """Slugs a post used to have; old URLs resolve through here to a redirect."""
+
+    __tablename__ = "blog_post_slugs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    post_id: Mapped[int] = mapped_column(ForeignKey("blog_posts.id", ondelete="CASCADE"), nullable=False, index=True)
+    slug: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class BlogTrendingScore(Base):
+    """Snapshot of the in-memory trending ranking (app.services.trending), reloaded at startup."""
+
+    __tablename__ = "blog_trending_scores"
+
+    post_id: Mapped[int] = mapped_column(ForeignKey("blog_posts.id", ondelete="CASCADE"), primary_key=True)
+    # Decayed score as of scored_at
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    scored_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class BlogPostRevision(Base):
+    """One saved version of a post: a full snapshot, or a compressed delta against the previous revision."""
+
+    __tablename__ = "blog_post_revisions"
+    __table_args__ = (UniqueConstraint("post_id", "number", name="uq_blog_post_revisions_post_number"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    post_id: Mapped[int] = mapped_column(ForeignKey("blog_posts.id", ondelete="CASCADE"), nullable=False)
+    number: Mapped[int] = mapped_column(Integer, nullable=False)
+    title: Mapped[str] = mapped_column(String(500), nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    # zlib-compressed: the content itself for snapshots, JSON line operations for deltas
+    data: Mapped[bytes] = mapped_column(LargeBinary(16 * 1024 * 1024), nullable=False)
+    content_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    author_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,9 @@
-"""Notification model."""
+"""Notification and broadcast (fan-out job) models."""
+import enum
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import JSON, Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,6 +14,7 @@ if TYPE_CHECKING:
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -23,3 +25,39 @@ class Notification(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user: Mapped["User"] = relationship("User", back_populates="notifications")
+
+
+class BroadcastStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class NotificationBroadcast(Base):
+    """One notification fanned out to an audience of users by app.services.broadcast_service, chunk by chunk."""
+
+    __tablename__ = "notification_broadcasts"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    link: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    # BroadcastAudience as JSON; {} is every active user
+    audience: Mapped[dict] = mapped_column(JSON, nullable=False)
+    send_email: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    status: Mapped[BroadcastStatus] = mapped_column(
+        Enum(BroadcastStatus), default=BroadcastStatus.PENDING, nullable=False, index=True
+    )
+    total_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    processed_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    notified_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    emailed_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Highest user id processed so far: the resume point, and the compare-and-set guard for each chunk
+    last_user_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -3,9 +3,11 @@ import enum
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, Enum, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, String, Text, func
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core.text import normalize
 from app.database import Base
 
 if TYPE_CHECKING:
@@ -14,6 +16,14 @@ if TYPE_CHECKING:
     from app.models.setting import UserSetting
 
 
+NAME_LENGTH = 255
+
+
+def normalized_name(full_name: str | None) -> str:
+    """normalize(full_name) cut to the column: NFKD can expand a name (e.g. "ﷺ" is 18 characters) past 255."""
+    return normalize(full_name or "")[:NAME_LENGTH]
+
+
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
     USER = "user"
@@ -21,11 +31,19 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     hashed_password: Mapped[str | None] = mapped_column(String(255), nullable=True)  # None for OAuth-only
-    full_name: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    full_name: Mapped[str] = mapped_column(String(NAME_LENGTH), nullable=False, default="")
+    # normalized_name(full_name), for indexed prefix search; the default covers Core (bulk) inserts
+    name_normalized: Mapped[str | None] = mapped_column(
+        String(NAME_LENGTH),
+        nullable=True,
+        index=True,
+        default=lambda ctx: normalized_name(ctx.get_current_parameters().get("full_name")),
+    )
     avatar_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.USER, nullable=False)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -40,5 +58,23 @@ class User(Base):
         "Notification", back_populates="user", cascade="all, delete-orphan", order_by="Notification.created_at.desc()"
     )
 
+    @validates("full_name")
+    def _normalize_name(self, key: str, value: str) -> str:
+        self.name_normalized = normalized_name(value)
+        return value
+
     def __repr__(self) -> str:
         return f"<User id={self.id} email={self.email}>"
+
+
+class UserSearchGram(Base):
+    """Trigram index over normalized emails and names (app.services.user_search), for infix matches."""
+
+    __tablename__ = "user_search_grams"
+
+    # Binary collation: distinct grams must not compare equal under an accent-insensitive collation
+    gram: Mapped[str] = mapped_column(
+        String(3).with_variant(mysql.VARCHAR(3, charset="utf8mb4", collation="utf8mb4_bin"), "mysql"),
+        primary_key=True,
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -17,9 +17,10 @@ class VerificationToken(Base):
     __tablename__ = "verification_tokens"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    token: Mapped[str] = mapped_column(String(512), unique=True, index=True, nullable=False)
+    # SHA-256 hex digest of the issued JWT; the token itself is never stored
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
     email: Mapped[str] = mapped_column(String(255), nullable=False)
     token_type: Mapped[TokenType] = mapped_column(Enum(TokenType), nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,7 @@
 """Blog post schemas."""
 from datetime import datetime
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 
@@ -23,11 +25,22 @@ class BlogPostUpdate(BaseModel):
     is_published: bool | None = None
 
 
+class TocEntry(BaseModel):
+    level: int
+    id: str
+    title: str
+
+
 class BlogPostResponse(BaseModel):
     id: int
     title: str
     slug: str
     content: str
+    # Sanitized HTML rendered from content when the post was saved, with its heading outline
+    content_html: str | None = None
+    toc: list[TocEntry] | None = None
+    word_count: int | None = None
+    reading_time_minutes: int | None = None
     excerpt: str | None
     cover_image_url: str | None
     is_published: bool
@@ -36,10 +49,69 @@ class BlogPostResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     published_at: datetime | None
+    # Highlighted excerpt (HTML with <mark>) when the list was produced by a search query
+    snippet: str | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class BlogPostSummary(BaseModel):
+    """List-view projection: everything but `content` (view=summary)."""
+
+    id: int
+    title: str
+    slug: str
+    excerpt: str | None
+    word_count: int | None = None
+    reading_time_minutes: int | None = None
+    cover_image_url: str | None
+    is_published: bool
+    author_id: int | None
+    view_count: int
+    created_at: datetime
+    updated_at: datetime
+    published_at: datetime | None
+    snippet: str | None = None
 
     model_config = {"from_attributes": True}
 
 
 class BlogPostListResponse(BaseModel):
-    items: list[BlogPostResponse]
-    total: int
+    # Full posts by default, summaries for view=summary, only the requested keys for fields=
+    items: list[BlogPostResponse] | list[BlogPostSummary] | list[dict[str, Any]]
+    total: int | None  # None when the caller asked for include_total=false / total_mode=none
+    has_more: bool = False
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class BlogPostRevisionResponse(BaseModel):
+    number: int
+    title: str
+    is_snapshot: bool
+    content_size: int  # bytes of the full content at this revision
+    stored_size: int  # bytes actually stored (compressed snapshot or delta)
+    author_id: int | None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class BlogPostRevisionListResponse(BaseModel):
+    items: list[BlogPostRevisionResponse]
+    stored_bytes: int
+    full_copy_bytes: int  # what storing every revision in full would take
+
+
+class BlogPostVersionResponse(BaseModel):
+    number: int
+    title: str
+    content: str
+
+
+class BlogPostDiffResponse(BaseModel):
+    from_number: int
+    to_number: int
+    from_title: str
+    to_title: str
+    diff: str  # unified diff of the content
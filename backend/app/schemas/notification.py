@@ -1,6 +1,10 @@
 """Notification schemas."""
 from datetime import datetime
-from pydantic import BaseModel
+
+from pydantic import BaseModel, Field
+
+from app.models.notification import BroadcastStatus
+from app.models.user import UserRole
 
 
 class NotificationResponse(BaseModel):
@@ -17,3 +21,43 @@ class NotificationResponse(BaseModel):
 
 class NotificationUpdate(BaseModel):
     is_read: bool = True
+
+
+class BroadcastAudience(BaseModel):
+    """Active users matching every given criterion; no criteria means all active users."""
+
+    role: UserRole | None = None
+    is_verified: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    user_ids: list[int] | None = Field(None, max_length=10000)
+
+
+class BroadcastCreate(BaseModel):
+    title: str = Field(..., max_length=255)
+    message: str
+    link: str | None = Field(None, max_length=512)
+    audience: BroadcastAudience = BroadcastAudience()
+    # Also email users whose email_notifications setting is on (in-app delivery follows push_notifications)
+    send_email: bool = False
+
+
+class BroadcastResponse(BaseModel):
+    id: int
+    title: str
+    message: str
+    link: str | None
+    audience: BroadcastAudience
+    send_email: bool
+    status: BroadcastStatus
+    total_users: int
+    processed_users: int
+    notified_count: int
+    emailed_count: int
+    error: str | None
+    created_by: int | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
@@ -1,5 +1,7 @@
 """User schemas."""
 from datetime import datetime
+from typing import Any, Literal
+
 from pydantic import BaseModel, EmailStr
 
 from app.models.user import UserRole
@@ -35,5 +37,46 @@ class UserResponse(BaseModel):
 
 
 class UserListResponse(BaseModel):
-    items: list[UserResponse]
-    total: int
+    items: list[UserResponse] | list[dict[str, Any]]  # dicts when the caller asked for fields=
+    total: int | None  # None when the caller asked for include_total=false / total_mode=none
+    has_more: bool = False
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class UserTypeaheadItem(BaseModel):
+    id: int
+    email: str
+    full_name: str
+
+    model_config = {"from_attributes": True}
+
+
+class UserImportRow(BaseModel):
+    """One CSV/NDJSON record of a bulk import; without a password the account can only sign in via Google."""
+
+    email: EmailStr
+    full_name: str = ""
+    password: str | None = None
+    role: UserRole = UserRole.USER
+
+
+class UserImportResult(BaseModel):
+    line: int
+    email: str | None
+    status: Literal["created", "exists", "duplicate", "invalid"]
+    id: int | None = None
+    error: str | None = None
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    existing: int
+    duplicates: int
+    invalid: int
+    invites_queued: int
+    rows: list[UserImportResult]
+    elapsed_seconds: float
+    rows_per_second: float
+    hash_seconds: float  # wall time spent waiting for password hashes
+    insert_seconds: float
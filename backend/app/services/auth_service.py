@@ -3,12 +3,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.core.hashing import hasher
+from app.core.principals import invalidate_principal
+from app.core.totals import totals
 from app.core.security import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     create_refresh_token,
-    create_verification_token,
     decode_token,
     decode_access_token,
 )
@@ -17,6 +17,7 @@ from app.models.user import User, UserRole
 from app.models.setting import UserSetting
 from app.models.verification_token import TokenType
 from app.schemas.auth import LoginRequest, SignupRequest
+from app.services import token_service
 
 settings = get_settings()
 
@@ -29,15 +30,16 @@ async def login(db: AsyncSession, data: LoginRequest) -> User | None:
             user = result.scalar_one_or_none()
             if user:
                 user.role = UserRole.ADMIN
-                user.hashed_password = get_password_hash(settings.super_admin_password)
+                await _ensure_password_hash(user, settings.super_admin_password)
                 user.is_verified = True
                 user.is_active = True
                 await db.flush()
+                invalidate_principal(db, user.id)
                 await db.refresh(user)
                 return user
             user = User(
                 email=settings.super_admin_email,
-                hashed_password=get_password_hash(settings.super_admin_password),
+                hashed_password=await hasher.hash(settings.super_admin_password),
                 full_name=settings.super_admin_name or settings.super_admin_email.split("@")[0],
                 role=UserRole.ADMIN,
                 is_verified=True,
@@ -46,24 +48,43 @@ async def login(db: AsyncSession, data: LoginRequest) -> User | None:
             await db.flush()
             db.add(UserSetting(user_id=user.id))
             await db.refresh(user)
+            totals.after_commit(db, "users", adjust={("users", "all"): 1})
             return user
 
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
-    if not user or not user.hashed_password or not verify_password(data.password, user.hashed_password):
+    if not user or not user.hashed_password:
+        return None
+    ok, new_hash = await hasher.verify_and_update(data.password, user.hashed_password)
+    if not ok:
         return None
     if not user.is_active:
         return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.flush()
     return user
 
 
+async def _ensure_password_hash(user: User, password: str) -> None:
+    """Re-hash only when the stored hash is missing, stale or no longer matches `password`."""
+    if not user.hashed_password:
+        user.hashed_password = await hasher.hash(password)
+        return
+    ok, new_hash = await hasher.verify_and_update(password, user.hashed_password)
+    if not ok:
+        user.hashed_password = await hasher.hash(password)
+    elif new_hash:
+        user.hashed_password = new_hash
+
+
 async def signup(db: AsyncSession, data: SignupRequest) -> tuple[User, str]:
     result = await db.execute(select(User).where(User.email == data.email))
     if result.scalar_one_or_none():
         raise ValueError("Email already registered")
     user = User(
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await hasher.hash(data.password),
         full_name=data.full_name or data.email.split("@")[0],
         role=UserRole.USER,
         is_verified=False,
@@ -73,7 +94,8 @@ async def signup(db: AsyncSession, data: SignupRequest) -> tuple[User, str]:
     setting = UserSetting(user_id=user.id)
     db.add(setting)
     await db.refresh(user)
-    token = create_verification_token(user.email, TokenType.SIGNUP_VERIFY.value)
+    totals.after_commit(db, "users", adjust={("users", "all"): 1})
+    token = await token_service.issue_token(db, user.email, TokenType.SIGNUP_VERIFY)
     sent = send_verification_email(user.email, token)
     if not sent and settings.sendgrid_api_key:
         pass  # log in production
@@ -81,10 +103,7 @@ async def signup(db: AsyncSession, data: SignupRequest) -> tuple[User, str]:
 
 
 async def verify_email_token(db: AsyncSession, token: str) -> User | None:
-    payload = decode_token(token)
-    if not payload or payload.get("type") not in ("signup_verify", "invite"):
-        return None
-    email = payload.get("email")
+    email = await token_service.consume_token(db, token, (TokenType.SIGNUP_VERIFY, TokenType.INVITE))
     if not email:
         return None
     result = await db.execute(select(User).where(User.email == email))
@@ -93,6 +112,7 @@ async def verify_email_token(db: AsyncSession, token: str) -> User | None:
         return None
     user.is_verified = True
     await db.flush()
+    invalidate_principal(db, user.id)
     return user
 
 
@@ -120,6 +140,7 @@ async def create_or_update_google_user(
         user.avatar_url = avatar_url or user.avatar_url
         user.is_verified = True
         await db.flush()
+        invalidate_principal(db, user.id)
         await db.refresh(user)
         return user
     result = await db.execute(select(User).where(User.email == email))
@@ -130,6 +151,7 @@ async def create_or_update_google_user(
         user.avatar_url = avatar_url or user.avatar_url
         user.is_verified = True
         await db.flush()
+        invalidate_principal(db, user.id)
         await db.refresh(user)
         return user
     user = User(
@@ -144,6 +166,7 @@ async def create_or_update_google_user(
     await db.flush()
     db.add(UserSetting(user_id=user.id))
     await db.refresh(user)
+    totals.after_commit(db, "users", adjust={("users", "all"): 1})
     return user
 
 
@@ -0,0 +1,134 @@
+"""Cached public blog responses: serialization, tag scheme, write invalidation and startup warmup."""
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.conditional import body_etag, make_etag
+from app.core.pagination import Page
+from app.core.projection import parse_fields, project
+from app.core.response_cache import CachedResponse, cache_key, response_cache
+from app.database import AsyncSessionLocal, run_after_commit
+from app.models.blog import BlogPost
+from app.schemas.blog import BlogPostListResponse, BlogPostResponse, BlogPostSummary
+from app.services import search_service
+
+settings = get_settings()
+
+LIST_TAG = "blog:list"
+SUMMARY_FIELDS = list(BlogPostSummary.model_fields)
+# The list route's defaults, i.e. the key of GET /blog without parameters (keep in step with the route)
+LIST_DEFAULTS = {
+    "skip": 0,
+    "limit": 20,
+    "public_only": True,
+    "include_total": True,
+    "total_mode": "exact",
+    "view": "full",
+}
+_NEVER = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def post_tag(post_id: int) -> str:
+    return f"blog:post:{post_id}"
+
+
+def select_fields(view: str = "full", fields: str | None = None) -> list[str] | None:
+    """Fields a list request asked for; None means full posts. Raises InvalidFields for unknown names."""
+    if fields:
+        return parse_fields(fields, BlogPostResponse.model_fields)
+    if view == "summary":
+        return SUMMARY_FIELDS
+    return None
+
+
+def list_response(page: Page, search: str | None, fields: list[str] | None = None) -> BlogPostListResponse:
+    if fields is None:
+        schema, columns = BlogPostResponse, BlogPostResponse.model_fields
+    elif fields == SUMMARY_FIELDS:
+        schema, columns = BlogPostSummary, SUMMARY_FIELDS
+    else:
+        schema, columns = None, [f for f in fields if f != "snippet"]
+    items = [schema.model_validate(p) if schema else project(p, columns) for p in page.items]
+    if search and (fields is None or "snippet" in fields):
+        query = search_service.parse_query(search)
+        # Projected rows never load content; the stored excerpt is the next best thing to highlight
+        with_content = fields is None or "content" in fields
+        for item, post in zip(items, page.items):
+            text = post.content if with_content else (post.excerpt or post.title)
+            snippet = search_service.highlight(text, query)
+            if schema:
+                item.snippet = snippet
+            else:
+                item["snippet"] = snippet
+    return BlogPostListResponse(
+        items=items,
+        total=page.total,
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+    )
+
+
+def post_etag(post: BlogPost) -> str:
+    # Row version only, so weak: the body's view_count changes with every flush without changing the validator
+    return make_etag("blog_post", post.id, post.updated_at, weak=True)
+
+
+def cache_post(key: str, post: BlogPost, generation: int | None = None) -> CachedResponse:
+    """generation: response_cache.generation() taken before the post was loaded."""
+    body = BlogPostResponse.model_validate(post).model_dump_json().encode()
+    meta = {"post_id": post.id, "etag": post_etag(post), "last_modified": post.updated_at}
+    return response_cache.set(key, body, {post_tag(post.id)}, meta=meta, generation=generation)
+
+
+def cache_list(
+    key: str, page: Page, search: str | None, fields: list[str] | None = None, generation: int | None = None
+) -> CachedResponse:
+    body = list_response(page, search, fields).model_dump_json().encode()
+    return response_cache.set(key, body, {LIST_TAG}, meta={"etag": body_etag(body)}, generation=generation)
+
+
+async def version() -> tuple[str, datetime]:
+    """Validator for responses derived from the whole published set (feeds, sitemap) and when it last changed.
+
+    Read from the database, so every worker agrees after a write handled by any of them. Edits, publishing and
+    unpublishing move the latest updated_at; deletions change the published count (and so the ETag).
+    """
+    published = select(func.count()).select_from(BlogPost).where(BlogPost.is_published == True)
+    latest = select(func.max(BlogPost.updated_at))
+    async with AsyncSessionLocal() as db:
+        count, changed_at = (await db.execute(select(published.scalar_subquery(), latest.scalar_subquery()))).one()
+    changed_at = _NEVER if changed_at is None else changed_at
+    changed_at = changed_at.replace(tzinfo=timezone.utc) if changed_at.tzinfo is None else changed_at
+    return make_etag("blog", count, changed_at), changed_at.replace(microsecond=0)
+
+
+def _changed(post_id: int) -> None:
+    response_cache.invalidate(LIST_TAG, post_tag(post_id))
+
+
+def invalidate_post(db: AsyncSession, post_id: int) -> None:
+    """Drop list pages and this post's detail responses once the write commits."""
+    run_after_commit(db, lambda: _changed(post_id))
+
+
+async def warm(limit: int | None = None) -> int:
+    """Pre-populate the default list page and the newest posts' detail responses."""
+    from app.services import blog_service
+
+    limit = settings.response_cache_warmup_posts if limit is None else limit
+    if limit <= 0:
+        return 0
+    prefix = f"{settings.api_v1_prefix}/blog"
+    generation = response_cache.generation()
+    async with AsyncSessionLocal() as db:
+        page = await blog_service.list_posts(db, limit=LIST_DEFAULTS["limit"], public_only=True)
+        cache_list(cache_key(prefix, **LIST_DEFAULTS), page, None, generation=generation)
+        if len(page.items) < limit:
+            page = await blog_service.list_posts(db, limit=limit, public_only=True, total_mode="none")
+        for post in page.items[:limit]:
+            cache_post(cache_key(f"{prefix}/slug/{post.slug}"), post, generation)
+            cache_post(cache_key(f"{prefix}/{post.id}"), post, generation)
+    return min(len(page.items), limit)
@@ -1,10 +1,72 @@
 """Blog post CRUD and listing."""
 import re
-from sqlalchemy import select, func, or_
+from sqlalchemy import bindparam, delete, or_, select, func, union_all, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.blog import BlogPost
+from app.config import get_settings
+from app.core.pagination import InvalidCursor, Page, keyset_page, offset_page
+from app.core.projection import load_columns
+from app.core.totals import totals
+from app.database import AsyncSessionLocal, run_after_commit
+from app.models.blog import BlogPost, BlogPostSlug
 from app.schemas.blog import BlogPostCreate, BlogPostUpdate
+from app.services import blog_cache, related, rendering, revision_service, search_service, trending
+from app.services.view_counter import view_buffer
+
+settings = get_settings()
+
+MAX_SLUG_BASE = 480
+SLUG_ATTEMPTS = 3
+
+_TAGS = re.compile(r"<[^>]+>")
+# Markdown that means nothing in plain text: links/images (keep the label), line markers, emphasis and code
+_LINKS = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_LINE_MARKERS = re.compile(r"^\s*(?:#{1,6}|>|[-*+]|\d+\.)\s+", re.MULTILINE)
+_EMPHASIS = re.compile(r"[*`~]+|(?<!\w)_+|_+(?!\w)")
+
+
+def derive_excerpt(content: str, length: int | None = None) -> str:
+    """Plain-text lead of the post (markup stripped), cut at a word boundary."""
+    length = length or settings.blog_excerpt_length
+    text = _TAGS.sub(" ", content)
+    text = _LINKS.sub(r"\1", text)
+    text = _LINE_MARKERS.sub("", text)
+    text = _EMPHASIS.sub("", text)
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(" ", 0, length)
+    return text[: cut if cut > length // 2 else length].rstrip(" ,.;:-") + "…"
+
+
+def _rendered_values(content: str) -> dict:
+    rendered = rendering.render(content)
+    return {
+        "content_html": rendered.html,
+        "content_hash": rendered.content_hash,
+        "toc": rendered.toc,
+        "word_count": rendered.word_count,
+        "reading_time_minutes": rendered.reading_time_minutes,
+    }
+
+
+def _render(post: BlogPost) -> None:
+    """Re-render only when the content (or the renderer) changed since the stored HTML was produced."""
+    if post.content_hash != rendering.content_hash(post.content):
+        for name, value in _rendered_values(post.content).items():
+            setattr(post, name, value)
+
+
+def _options(fields: list[str] | None) -> list:
+    """Column projection for list queries; `content` is never loaded unless asked for."""
+    if fields is None:
+        return []
+    required = ["id", "created_at"]
+    if "snippet" in fields:
+        required += ["title", "excerpt"]
+    return [load_columns(BlogPost, fields, required)]
 
 
 def slugify(text: str) -> str:
@@ -14,10 +76,15 @@ def slugify(text: str) -> str:
     return text.strip("-") or "post"
 
 
-async def get_post_by_id(db: AsyncSession, post_id: int, public_only: bool = False) -> BlogPost | None:
+async def get_post_by_id(
+    db: AsyncSession, post_id: int, public_only: bool = False, for_update: bool = False
+) -> BlogPost | None:
+    """`for_update` locks the row until commit (and reads its latest committed state) for read-modify-write."""
     q = select(BlogPost).where(BlogPost.id == post_id)
     if public_only:
         q = q.where(BlogPost.is_published == True)
+    if for_update:
+        q = q.with_for_update().execution_options(populate_existing=True)
     result = await db.execute(q)
     return result.scalar_one_or_none()
 
@@ -30,70 +97,288 @@ async def get_post_by_slug(db: AsyncSession, slug: str, public_only: bool = Fals
     return result.scalar_one_or_none()
 
 
+async def get_current_slug(db: AsyncSession, old_slug: str, public_only: bool = False) -> str | None:
+    """Where a renamed post lives now, looked up by its former slug."""
+    q = (
+        select(BlogPost.slug)
+        .join(BlogPostSlug, BlogPostSlug.post_id == BlogPost.id)
+        .where(BlogPostSlug.slug == old_slug)
+    )
+    if public_only:
+        q = q.where(BlogPost.is_published == True)
+    return (await db.execute(q)).scalar_one_or_none()
+
+
+async def trending_posts(db: AsyncSession, limit: int = 10, fields: list[str] | None = None) -> list[BlogPost]:
+    """Top published posts by decayed views: a primary-key lookup of the ranking's head, no table scan."""
+    ranked = [post_id for post_id, _ in trending.top(limit * 2)]
+    return (await _published_by_ids(db, ranked, fields))[:limit]
+
+
+async def related_posts(
+    db: AsyncSession, post_id: int, limit: int = 5, fields: list[str] | None = None
+) -> list[BlogPost] | None:
+    """Precomputed nearest neighbours by content similarity, most similar first; None if the post isn't published."""
+    # The post itself is checked in the same lookup; a few spare ids cover neighbours that were unpublished or
+    # deleted since the last full build
+    posts = await _published_by_ids(db, [post_id, *related.related_ids(post_id, limit + 5)], fields)
+    if not posts or posts[0].id != post_id:
+        return None
+    return posts[1 : limit + 1]
+
+
+async def _published_by_ids(db: AsyncSession, ids: list[int], fields: list[str] | None) -> list[BlogPost]:
+    if not ids:
+        return []
+    result = await db.execute(
+        select(BlogPost).where(BlogPost.id.in_(ids), BlogPost.is_published == True).options(*_options(fields))
+    )
+    by_id = {p.id: p for p in result.scalars().all()}
+    return [by_id[post_id] for post_id in ids if post_id in by_id]
+
+
 async def list_posts(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 20,
     search: str | None = None,
     public_only: bool = False,
-) -> tuple[list[BlogPost], int]:
-    q = select(BlogPost)
-    count_q = select(func.count()).select_from(BlogPost)
-    if public_only:
-        q = q.where(BlogPost.is_published == True)
-        count_q = count_q.where(BlogPost.is_published == True)
+    after: str | None = None,
+    before: str | None = None,
+    total_mode: str = "exact",
+    fields: list[str] | None = None,
+) -> Page[BlogPost]:
+    """Newest first. The first page and any `after`/`before` cursor use keyset pagination; `skip` > 0 uses OFFSET."""
     if search:
-        like = f"%{search}%"
-        q = q.where(or_(BlogPost.title.ilike(like), BlogPost.content.ilike(like)))
-        count_q = count_q.where(or_(BlogPost.title.ilike(like), BlogPost.content.ilike(like)))
-    total = (await db.execute(count_q)).scalar() or 0
-    q = q.offset(skip).limit(limit).order_by(BlogPost.created_at.desc())
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+        if after or before:
+            raise InvalidCursor("Cursor pagination is not available for search results")
+        return await search_posts(
+            db,
+            search_service.parse_query(search),
+            skip=skip,
+            limit=limit,
+            public_only=public_only,
+            total_mode=total_mode,
+            fields=fields,
+        )
+    filters = [BlogPost.is_published == True] if public_only else []
+    q = select(BlogPost).where(*filters).options(*_options(fields))
+    if skip and not (after or before):
+        page = await offset_page(db, q.order_by(BlogPost.created_at.desc(), BlogPost.id.desc()), skip, limit)
+    else:
+        page = await keyset_page(db, q, BlogPost.created_at, BlogPost.id, limit, after=after, before=before)
+    page.total = await totals.total(
+        db,
+        ("blog_posts", "published" if public_only else "all"),
+        select(func.count()).select_from(BlogPost).where(*filters),
+        total_mode,
+        incremental=True,
+    )
+    return page
+
+
+async def search_posts(
+    db: AsyncSession,
+    query: search_service.SearchQuery,
+    skip: int = 0,
+    limit: int = 20,
+    public_only: bool = False,
+    total_mode: str = "exact",
+    fields: list[str] | None = None,
+) -> Page[BlogPost]:
+    """Posts matching the full-text query, most relevant first."""
+    if not query:
+        return Page(total=0 if total_mode != "none" else None)
+    hits = await search_service.search_posts(db, query, public_only, skip, limit + 1)
+    total = await totals.total(
+        db,
+        ("blog_posts", "search", public_only, query.to_boolean_mode(), *query.unindexed()),
+        lambda: search_service.count_posts(db, query, public_only),
+        total_mode,
+    )
+    page = Page(total=total, has_more=len(hits) > limit)
+    hits = hits[:limit]
+    if hits:
+        result = await db.execute(
+            select(BlogPost).where(BlogPost.id.in_([post_id for post_id, _ in hits])).options(*_options(fields))
+        )
+        by_id = {p.id: p for p in result.scalars().all()}
+        page.items = [by_id[post_id] for post_id, _ in hits if post_id in by_id]
+    return page
+
+
+async def allocate_slug(db: AsyncSession, base: str, post_id: int | None = None) -> str:
+    """`base` if free, else `base-N` past the highest suffix in use (one indexed prefix query, live and old slugs)."""
+    like = base.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "-%"
+    live = select(BlogPost.slug).where(or_(BlogPost.slug == base, BlogPost.slug.like(like, escape="\\")))
+    old = select(BlogPostSlug.slug).where(or_(BlogPostSlug.slug == base, BlogPostSlug.slug.like(like, escape="\\")))
+    if post_id is not None:
+        # A post may take back its own current or former slug
+        live = live.where(BlogPost.id != post_id)
+        old = old.where(BlogPostSlug.post_id != post_id)
+    taken = set((await db.execute(union_all(live, old))).scalars().all())
+    if base not in taken:
+        return base
+    suffix = re.compile(re.escape(base) + r"-(\d+)")
+    used = [int(m.group(1)) for slug in taken if (m := suffix.fullmatch(slug))]
+    return f"{base}-{max(used, default=0) + 1}"
+
+
+def _slug_base(title: str) -> str:
+    # Leave room for a numeric suffix within the 500-character column
+    return slugify(title)[:MAX_SLUG_BASE].rstrip("-") or "post"
+
+
+def _has_base(slug: str, base: str) -> bool:
+    return slug == base or re.fullmatch(re.escape(base) + r"-\d+", slug) is not None
+
+
+async def _flush_with_slug(db: AsyncSession, post: BlogPost, base: str) -> None:
+    """Allocate a slug and flush; losing a race for it to a concurrent writer costs one more round."""
+    for attempt in range(SLUG_ATTEMPTS):
+        post.slug = await allocate_slug(db, base, post.id)
+        try:
+            async with db.begin_nested():
+                db.add(post)
+                await db.flush()
+            return
+        except IntegrityError:
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+            if post.id is not None:
+                await db.refresh(post)
 
 
 async def create_post(db: AsyncSession, data: BlogPostCreate, author_id: int) -> BlogPost:
-    base_slug = slugify(data.title)
-    slug = base_slug
-    n = 0
-    while True:
-        r = await db.execute(select(BlogPost).where(BlogPost.slug == slug))
-        if r.scalar_one_or_none() is None:
-            break
-        n += 1
-        slug = f"{base_slug}-{n}"
     post = BlogPost(
         title=data.title,
-        slug=slug,
         content=data.content,
-        excerpt=data.excerpt,
+        excerpt=data.excerpt or derive_excerpt(data.content),
         cover_image_url=data.cover_image_url,
         is_published=data.is_published,
         author_id=author_id,
     )
-    db.add(post)
-    await db.flush()
+    _render(post)
+    await _flush_with_slug(db, post, _slug_base(data.title))
+    revision_service.record_created(db, post, author_id)
     await db.refresh(post)
+    search_service.index_post(db, post)
+    related.index_post(db, post)
+    blog_cache.invalidate_post(db, post.id)
+    totals.after_commit(
+        db, "blog_posts", adjust={("blog_posts", "all"): 1, ("blog_posts", "published"): int(post.is_published)}
+    )
     return post
 
 
-async def update_post(db: AsyncSession, post: BlogPost, data: BlogPostUpdate) -> BlogPost:
+async def update_post(
+    db: AsyncSession, post: BlogPost, data: BlogPostUpdate, editor_id: int | None = None
+) -> BlogPost:
+    was_published = post.is_published
+    old_title, old_content = post.title, post.content
     if data.title is not None:
         post.title = data.title
-        post.slug = slugify(data.title)
     if data.content is not None:
+        # Keep a derived excerpt in step with the content; a hand-written one is left alone
+        if data.excerpt is None and post.excerpt in (None, derive_excerpt(post.content)):
+            post.excerpt = derive_excerpt(data.content)
         post.content = data.content
     if data.excerpt is not None:
-        post.excerpt = data.excerpt
+        post.excerpt = data.excerpt or derive_excerpt(post.content)
     if data.cover_image_url is not None:
         post.cover_image_url = data.cover_image_url
     if data.is_published is not None:
         post.is_published = data.is_published
+    _render(post)
+    await db.flush()
+    base = _slug_base(post.title)
+    if not _has_base(post.slug, base):
+        old_slug = post.slug
+        await _flush_with_slug(db, post, base)
+        # The old URL keeps resolving (as a redirect); a slug the post takes back leaves its history
+        await db.execute(delete(BlogPostSlug).where(BlogPostSlug.post_id == post.id, BlogPostSlug.slug == post.slug))
+        db.add(BlogPostSlug(post_id=post.id, slug=old_slug))
+    await revision_service.record_edit(db, post, old_title, old_content, editor_id)
     await db.flush()
     await db.refresh(post)
+    search_service.index_post(db, post)
+    related.index_post(db, post)
+    blog_cache.invalidate_post(db, post.id)
+    if not post.is_published:
+        post_id = post.id
+        run_after_commit(db, lambda: trending.discard(post_id))
+    totals.after_commit(
+        db, "blog_posts", adjust={("blog_posts", "published"): int(post.is_published) - int(was_published)}
+    )
     return post
 
 
-async def increment_view_count(db: AsyncSession, post: BlogPost) -> None:
-    post.view_count += 1
+async def delete_post(db: AsyncSession, post_id: int) -> None:
+    was_published = (
+        await db.execute(select(BlogPost.is_published).where(BlogPost.id == post_id))
+    ).scalar_one_or_none()
+    if was_published is None:
+        return
+    await db.execute(delete(BlogPost).where(BlogPost.id == post_id))
     await db.flush()
+    search_service.remove_post(db, post_id)
+    related.remove_post(db, post_id)
+    blog_cache.invalidate_post(db, post_id)
+    run_after_commit(db, lambda: trending.discard(post_id))
+    totals.after_commit(
+        db, "blog_posts", adjust={("blog_posts", "all"): -1, ("blog_posts", "published"): -int(was_published)}
+    )
+
+
+async def backfill_derived_fields(batch_size: int = 500) -> int:
+    """Derive excerpts and rendered content for posts saved before either was automatic."""
+    done = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (
+                await db.execute(
+                    select(BlogPost.id, BlogPost.content, BlogPost.excerpt, BlogPost.content_hash)
+                    .where(
+                        BlogPost.id > last_id,
+                        or_(BlogPost.excerpt.is_(None), BlogPost.excerpt == "", BlogPost.content_hash.is_(None)),
+                    )
+                    .order_by(BlogPost.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                break
+            # One executemany per set of columns to fill (at most three per batch) instead of an UPDATE per row
+            groups: dict[tuple[str, ...], list[dict]] = {}
+            for row in rows:
+                values = {} if row.content_hash else _rendered_values(row.content)
+                if not row.excerpt:
+                    values["excerpt"] = derive_excerpt(row.content)
+                groups.setdefault(tuple(sorted(values)), []).append({"row_id": row.id, **values})
+            table = BlogPost.__table__
+            for columns, params in groups.items():
+                await db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("row_id"))
+                    # updated_at pinned: derived fields are not an edit
+                    .values(**{name: bindparam(name) for name in columns}, updated_at=table.c.updated_at),
+                    params,
+                )
+            await db.commit()
+            done += len(rows)
+            last_id = rows[-1].id
+    return done
+
+
+def record_view(post_id: int) -> None:
+    """Count a view served from the response cache (no row loaded)."""
+    view_buffer.add(post_id)
+    trending.record_view(post_id)
+
+
+async def increment_view_count(db: AsyncSession, post: BlogPost) -> None:
+    """Buffer the view (flushed in batches by view_counter) and reflect it on the returned object only."""
+    view_buffer.add(post.id)
+    trending.record_view(post.id)
+    set_committed_value(post, "view_count", post.view_count + view_buffer.pending(post.id))
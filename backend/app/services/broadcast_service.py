@@ -0,0 +1,227 @@
+"""Notification fan-out: one notification to an audience of users, inserted as chunked INSERT ... SELECTs.
+
+Jobs run as background tasks and record their progress on the broadcast row. Each chunk claims its user id
+range with a compare-and-set on `last_user_id` in the same transaction as its insert, so a chunk is applied
+exactly once even if the job is resumed elsewhere, and a cancelled job stops at the next chunk.
+"""
+import asyncio
+import html
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import ColumnElement, func, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.email import send_bulk_email
+from app.core.metrics import metrics
+from app.core.totals import totals
+from app.database import AsyncSessionLocal, run_after_commit
+from app.models.notification import BroadcastStatus, Notification, NotificationBroadcast
+from app.models.setting import UserSetting
+from app.models.user import User
+from app.schemas.notification import BroadcastAudience, BroadcastCreate
+from app.services import notification_stream
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ACTIVE = (BroadcastStatus.PENDING, BroadcastStatus.RUNNING)
+EMAIL_BATCH = 1000  # SendGrid personalizations per request
+_tasks: dict[int, asyncio.Task] = {}
+
+
+def audience_filter(audience: BroadcastAudience) -> list[ColumnElement[bool]]:
+    filters = [User.is_active == True]
+    if audience.role is not None:
+        filters.append(User.role == audience.role)
+    if audience.is_verified is not None:
+        filters.append(User.is_verified == audience.is_verified)
+    if audience.created_after is not None:
+        filters.append(User.created_at >= audience.created_after)
+    if audience.created_before is not None:
+        filters.append(User.created_at < audience.created_before)
+    if audience.user_ids is not None:
+        filters.append(User.id.in_(audience.user_ids))
+    return filters
+
+
+def _opted_in(column) -> ColumnElement[bool]:
+    # Users without a settings row get the defaults, which are opted in
+    return or_(column.is_(None), column == True)
+
+
+async def create_broadcast(db: AsyncSession, data: BroadcastCreate, created_by: int | None) -> NotificationBroadcast:
+    total = await db.execute(select(func.count()).select_from(User).where(*audience_filter(data.audience)))
+    job = NotificationBroadcast(
+        title=data.title,
+        message=data.message,
+        link=data.link,
+        audience=data.audience.model_dump(mode="json", exclude_none=True),
+        send_email=data.send_email,
+        total_users=total.scalar_one(),
+        created_by=created_by,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    job_id = job.id
+    run_after_commit(db, lambda: start(job_id))
+    return job
+
+
+async def get_broadcast(db: AsyncSession, broadcast_id: int) -> NotificationBroadcast | None:
+    return await db.get(NotificationBroadcast, broadcast_id)
+
+
+async def list_broadcasts(db: AsyncSession, limit: int = 20) -> list[NotificationBroadcast]:
+    result = await db.execute(select(NotificationBroadcast).order_by(NotificationBroadcast.id.desc()).limit(limit))
+    return list(result.scalars())
+
+
+async def cancel_broadcast(db: AsyncSession, broadcast_id: int) -> bool:
+    """Stop a pending or running job; chunks already committed stay delivered."""
+    result = await db.execute(
+        update(NotificationBroadcast)
+        .where(NotificationBroadcast.id == broadcast_id, NotificationBroadcast.status.in_(ACTIVE))
+        .values(status=BroadcastStatus.CANCELLED, finished_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def start(broadcast_id: int) -> None:
+    task = _tasks.get(broadcast_id)
+    if task is None or task.done():
+        _tasks[broadcast_id] = asyncio.create_task(_run(broadcast_id), name=f"notification-broadcast-{broadcast_id}")
+        _tasks[broadcast_id].add_done_callback(lambda t: _tasks.pop(broadcast_id, None))
+
+
+async def resume() -> int:
+    """Startup: continue jobs interrupted by a restart from their last committed chunk."""
+    async with AsyncSessionLocal() as db:
+        ids = (
+            await db.execute(select(NotificationBroadcast.id).where(NotificationBroadcast.status.in_(ACTIVE)))
+        ).scalars().all()
+    for broadcast_id in ids:
+        start(broadcast_id)
+    return len(ids)
+
+
+async def _set(db: AsyncSession, broadcast_id: int, *where, **values) -> int:
+    result = await db.execute(
+        update(NotificationBroadcast)
+        .where(NotificationBroadcast.id == broadcast_id, *where)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def _run(broadcast_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        try:
+            await _fan_out(db, broadcast_id)
+        except Exception as exc:
+            logger.exception("Notification broadcast %d failed", broadcast_id)
+            await db.rollback()
+            await _set(
+                db,
+                broadcast_id,
+                NotificationBroadcast.status.in_(ACTIVE),
+                status=BroadcastStatus.FAILED,
+                error=str(exc)[:1000],
+                finished_at=datetime.now(timezone.utc),
+            )
+            await db.commit()
+
+
+async def _fan_out(db: AsyncSession, broadcast_id: int) -> None:
+    job = await db.get(NotificationBroadcast, broadcast_id)
+    if job is None or job.status not in ACTIVE:
+        return
+    await _set(
+        db,
+        broadcast_id,
+        NotificationBroadcast.status.in_(ACTIVE),
+        status=BroadcastStatus.RUNNING,
+        started_at=func.coalesce(NotificationBroadcast.started_at, func.now()),
+    )
+    await db.commit()
+    filters = audience_filter(BroadcastAudience.model_validate(job.audience))
+    title, message, link = job.title, job.message, job.link
+    last_id = job.last_user_id
+    while True:
+        chunk = (
+            select(User.id).where(User.id > last_id, *filters).order_by(User.id).limit(settings.broadcast_chunk_size)
+        ).subquery()
+        size, upper = (await db.execute(select(func.count(), func.max(chunk.c.id)))).one()
+        if not size:
+            await _set(
+                db,
+                broadcast_id,
+                NotificationBroadcast.status == BroadcastStatus.RUNNING,
+                status=BroadcastStatus.COMPLETED,
+                finished_at=datetime.now(timezone.utc),
+            )
+            await db.commit()
+            metrics.inc("notification_broadcast.completed")
+            return
+        # Claim (last_id, upper]: fails if the job was cancelled or another worker already took this chunk
+        claimed = await _set(
+            db,
+            broadcast_id,
+            NotificationBroadcast.status == BroadcastStatus.RUNNING,
+            NotificationBroadcast.last_user_id == last_id,
+            last_user_id=upper,
+            processed_users=NotificationBroadcast.processed_users + size,
+        )
+        if claimed != 1:
+            await db.rollback()
+            return
+        in_chunk = (User.id > last_id, User.id <= upper, *filters)
+        recipients = (
+            select(User.id, literal(title), literal(message), literal(link))
+            .outerjoin(UserSetting, UserSetting.user_id == User.id)
+            .where(*in_chunk, _opted_in(UserSetting.push_notifications))
+        )
+        result = await db.execute(
+            insert(Notification).from_select(["user_id", "title", "message", "link"], recipients)
+        )
+        notified = max(result.rowcount, 0)
+        await _set(db, broadcast_id, notified_count=NotificationBroadcast.notified_count + notified)
+        emails = []
+        if job.send_email:
+            emails = (
+                await db.execute(
+                    select(User.email)
+                    .outerjoin(UserSetting, UserSetting.user_id == User.id)
+                    .where(*in_chunk, _opted_in(UserSetting.email_notifications))
+                )
+            ).scalars().all()
+        # Per-user unread counters cannot be adjusted without knowing the users; let them re-seed
+        totals.after_commit(db, "notifications", reset_counters=True)
+        await db.commit()
+        metrics.inc("notification_broadcast.notified", notified)
+        if notified:
+            notification_stream.publish_range(last_id + 1, upper)
+        last_id = upper
+        if emails:
+            await _email(db, broadcast_id, emails, title, message, link)
+        await asyncio.sleep(settings.broadcast_pause_seconds)
+
+
+async def _email(db: AsyncSession, broadcast_id: int, emails: list[str], title: str, message: str, link: str | None):
+    body = f"<p>{html.escape(message)}</p>"
+    if link:
+        body += f'<p><a href="{html.escape(link)}">{html.escape(link)}</a></p>'
+    sent = 0
+    for i in range(0, len(emails), EMAIL_BATCH):
+        batch = list(emails[i : i + EMAIL_BATCH])
+        # SendGrid's client is synchronous
+        if await asyncio.to_thread(send_bulk_email, batch, title, body):
+            sent += len(batch)
+    if sent:
+        await _set(db, broadcast_id, emailed_count=NotificationBroadcast.emailed_count + sent)
+        await db.commit()
+        metrics.inc("notification_broadcast.emailed", sent)
@@ -0,0 +1,101 @@
+"""Blog content storage mode: converts existing rows to (or back from) compressed form in the background."""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import Text, func, select, type_coerce, update
+
+from app.config import get_settings
+from app.core import compression
+from app.core.metrics import metrics
+from app.database import AsyncSessionLocal
+from app.models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# The column as stored, bypassing CompressedText's decoding
+_stored = type_coerce(BlogPost.content, Text)
+_task: asyncio.Task | None = None
+
+
+def _target_bytes() -> int | None:
+    return settings.blog_content_compress_min_bytes if settings.blog_content_compression else None
+
+
+def _candidates():
+    """Rows whose stored form may not match the current setting; only these are fetched."""
+    marked = _stored.startswith(compression.MARKER)
+    if settings.blog_content_compression:
+        return (func.length(_stored) >= settings.blog_content_compress_min_bytes) & ~marked
+    return marked
+
+
+async def migrate(batch_size: int | None = None, pause: float | None = None) -> int:
+    """Rewrite content rows into the storage form the settings ask for, one committed batch at a time.
+
+    Short transactions and a pause between batches keep it from competing with request traffic; it is
+    idempotent, so an interrupted run simply continues at the next startup.
+    """
+    batch_size = batch_size or settings.blog_content_migration_batch
+    pause = settings.blog_content_migration_pause_seconds if pause is None else pause
+    min_bytes = _target_bytes()
+    converted = 0
+    last_id = 0
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (
+                await db.execute(
+                    select(BlogPost.id, BlogPost.content_hash, _stored.label("stored"))
+                    .where(BlogPost.id > last_id, _candidates())
+                    .order_by(BlogPost.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                target = compression.encode(compression.decode(row.stored), min_bytes)
+                if target == row.stored:
+                    continue
+                # Same content, different encoding: not an edit, so updated_at (and ETags) stay put. Conditional on
+                # the row still holding what was read: an edit committed since then must not be overwritten (the
+                # content hash is compared too, as a case-insensitive collation can call different text equal)
+                result = await db.execute(
+                    update(BlogPost)
+                    .where(
+                        BlogPost.id == row.id,
+                        _stored == row.stored,
+                        BlogPost.content_hash.is_not_distinct_from(row.content_hash),
+                    )
+                    .values(content=type_coerce(target, Text), updated_at=BlogPost.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    converted += 1
+                else:
+                    metrics.inc("blog.content_storage.skipped_edited")
+            await db.commit()
+            last_id = rows[-1].id
+            if pause:
+                await asyncio.sleep(pause)
+    metrics.inc("blog.content_storage.converted", converted)
+    metrics.observe("blog.content_storage.migrate", time.perf_counter() - start)
+    return converted
+
+
+async def _run() -> None:
+    try:
+        converted = await migrate()
+    except Exception:
+        logger.exception("Blog content storage migration failed")
+        return
+    if converted:
+        logger.info("Converted %d blog posts to %s content", converted, "compressed" if _target_bytes() else "plain")
+
+
+def start_migration() -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run(), name="blog-content-storage")
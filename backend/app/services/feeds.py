@@ -0,0 +1,115 @@
+"""RSS, Atom and sitemap documents, generated as chunks from a server-side cursor over published posts."""
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from sqlalchemy import Select, select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.blog import BlogPost
+from app.models.setting import UserSetting
+
+settings = get_settings()
+
+STREAM_BATCH = 500
+SITEMAP_MAX_URLS = 50_000  # sitemaps.org limit per file
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _blog_url(slug: str | None = None) -> str:
+    base = f"{settings.frontend_url.rstrip('/')}/blog"
+    return f"{base}/{slug}" if slug else base
+
+
+def _published(*columns, limit: int) -> Select:
+    # Served by ix_blog_posts_published_created_id, newest first
+    return (
+        select(*columns)
+        .where(BlogPost.is_published == True)
+        .order_by(BlogPost.created_at.desc(), BlogPost.id.desc())
+        .limit(limit)
+    )
+
+
+async def _site() -> tuple[str, str]:
+    async with AsyncSessionLocal() as db:
+        row = (
+            await db.execute(
+                select(UserSetting.app_name, UserSetting.meta_description)
+                .where(UserSetting.app_name.isnot(None))
+                .limit(1)
+            )
+        ).one_or_none()
+    if row is None:
+        return settings.app_name, ""
+    return row.app_name, row.meta_description or ""
+
+
+async def _rows(q: Select) -> AsyncIterator:
+    # Own session: the request's session is closed before a streamed body is sent
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(q.execution_options(yield_per=STREAM_BATCH))
+        async for row in result:
+            yield row
+
+
+async def rss() -> AsyncIterator[str]:
+    title, description = await _site()
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        f"<title>{escape(title)}</title><link>{escape(_blog_url())}</link>"
+        f"<description>{escape(description)}</description>"
+    )
+    q = _published(BlogPost.title, BlogPost.slug, BlogPost.excerpt, BlogPost.created_at, limit=settings.blog_feed_size)
+    async for row in _rows(q):
+        url = escape(_blog_url(row.slug))
+        yield (
+            f"<item><title>{escape(row.title)}</title><link>{url}</link><guid>{url}</guid>"
+            f"<pubDate>{format_datetime(_utc(row.created_at), usegmt=True)}</pubDate>"
+            f"<description>{escape(row.excerpt or '')}</description></item>"
+        )
+    yield "</channel></rss>\n"
+
+
+async def atom(updated: datetime) -> AsyncIterator[str]:
+    title, description = await _site()
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{escape(title)}</title><subtitle>{escape(description)}</subtitle>"
+        f"<id>{escape(_blog_url())}</id><link href={quoteattr(_blog_url())}/>"
+        f"<updated>{_utc(updated).isoformat()}</updated>"
+    )
+    q = _published(
+        BlogPost.title,
+        BlogPost.slug,
+        BlogPost.excerpt,
+        BlogPost.created_at,
+        BlogPost.updated_at,
+        limit=settings.blog_feed_size,
+    )
+    async for row in _rows(q):
+        url = _blog_url(row.slug)
+        yield (
+            f"<entry><title>{escape(row.title)}</title><id>{escape(url)}</id><link href={quoteattr(url)}/>"
+            f"<published>{_utc(row.created_at).isoformat()}</published>"
+            f"<updated>{_utc(row.updated_at or row.created_at).isoformat()}</updated>"
+            f"<summary>{escape(row.excerpt or '')}</summary></entry>"
+        )
+    yield "</feed>\n"
+
+
+async def sitemap() -> AsyncIterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"<url><loc>{escape(_blog_url())}</loc></url>"
+    )
+    q = _published(BlogPost.slug, BlogPost.created_at, BlogPost.updated_at, limit=SITEMAP_MAX_URLS - 1)
+    async for row in _rows(q):
+        lastmod = _utc(row.updated_at or row.created_at).date().isoformat()
+        yield f"<url><loc>{escape(_blog_url(row.slug))}</loc><lastmod>{lastmod}</lastmod></url>"
+    yield "</urlset>\n"
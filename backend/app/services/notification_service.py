@@ -1,8 +1,11 @@
 """Notifications CRUD."""
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Page, keyset_page, offset_page
+from app.core.totals import totals
 from app.models.notification import Notification
+from app.services import notification_stream
 
 
 async def list_notifications(
@@ -11,17 +14,40 @@ async def list_notifications(
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
-) -> tuple[list[Notification], int]:
-    count_q = select(func.count()).select_from(Notification).where(Notification.user_id == user_id)
+    after: str | None = None,
+    before: str | None = None,
+    total_mode: str = "exact",
+) -> Page[Notification]:
+    filters = [Notification.user_id == user_id]
     if unread_only:
-        count_q = count_q.where(Notification.is_read == False)
-    total = (await db.execute(count_q)).scalar() or 0
-    q = select(Notification).where(Notification.user_id == user_id)
-    if unread_only:
-        q = q.where(Notification.is_read == False)
-    q = q.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+        filters.append(Notification.is_read == False)
+    q = select(Notification).where(*filters)
+    if skip and not (after or before):
+        page = await offset_page(db, q.order_by(Notification.created_at.desc(), Notification.id.desc()), skip, limit)
+    else:
+        page = await keyset_page(db, q, Notification.created_at, Notification.id, limit, after=after, before=before)
+    page.total = await totals.total(
+        db,
+        ("notifications", user_id, "unread" if unread_only else "all"),
+        select(func.count()).select_from(Notification).where(*filters),
+        total_mode,
+        incremental=True,
+    )
+    return page
+
+
+async def create_notification(
+    db: AsyncSession, user_id: int, title: str, message: str, link: str | None = None
+) -> Notification:
+    n = Notification(user_id=user_id, title=title, message=message, link=link)
+    db.add(n)
+    await db.flush()
+    await db.refresh(n)
+    notification_stream.publish_created(db, n)
+    totals.after_commit(
+        db, "notifications", adjust={("notifications", user_id, "all"): 1, ("notifications", user_id, "unread"): 1}
+    )
+    return n
 
 
 async def get_notification(db: AsyncSession, notification_id: int, user_id: int) -> Notification | None:
@@ -32,15 +58,21 @@ async def get_notification(db: AsyncSession, notification_id: int, user_id: int)
 
 
 async def mark_read(db: AsyncSession, notification: Notification) -> Notification:
+    was_unread = not notification.is_read
     notification.is_read = True
     await db.flush()
     await db.refresh(notification)
+    if was_unread:
+        totals.after_commit(db, "notifications", adjust={("notifications", notification.user_id, "unread"): -1})
     return notification
 
 
 async def mark_all_read(db: AsyncSession, user_id: int) -> int:
-    result = await db.execute(select(Notification).where(Notification.user_id == user_id, Notification.is_read == False))
-    for n in result.scalars().all():
-        n.is_read = True
-    await db.flush()
-    return 1
+    result = await db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    totals.after_commit(db, "notifications", invalidate=(("notifications", user_id, "unread"),))
+    return result.rowcount
@@ -0,0 +1,145 @@
+"""Live notification delivery: Server-Sent Events per user, fed by the pub/sub hub after each commit."""
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.principals import load_principal
+from app.core.pubsub import Hub, HubFull, LocalBroker, RedisBroker
+from app.database import AsyncSessionLocal, run_after_commit
+from app.models.notification import Notification
+from app.schemas.notification import NotificationResponse
+
+settings = get_settings()
+
+# Newest notifications re-read on a wake-up; more unseen than this and the client is told to resync
+WINDOW = 50
+RETRY_MS = 5000
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def _make_broker():
+    if settings.notification_broker == "redis":
+        return RedisBroker(settings.redis_url, "notifications")
+    return LocalBroker()
+
+
+hub = Hub(
+    _make_broker(),
+    queue_size=settings.notification_stream_queue_size,
+    max_subscribers=settings.notification_stream_max_connections,
+)
+
+
+def publish_created(db: AsyncSession, notification: Notification) -> None:
+    """Push the notification to its user's open streams once the transaction commits."""
+    message = {
+        "user_id": notification.user_id,
+        "notification": NotificationResponse.model_validate(notification).model_dump(mode="json"),
+    }
+    run_after_commit(db, lambda: hub.publish(message))
+
+
+def publish_range(lo: int, hi: int) -> None:
+    """Users with ids in [lo, hi] may have new notifications (a committed broadcast chunk)."""
+    hub.publish({"user_ids": [lo, hi]})
+
+
+def _event(payload: dict) -> str:
+    return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _newest(user_id: int, after_id: int, limit: int) -> list[Notification]:
+    # Short-lived session per query: a stream may stay open for hours
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Notification)
+            .where(Notification.user_id == user_id, Notification.id > after_id)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars())
+
+
+async def is_active(user_id: int) -> bool:
+    """Via the principal cache, so a deactivation (which drops the cached entry) is seen within a heartbeat."""
+    async with AsyncSessionLocal() as db:
+        principal = await load_principal(db, user_id)
+    return principal is not None and principal.is_active
+
+
+async def events(user_id: int, last_event_id: int | None) -> AsyncIterator[str]:
+    """The user's new notifications as SSE, with heartbeats; resumes after `last_event_id` when given.
+
+    Ids are assigned at insert but become visible at commit, so a late commit can have a lower id than one
+    already sent. Wake-ups therefore re-read the newest WINDOW rows and skip the ids already sent, rather
+    than asking only for ids above the last one.
+
+    The user is re-checked once per heartbeat interval; the stream ends once the account is deactivated.
+    """
+    try:
+        subscription = hub.subscribe(user_id)
+    except HubFull:
+        # Filled up after the route's capacity check; the client retries later
+        yield f"retry: {RETRY_MS * 6}\n\n"
+        return
+    metrics.inc("notification_stream.opened")
+    sent: set[int] = set()
+
+    def remember(ids: list[int]) -> None:
+        nonlocal sent
+        sent.update(ids)
+        if len(sent) > 2 * WINDOW:
+            sent = set(sorted(sent)[-WINDOW:])
+
+    async def catch_up() -> AsyncIterator[str]:
+        rows = await _newest(user_id, baseline, WINDOW)
+        fresh = [n for n in reversed(rows) if n.id not in sent]
+        if len(fresh) == WINDOW:
+            # Possibly more than one window behind: the client reloads its list instead
+            yield RESYNC
+        for n in fresh:
+            yield _event(NotificationResponse.model_validate(n).model_dump(mode="json"))
+        remember([n.id for n in fresh])
+
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if last_event_id is None:
+            newest = await _newest(user_id, 0, 1)
+            baseline = newest[0].id if newest else 0
+        else:
+            baseline = last_event_id
+            async for chunk in catch_up():
+                yield chunk
+        recheck_at = time.monotonic() + settings.notification_stream_heartbeat_seconds
+        while True:
+            if subscription.overflowed:
+                yield RESYNC
+                return
+            if time.monotonic() >= recheck_at:
+                if not await is_active(user_id):
+                    metrics.inc("notification_stream.closed_inactive")
+                    return
+                recheck_at = time.monotonic() + settings.notification_stream_heartbeat_seconds
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.notification_stream_heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection, and surfaces dead clients
+                yield ": heartbeat\n\n"
+                continue
+            payload = message.get("notification")
+            if payload is None:
+                async for chunk in catch_up():
+                    yield chunk
+            elif payload["id"] > baseline and payload["id"] not in sent:
+                yield _event(payload)
+                remember([payload["id"]])
+    finally:
+        hub.unsubscribe(subscription)
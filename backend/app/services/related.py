@@ -0,0 +1,261 @@
+"""Related posts: hashed TF-IDF vectors of published posts and a precomputed top-N neighbour list per post."""
+import asyncio
+import heapq
+import time
+import zlib
+from collections import Counter
+from collections.abc import Callable
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.database import AsyncSessionLocal, run_after_commit
+from app.models.blog import BlogPost
+from app.services.search_service import tokenize
+
+settings = get_settings()
+
+TITLE_WEIGHT = 2
+MIN_POSTS_FOR_MAX_DF = 50
+# Only a post's highest-weighted terms take part in similarity
+TERMS_PER_POST = 32
+# Rows scored per sparse product during a full build; bounds the build's peak memory
+BUILD_BLOCK = 512
+# Incrementally updated vectors are merged into the base matrix once this many have piled up
+MAX_DELTA = 256
+
+
+def _strongest_terms(m: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """Keep each row's k largest weights: the terms that characterise a post, and far sparser pair products."""
+    m = m.tocsr()
+    rows = np.repeat(np.arange(m.shape[0]), np.diff(m.indptr))
+    order = np.lexsort((-m.data, rows))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - m.indptr[rows[order]]
+    keep = rank < k
+    return sparse.csr_matrix((m.data[keep], (rows[keep], m.indices[keep])), shape=m.shape)
+
+
+def _normalize(m: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ m
+
+
+class RelatedIndex:
+    """L2-normalised TF-IDF rows over hashed terms, so cosine similarity is a sparse dot product.
+
+    A full build scores every pair in blocks. Afterwards a write re-vectorises one post, scores it against
+    the corpus with one sparse product, and patches the neighbour lists of the posts it is similar to.
+    Lists a post drops out of keep a stale entry until the next build (rebuilt periodically, see main.py).
+    """
+
+    def __init__(self, hash_bits: int = 18, top_n: int = 10, max_df: float = 0.5) -> None:
+        self.dim = 1 << hash_bits
+        self.top_n = top_n
+        self.max_df = max_df
+        self._df = np.zeros(self.dim, dtype=np.int64)
+        self._n_docs = 0
+        self._matrix = sparse.csr_matrix((0, self.dim), dtype=np.float32)
+        self._row_ids = np.zeros(0, dtype=np.int64)
+        self._row_of: dict[int, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        # Counts per post (column -> tf) so removal can undo its document frequencies
+        self._terms: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._delta: dict[int, sparse.csr_matrix] = {}
+        self._neighbours: dict[int, list[tuple[float, int]]] = {}
+
+    def _counts(self, title: str, content: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted hashed columns and their term counts (colliding terms share a column)."""
+        terms = Counter(tokenize(content))
+        for token in tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        mask = self.dim - 1
+        # crc32, not hash(): str hashing is salted per process, so workers would disagree on collisions
+        cols = np.fromiter((zlib.crc32(t.encode()) & mask for t in terms), dtype=np.int64, count=len(terms))
+        counts = np.fromiter(terms.values(), dtype=np.int64, count=len(terms))
+        unique, inverse = np.unique(cols, return_inverse=True)
+        return unique, np.bincount(inverse, weights=counts).astype(np.int64)
+
+    def _idf(self) -> np.ndarray:
+        n = max(self._n_docs, 1)
+        idf = np.log((1 + n) / (1 + self._df)) + 1.0
+        # Terms in most posts say nothing about relatedness and make every product dense (a handful of posts
+        # is too few to tell which terms those are)
+        if n >= MIN_POSTS_FOR_MAX_DF:
+            idf[self._df > self.max_df * n] = 0.0
+        return idf.astype(np.float32)
+
+    def _vector(self, cols: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> sparse.csr_matrix:
+        values = (1.0 + np.log(counts)).astype(np.float32) * idf[cols]
+        row = sparse.csr_matrix((values, (np.zeros(len(cols), dtype=np.int64), cols)), shape=(1, self.dim))
+        row.eliminate_zeros()
+        return _normalize(_strongest_terms(row, TERMS_PER_POST))
+
+    def build(self, docs: list[tuple[int, str, str]]) -> None:
+        """Vectorise (post_id, title, content) for every published post and score all pairs."""
+        self._terms = {post_id: self._counts(title, content) for post_id, title, content in docs}
+        self._n_docs = len(self._terms)
+        ids = np.fromiter(self._terms, dtype=np.int64, count=self._n_docs)
+        lengths = [len(cols) for cols, _ in self._terms.values()]
+        rows = np.repeat(np.arange(self._n_docs), lengths)
+        cols = np.concatenate([c for c, _ in self._terms.values()]) if docs else np.zeros(0, dtype=np.int64)
+        counts = np.concatenate([n for _, n in self._terms.values()]) if docs else np.zeros(0, dtype=np.int64)
+        self._df = np.bincount(cols, minlength=self.dim).astype(np.int64)
+        idf = self._idf()
+        tf = sparse.csr_matrix(
+            ((1.0 + np.log(counts)).astype(np.float32), (rows, cols)), shape=(self._n_docs, self.dim)
+        )
+        weighted = sparse.csr_matrix(tf.multiply(idf))
+        weighted.eliminate_zeros()
+        self._matrix = _normalize(_strongest_terms(weighted, TERMS_PER_POST)).tocsr()
+        self._row_ids = ids
+        self._row_of = {int(post_id): i for i, post_id in enumerate(ids)}
+        self._alive = np.ones(self._n_docs, dtype=bool)
+        self._delta = {}
+        self._neighbours = {}
+        transposed = self._matrix.T.tocsr()
+        for start in range(0, self._n_docs, BUILD_BLOCK):
+            block = (self._matrix[start : start + BUILD_BLOCK] @ transposed).tocsr()
+            for i in range(block.shape[0]):
+                lo, hi = block.indptr[i], block.indptr[i + 1]
+                row = start + i
+                self._neighbours[int(ids[row])] = self._top(block.data[lo:hi], block.indices[lo:hi], row)
+
+    def _top(self, scores: np.ndarray, rows: np.ndarray, own_row: int) -> list[tuple[float, int]]:
+        keep = (rows != own_row) & self._alive[rows] & (scores > 0)
+        scores, rows = scores[keep], rows[keep]
+        if len(scores) > self.top_n:
+            best = np.argpartition(-scores, self.top_n)[: self.top_n]
+            scores, rows = scores[best], rows[best]
+        order = np.argsort(-scores, kind="stable")
+        return [(float(scores[i]), int(self._row_ids[rows[i]])) for i in order]
+
+    def _similarities(self, vector: sparse.csr_matrix) -> dict[int, float]:
+        base = (self._matrix @ vector.T).tocoo()
+        out = {
+            int(self._row_ids[r]): float(s) for r, s in zip(base.row, base.data) if self._alive[r] and s > 0
+        }
+        if self._delta:
+            delta = (sparse.vstack(list(self._delta.values()), format="csr") @ vector.T).toarray().ravel()
+            out.update((post_id, float(score)) for post_id, score in zip(self._delta, delta) if score > 0)
+        return out
+
+    def _drop(self, post_id: int) -> None:
+        old = self._terms.pop(post_id, None)
+        if old is not None:
+            np.subtract.at(self._df, old[0], 1)
+            self._n_docs -= 1
+        row = self._row_of.pop(post_id, None)
+        if row is not None:
+            self._alive[row] = False
+        self._delta.pop(post_id, None)
+        # Other posts' lists may still name it; callers filter unpublished/deleted ids when loading rows
+        self._neighbours.pop(post_id, None)
+
+    def upsert(self, post_id: int, title: str, content: str) -> None:
+        self._drop(post_id)
+        cols, counts = self._counts(title, content)
+        self._terms[post_id] = (cols, counts)
+        np.add.at(self._df, cols, 1)
+        self._n_docs += 1
+        vector = self._vector(cols, counts, self._idf())
+        scores = self._similarities(vector)
+        self._delta[post_id] = vector
+        self._neighbours[post_id] = heapq.nlargest(self.top_n, ((s, other) for other, s in scores.items()))
+        # This post may now belong in (or have moved within) the lists of posts it is similar to
+        for other, score in scores.items():
+            neighbours = self._neighbours.get(other)
+            if neighbours is None:
+                continue
+            if any(n == post_id for _, n in neighbours):
+                neighbours[:] = [(s, n) for s, n in neighbours if n != post_id]
+            if len(neighbours) < self.top_n or score > neighbours[-1][0]:
+                neighbours.append((score, post_id))
+                neighbours.sort(reverse=True)
+                del neighbours[self.top_n :]
+        if len(self._delta) > MAX_DELTA:
+            self._compact()
+
+    def remove(self, post_id: int) -> None:
+        self._drop(post_id)
+
+    def _compact(self) -> None:
+        alive = np.flatnonzero(self._alive)
+        delta_ids = list(self._delta)
+        self._matrix = sparse.vstack([self._matrix[alive], *self._delta.values()], format="csr")
+        self._row_ids = np.concatenate([self._row_ids[alive], np.array(delta_ids, dtype=np.int64)])
+        self._row_of = {int(post_id): i for i, post_id in enumerate(self._row_ids)}
+        self._alive = np.ones(len(self._row_ids), dtype=bool)
+        self._delta = {}
+
+    def neighbours(self, post_id: int, limit: int | None = None) -> list[int]:
+        return [other for _, other in self._neighbours.get(post_id, ())[: limit or self.top_n]]
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+
+def _new_index() -> RelatedIndex:
+    return RelatedIndex(settings.related_hash_bits, settings.related_posts_count, settings.related_max_df)
+
+
+index = _new_index()
+# Writes that land while a rebuild runs, replayed onto the new index before it is swapped in
+_replay: list[Callable[[RelatedIndex], None]] | None = None
+
+
+async def rebuild() -> int:
+    """Build a fresh index off the event loop and swap it in; reads use the old one until then."""
+    global index, _replay
+    _replay = []
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(BlogPost.id, BlogPost.title, BlogPost.content)
+                .where(BlogPost.is_published == True)
+                .execution_options(yield_per=500)
+            )
+            docs = [(row.id, row.title, row.content) async for row in result]
+        fresh = _new_index()
+        start = time.perf_counter()
+        await asyncio.to_thread(fresh.build, docs)
+        metrics.observe("related_posts.build", time.perf_counter() - start)
+        for apply in _replay:
+            apply(fresh)
+        index = fresh
+    finally:
+        _replay = None
+    metrics.set_gauge("related_posts.indexed", len(index))
+    return len(index)
+
+
+def _apply(op: Callable[[RelatedIndex], None]) -> None:
+    op(index)
+    if _replay is not None:
+        _replay.append(op)
+
+
+def index_post(db: AsyncSession, post: BlogPost) -> None:
+    """Re-vectorise the post once the surrounding transaction commits (unpublished posts leave the index).
+
+    Runs on the event loop: one sparse product against the corpus (tens of milliseconds at 100k posts), plus
+    an O(N) merge every MAX_DELTA writes. Post writes are admin actions, rare enough to keep it simple.
+    """
+    post_id, title, content, published = post.id, post.title, post.content, post.is_published
+    if published:
+        run_after_commit(db, lambda: _apply(lambda idx: idx.upsert(post_id, title, content)))
+    else:
+        run_after_commit(db, lambda: _apply(lambda idx: idx.remove(post_id)))
+
+
+def remove_post(db: AsyncSession, post_id: int) -> None:
+    run_after_commit(db, lambda: _apply(lambda idx: idx.remove(post_id)))
+
+
+def related_ids(post_id: int, limit: int | None = None) -> list[int]:
+    return index.neighbours(post_id, limit)
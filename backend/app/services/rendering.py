@@ -0,0 +1,61 @@
+"""Blog content rendering: Markdown to sanitized HTML plus reading metadata, done once per edit."""
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+
+import markdown
+import nh3
+from markdown.extensions.toc import TocExtension
+
+# Bump when the pipeline's output changes; stored hashes then stop matching and posts re-render
+RENDERER_VERSION = 1
+WORDS_PER_MINUTE = 230
+
+# nh3's defaults plus heading ids (TOC anchors) and code language classes
+_ATTRIBUTES = {
+    **{tag: set(attrs) for tag, attrs in nh3.ALLOWED_ATTRIBUTES.items()},
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+    "code": {"class"},
+}
+_WORD = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedContent:
+    html: str
+    toc: list[dict]
+    word_count: int
+    reading_time_minutes: int
+    content_hash: str
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(f"{RENDERER_VERSION}:{content}".encode()).hexdigest()
+
+
+def _flatten_toc(tokens: list[dict]) -> list[dict]:
+    out = []
+    for token in tokens:
+        out.append({"level": token["level"], "id": token["id"], "title": html.unescape(token["name"])})
+        out.extend(_flatten_toc(token["children"]))
+    return out
+
+
+def render(content: str) -> RenderedContent:
+    # nl2br keeps single newlines as line breaks, which is how posts were displayed before server rendering
+    md = markdown.Markdown(extensions=["extra", "sane_lists", "nl2br", TocExtension(toc_depth="1-4")])
+    body = nh3.clean(
+        md.convert(content),
+        attributes=_ATTRIBUTES,
+        url_schemes={"http", "https", "mailto"},
+        link_rel="noopener noreferrer nofollow",
+    )
+    words = len(_WORD.findall(html.unescape(nh3.clean(body, tags=set()))))
+    return RenderedContent(
+        html=body,
+        toc=_flatten_toc(md.toc_tokens),
+        word_count=words,
+        reading_time_minutes=max(1, round(words / WORDS_PER_MINUTE)),
+        content_hash=content_hash(content),
+    )
@@ -0,0 +1,162 @@
+"""Blog post revision history: compressed line deltas between versions, with a full snapshot every N revisions."""
+import difflib
+import json
+import zlib
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.blog import BlogPost, BlogPostRevision
+
+settings = get_settings()
+
+COMPRESSION_LEVEL = 6
+_COPY, _INSERT = 0, 1
+
+
+@dataclass
+class Version:
+    number: int
+    title: str
+    content: str
+
+
+def make_delta(old: str, new: str) -> list:
+    """Line operations turning `old` into `new`: [0, start, end] copies old lines, [1, text] inserts text."""
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    ops: list = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([_COPY, i1, i2])
+        elif j2 > j1:
+            ops.append([_INSERT, "".join(b[j1:j2])])
+    return ops
+
+
+def apply_delta(old: str, ops: list) -> str:
+    lines = old.splitlines(keepends=True)
+    out = []
+    for op in ops:
+        if op[0] == _COPY:
+            out.extend(lines[op[1] : op[2]])
+        else:
+            out.append(op[1])
+    return "".join(out)
+
+
+def pack(value: str | list) -> bytes:
+    raw = value.encode() if isinstance(value, str) else json.dumps(value, separators=(",", ":")).encode()
+    return zlib.compress(raw, COMPRESSION_LEVEL)
+
+
+def unpack_snapshot(data: bytes) -> str:
+    return zlib.decompress(data).decode()
+
+
+def unpack_delta(data: bytes) -> list:
+    return json.loads(zlib.decompress(data))
+
+
+async def _latest(db: AsyncSession, post_id: int) -> int:
+    result = await db.execute(select(func.max(BlogPostRevision.number)).where(BlogPostRevision.post_id == post_id))
+    return result.scalar_one() or 0
+
+
+def _add(
+    db: AsyncSession, post_id: int, number: int, title: str, content: str, previous: str | None, author_id: int | None
+) -> None:
+    interval = max(settings.blog_revision_snapshot_interval, 1)
+    snapshot = previous is None or (number - 1) % interval == 0
+    db.add(
+        BlogPostRevision(
+            post_id=post_id,
+            number=number,
+            title=title,
+            is_snapshot=snapshot,
+            data=pack(content if snapshot else make_delta(previous, content)),
+            content_size=len(content.encode()),
+            author_id=author_id,
+        )
+    )
+
+
+def record_created(db: AsyncSession, post: BlogPost, author_id: int | None) -> None:
+    _add(db, post.id, 1, post.title, post.content, None, author_id)
+
+
+async def record_edit(
+    db: AsyncSession, post: BlogPost, old_title: str, old_content: str, author_id: int | None
+) -> None:
+    """Store the post's new version as a delta from the one it replaced (no-op if neither title nor content moved).
+
+    The caller holds the post's row lock (see get_post_by_id(for_update=True)), so `old_content` is the latest
+    revision and no concurrent edit can take the next number.
+    """
+    if post.title == old_title and post.content == old_content:
+        return
+    latest = await _latest(db, post.id)
+    if latest == 0:
+        # Post predates revision history: its pre-edit state becomes revision 1
+        _add(db, post.id, 1, old_title, old_content, None, None)
+        latest = 1
+    _add(db, post.id, latest + 1, post.title, post.content, old_content, author_id)
+
+
+async def list_revisions(db: AsyncSession, post_id: int) -> list:
+    result = await db.execute(
+        select(
+            BlogPostRevision.number,
+            BlogPostRevision.title,
+            BlogPostRevision.is_snapshot,
+            BlogPostRevision.content_size,
+            func.length(BlogPostRevision.data).label("stored_size"),
+            BlogPostRevision.author_id,
+            BlogPostRevision.created_at,
+        )
+        .where(BlogPostRevision.post_id == post_id)
+        .order_by(BlogPostRevision.number.desc())
+    )
+    return list(result.all())
+
+
+async def get_version(db: AsyncSession, post_id: int, number: int) -> Version | None:
+    """Rebuild a version from the nearest snapshot at or before it plus the deltas in between (one query)."""
+    base = (
+        select(func.max(BlogPostRevision.number))
+        .where(
+            BlogPostRevision.post_id == post_id,
+            BlogPostRevision.is_snapshot == True,
+            BlogPostRevision.number <= number,
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(BlogPostRevision.number, BlogPostRevision.title, BlogPostRevision.is_snapshot, BlogPostRevision.data)
+        .where(
+            BlogPostRevision.post_id == post_id,
+            BlogPostRevision.number >= base,
+            BlogPostRevision.number <= number,
+        )
+        .order_by(BlogPostRevision.number)
+    )
+    rows = result.all()
+    if not rows or rows[-1].number != number:
+        return None
+    content = ""
+    for row in rows:
+        content = unpack_snapshot(row.data) if row.is_snapshot else apply_delta(content, unpack_delta(row.data))
+    return Version(number=number, title=rows[-1].title, content=content)
+
+
+def diff(old: Version, new: Version, context: int = 3) -> str:
+    return "".join(
+        difflib.unified_diff(
+            old.content.splitlines(keepends=True),
+            new.content.splitlines(keepends=True),
+            fromfile=f"revision {old.number}",
+            tofile=f"revision {new.number}",
+            n=context,
+        )
+    )
@@ -0,0 +1,314 @@
+"""Blog full-text search: MySQL FULLTEXT in boolean mode, or an in-process inverted index for local runs."""
+import bisect
+import html
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import Float, func, literal, or_, select, type_coerce
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.database import AsyncSessionLocal, engine, run_after_commit
+from app.models.blog import BlogPost
+
+settings = get_settings()
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_QUERY_RE = re.compile(r'"([^"]+)"|(\w+)\*|(\w+)', re.UNICODE)
+TITLE_WEIGHT = 3
+# InnoDB's default FULLTEXT stopwords (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD): never indexed
+INNODB_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or that the this to was what when where"
+    " who will with und www".split()
+)
+
+
+def tokenize(value: str) -> list[str]:
+    return _WORD_RE.findall(value.lower())
+
+
+@dataclass
+class SearchQuery:
+    terms: list[str] = field(default_factory=list)
+    prefixes: list[str] = field(default_factory=list)
+    phrases: list[list[str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.prefixes or self.phrases)
+
+    def to_boolean_mode(self) -> str:
+        """All parts are required (AND), matching the old substring-search semantics.
+
+        Only words the FULLTEXT index holds: a required short word or stopword would match nothing, so those
+        parts are left to unindexed().
+        """
+        parts = [f"+{t}" for t in self.terms if _indexed(t)]
+        parts += [f"+{p}*" for p in self.prefixes if len(p) >= settings.search_min_token_size]
+        parts += ['+"' + " ".join(words) + '"' for words in self.phrases if all(map(_indexed, words))]
+        return " ".join(parts)
+
+    def unindexed(self) -> list[str]:
+        """LIKE patterns (backslash-escaped) for the required parts to_boolean_mode() leaves out."""
+        patterns = [_like(t) for t in self.terms if not _indexed(t)]
+        patterns += [_like(p) for p in self.prefixes if len(p) < settings.search_min_token_size]
+        # A phrase's words in order, whatever separates them
+        patterns += [_like(*words) for words in self.phrases if not all(map(_indexed, words))]
+        return patterns
+
+
+def _indexed(word: str) -> bool:
+    return len(word) >= settings.search_min_token_size and word not in INNODB_STOPWORDS
+
+
+def _like(*words: str) -> str:
+    escaped = (w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for w in words)
+    return "%" + "%".join(escaped) + "%"
+
+
+def parse_query(raw: str) -> SearchQuery:
+    """`"exact phrase"`, `prefix*` and plain terms; everything else is dropped."""
+    query = SearchQuery()
+    for phrase, prefix, term in _QUERY_RE.findall(raw):
+        if phrase:
+            words = tokenize(phrase)
+            if len(words) == 1:
+                query.terms.append(words[0])
+            elif words:
+                query.phrases.append(words)
+        elif prefix:
+            query.prefixes.append(prefix.lower())
+        elif term:
+            query.terms.append(term.lower())
+    return query
+
+
+def highlight(content: str, query: SearchQuery, width: int = 160) -> str:
+    """HTML-escaped excerpt around the first match with matches wrapped in <mark>."""
+    patterns = [re.escape(t) + r"\b" for t in query.terms]
+    patterns += [re.escape(p) + r"\w*" for p in query.prefixes]
+    patterns += [r"\W+".join(re.escape(w) for w in words) + r"\b" for words in query.phrases]
+    if not patterns:
+        return html.escape(content[:width])
+    matcher = re.compile(r"\b(?:" + "|".join(patterns) + ")", re.IGNORECASE | re.UNICODE)
+    first = matcher.search(content)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    end = min(len(content), start + width)
+    window = content[start:end]
+    out, last = [], 0
+    for m in matcher.finditer(window):
+        out.append(html.escape(window[last:m.start()]))
+        out.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        last = m.end()
+    out.append(html.escape(window[last:]))
+    return ("…" if start > 0 else "") + "".join(out) + ("…" if end < len(content) else "")
+
+
+class MySQLFullTextBackend:
+    """Relies on the InnoDB FULLTEXT index on (title, content); InnoDB keeps it in sync on every write."""
+
+    def _filters(self, query: SearchQuery, public_only: bool):
+        boolean = query.to_boolean_mode()
+        filters = []
+        if boolean:
+            against = match(BlogPost.title, BlogPost.content, against=boolean).in_boolean_mode()
+            relevance = type_coerce(against, Float)
+            filters.append(relevance > 0)
+        else:
+            relevance = literal(0.0, Float)
+        for pattern in query.unindexed():
+            filters.append(or_(BlogPost.title.like(pattern, escape="\\"), BlogPost.content.like(pattern, escape="\\")))
+        if public_only:
+            filters.append(BlogPost.is_published == True)
+        return relevance, filters
+
+    async def search(
+        self, db: AsyncSession, query: SearchQuery, public_only: bool, skip: int, limit: int
+    ) -> list[tuple[int, float]]:
+        relevance, filters = self._filters(query, public_only)
+        rows = await db.execute(
+            select(BlogPost.id, relevance.label("relevance"))
+            .where(*filters)
+            .order_by(relevance.desc(), BlogPost.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [(row.id, row.relevance) for row in rows]
+
+    async def count(self, db: AsyncSession, query: SearchQuery, public_only: bool) -> int:
+        _, filters = self._filters(query, public_only)
+        return (await db.execute(select(func.count()).select_from(BlogPost).where(*filters))).scalar() or 0
+
+    def index_post(self, post: BlogPost) -> None:
+        pass
+
+    def remove_post(self, post_id: int) -> None:
+        pass
+
+
+class MemorySearchBackend:
+    """Positional inverted index with BM25 ranking, rebuilt at startup and updated on each post write."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: dict[str, dict[int, list[int]]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self._doc_len: dict[int, int] = {}
+        self._published: dict[int, bool] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+
+    def _add(self, post_id: int, title: str, content: str, is_published: bool) -> None:
+        self._remove(post_id)
+        # Title tokens are repeated so title hits outrank body hits; a position gap stops phrases spanning both
+        tokens = tokenize(title) * TITLE_WEIGHT
+        positions: dict[str, list[int]] = defaultdict(list)
+        for i, token in enumerate(tokens):
+            positions[token].append(i)
+        offset = len(tokens) + 1
+        for i, token in enumerate(tokenize(content)):
+            positions[token].append(offset + i)
+        for token, pos in positions.items():
+            if token not in self._postings:
+                self._vocabulary_dirty = True
+            self._postings[token][post_id] = pos
+        self._doc_terms[post_id] = set(positions)
+        self._doc_len[post_id] = sum(len(p) for p in positions.values())
+        self._published[post_id] = is_published
+
+    def _remove(self, post_id: int) -> None:
+        for token in self._doc_terms.pop(post_id, ()):
+            docs = self._postings.get(token)
+            if docs is not None:
+                docs.pop(post_id, None)
+                if not docs:
+                    del self._postings[token]
+                    self._vocabulary_dirty = True
+        self._doc_len.pop(post_id, None)
+        self._published.pop(post_id, None)
+
+    def index_post(self, post: BlogPost) -> None:
+        self._add(post.id, post.title, post.content, post.is_published)
+
+    def remove_post(self, post_id: int) -> None:
+        self._remove(post_id)
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        out = []
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            out.append(self._vocabulary[i])
+            i += 1
+        return out
+
+    def _phrase_docs(self, words: list[str]) -> set[int]:
+        candidates = set.intersection(*(set(self._postings.get(w, {})) for w in words))
+        matched = set()
+        for doc in candidates:
+            starts = set(self._postings[words[0]][doc])
+            for n, word in enumerate(words[1:], start=1):
+                starts &= {p - n for p in self._postings[word][doc]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def _bm25(self, token: str, doc: int, avg_len: float) -> float:
+        docs = self._postings.get(token, {})
+        n = len(self._doc_len)
+        idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+        tf = len(docs.get(doc, ()))
+        norm = tf + self.k1 * (1 - self.b + self.b * self._doc_len[doc] / avg_len)
+        return idf * tf * (self.k1 + 1) / norm if tf else 0.0
+
+    def _match(self, query: SearchQuery, public_only: bool) -> list[tuple[int, float]]:
+        groups: list[tuple[set[int], list[str]]] = []
+        for term in query.terms:
+            groups.append((set(self._postings.get(term, {})), [term]))
+        for prefix in query.prefixes:
+            expanded = self._expand_prefix(prefix)
+            groups.append((set().union(*(self._postings[t] for t in expanded)) if expanded else set(), expanded))
+        for words in query.phrases:
+            groups.append((self._phrase_docs(words), words))
+        if not groups:
+            return []
+        docs = set.intersection(*(g[0] for g in groups))
+        if public_only:
+            docs = {d for d in docs if self._published.get(d)}
+        avg_len = sum(self._doc_len.values()) / max(len(self._doc_len), 1)
+        scored = [
+            (doc, sum(self._bm25(t, doc, avg_len) for _, tokens in groups for t in tokens))
+            for doc in docs
+        ]
+        scored.sort(key=lambda x: (x[1], x[0]), reverse=True)
+        return scored
+
+    async def search(
+        self, db: AsyncSession, query: SearchQuery, public_only: bool, skip: int, limit: int
+    ) -> list[tuple[int, float]]:
+        return self._match(query, public_only)[skip : skip + limit]
+
+    async def count(self, db: AsyncSession, query: SearchQuery, public_only: bool) -> int:
+        return len(self._match(query, public_only))
+
+    async def rebuild(self) -> int:
+        self._reset()
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                select(BlogPost.id, BlogPost.title, BlogPost.content, BlogPost.is_published).execution_options(
+                    yield_per=500
+                )
+            )
+            async for row in result:
+                self._add(row.id, row.title, row.content, row.is_published)
+        return len(self._doc_len)
+
+
+def _make_backend():
+    kind = settings.search_backend
+    if kind == "auto":
+        # FULLTEXT indexes the stored form, which for compressed content is base64
+        fulltext = engine.dialect.name == "mysql" and not settings.blog_content_compression
+        kind = "mysql" if fulltext else "memory"
+    return MySQLFullTextBackend() if kind == "mysql" else MemorySearchBackend()
+
+
+backend = _make_backend()
+
+
+async def startup() -> None:
+    if isinstance(backend, MemorySearchBackend):
+        await backend.rebuild()
+
+
+async def search_posts(
+    db: AsyncSession, query: SearchQuery, public_only: bool, skip: int, limit: int
+) -> list[tuple[int, float]]:
+    """(post id, relevance) pairs, most relevant first."""
+    with metrics.timer("blog_search.latency"):
+        return await backend.search(db, query, public_only, skip, limit)
+
+
+async def count_posts(db: AsyncSession, query: SearchQuery, public_only: bool) -> int:
+    return await backend.count(db, query, public_only)
+
+
+def index_post(db: AsyncSession, post: BlogPost) -> None:
+    """Re-index the post once the surrounding transaction commits."""
+    run_after_commit(db, lambda: backend.index_post(post))
+
+
+def remove_post(db: AsyncSession, post_id: int) -> None:
+    run_after_commit(db, lambda: backend.remove_post(post_id))
@@ -3,6 +3,8 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.principals import invalidate_principal
+from app.core.totals import totals
 from app.models.setting import UserSetting
 from app.models.user import User
 from app.schemas.setting import SettingUpdate
@@ -13,11 +15,11 @@ async def get_setting_for_user(db: AsyncSession, user_id: int) -> UserSetting |
     return result.scalar_one_or_none()
 
 
-async def get_or_create_setting(db: AsyncSession, user: User) -> UserSetting:
-    setting = await get_setting_for_user(db, user.id)
+async def get_or_create_setting(db: AsyncSession, user_id: int) -> UserSetting:
+    setting = await get_setting_for_user(db, user_id)
     if setting:
         return setting
-    setting = UserSetting(user_id=user.id)
+    setting = UserSetting(user_id=user_id)
     db.add(setting)
     await db.flush()
     await db.refresh(setting)
@@ -42,5 +44,7 @@ async def update_setting(db: AsyncSession, user: User, setting: UserSetting, dat
     if data.avatar_url is not None:
         user.avatar_url = data.avatar_url
     await db.flush()
+    invalidate_principal(db, user.id)
+    totals.after_commit(db, "users")
     await db.refresh(setting)
     return setting
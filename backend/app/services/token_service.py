@@ -0,0 +1,123 @@
+"""Single-use verification/invite tokens backed by the verification_tokens ledger."""
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Connection, delete, insert, inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.security import create_verification_token, decode_token
+from app.database import AsyncSessionLocal
+from app.models.verification_token import TokenType, VerificationToken
+
+settings = get_settings()
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def migrate_legacy_tokens(conn: Connection) -> None:
+    """Startup: replace the raw `token` column of tables created before hashing with `token_hash`.
+
+    create_all() and add_missing_columns() never drop columns, and inserts fail while the old NOT NULL `token`
+    column remains. Outstanding tokens stay redeemable: their digests are computed from the stored values.
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table("verification_tokens"):
+        return
+    columns = {column["name"] for column in inspector.get_columns("verification_tokens")}
+    if "token" not in columns:
+        return
+    if "token_hash" not in columns:
+        conn.execute(text("ALTER TABLE verification_tokens ADD COLUMN token_hash VARCHAR(64) NULL"))
+    # '' covers a token_hash column already added (NOT NULL, so defaulted) by add_missing_columns()
+    rows = conn.execute(
+        text("SELECT id, token FROM verification_tokens WHERE token_hash IS NULL OR token_hash = ''")
+    ).all()
+    if rows:
+        conn.execute(
+            text("UPDATE verification_tokens SET token_hash = :token_hash WHERE id = :id"),
+            [{"token_hash": token_digest(row.token), "id": row.id} for row in rows],
+        )
+    conn.execute(text("ALTER TABLE verification_tokens DROP COLUMN token"))
+    conn.execute(text("ALTER TABLE verification_tokens MODIFY token_hash VARCHAR(64) NOT NULL"))
+    unique = {ix["name"] for ix in inspector.get_indexes("verification_tokens") if ix.get("unique")}
+    if "token_hash" not in unique:
+        conn.execute(text("CREATE UNIQUE INDEX token_hash ON verification_tokens (token_hash)"))
+
+
+async def issue_token(db: AsyncSession, email: str, token_type: TokenType) -> str:
+    return (await issue_tokens(db, [email], token_type))[email]
+
+
+async def issue_tokens(db: AsyncSession, emails: list[str], token_type: TokenType) -> dict[str, str]:
+    """One token per email, recorded in a single multi-row INSERT."""
+    minutes = (
+        settings.verification_token_expire_minutes
+        if token_type == TokenType.SIGNUP_VERIFY
+        else settings.invite_token_expire_minutes
+    )
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    tokens = {email: create_verification_token(email, token_type.value) for email in emails}
+    if tokens:
+        await db.execute(
+            insert(VerificationToken),
+            [
+                {"token_hash": token_digest(token), "email": email, "token_type": token_type, "expires_at": expires_at}
+                for email, token in tokens.items()
+            ],
+        )
+    return tokens
+
+
+async def consume_token(db: AsyncSession, token: str, token_types: tuple[TokenType, ...]) -> str | None:
+    """Mark the token used and return its email; None if invalid, expired or already used."""
+    payload = decode_token(token)
+    if not payload or payload.get("type") not in {t.value for t in token_types}:
+        return None
+    email = payload.get("email")
+    if not email:
+        return None
+    now = datetime.now(timezone.utc)
+    # One conditional UPDATE: of two concurrent redemptions exactly one sees rowcount == 1
+    result = await db.execute(
+        update(VerificationToken)
+        .where(
+            VerificationToken.token_hash == token_digest(token),
+            VerificationToken.used_at.is_(None),
+            VerificationToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    return email
+
+
+async def sweep_expired_tokens(batch_size: int | None = None) -> int:
+    """Delete expired rows in bounded batches (used rows are kept until expiry so replays stay rejected)."""
+    batch_size = batch_size or settings.verification_token_sweep_batch_size
+    now = datetime.now(timezone.utc)
+    deleted = 0
+    async with AsyncSessionLocal() as session:
+        while True:
+            ids = (
+                await session.execute(
+                    select(VerificationToken.id)
+                    .where(VerificationToken.expires_at < now)
+                    .order_by(VerificationToken.expires_at)
+                    .limit(batch_size)
+                )
+            ).scalars().all()
+            if not ids:
+                break
+            await session.execute(delete(VerificationToken).where(VerificationToken.id.in_(ids)))
+            await session.commit()
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                break
+    metrics.inc("verification_tokens.swept", deleted)
+    return deleted
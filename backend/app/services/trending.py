@@ -0,0 +1,135 @@
+"""Trending posts: exponentially decayed view scores kept for the top posts only, snapshotted to the DB."""
+import heapq
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, select
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.database import AsyncSessionLocal
+from app.models.blog import BlogPost, BlogTrendingScore
+
+settings = get_settings()
+
+# Rebase before weights grow past float range (2**64 is far from it, and rebasing is cheap)
+_MAX_EXPONENT = 64.0
+
+
+class TrendingRanking:
+    """Forward decay: a view at time t adds 2**((t - epoch) / half_life), so old scores never need touching.
+
+    Every score shares the same epoch, so raw values compare directly; dividing by the weight of "now" gives
+    the decayed score. When more than `capacity` posts are tracked the weakest are dropped, which only affects
+    posts that were never close to the top.
+    """
+
+    def __init__(self, half_life_seconds: float, capacity: int) -> None:
+        self.half_life = half_life_seconds
+        self.capacity = capacity
+        self._epoch = time.time()
+        self._scores: dict[int, float] = {}
+
+    def _weight(self, at: float) -> float:
+        exponent = (at - self._epoch) / self.half_life
+        if exponent > _MAX_EXPONENT:
+            self._rebase(at)
+            exponent = 0.0
+        return 2.0**exponent
+
+    def _rebase(self, at: float) -> None:
+        factor = 2.0 ** (-(at - self._epoch) / self.half_life)
+        self._scores = {post_id: score * factor for post_id, score in self._scores.items() if score * factor > 0}
+        self._epoch = at
+
+    def record(self, post_id: int, n: int = 1, at: float | None = None) -> None:
+        self._scores[post_id] = self._scores.get(post_id, 0.0) + n * self._weight(time.time() if at is None else at)
+        if len(self._scores) > self.capacity:
+            # Drop down to 90% so pruning runs once per many new posts rather than on every view
+            keep = heapq.nlargest(int(self.capacity * 0.9), self._scores.items(), key=lambda kv: kv[1])
+            self._scores = dict(keep)
+            metrics.inc("trending.pruned")
+
+    def discard(self, post_id: int) -> None:
+        self._scores.pop(post_id, None)
+
+    def top(self, k: int, at: float | None = None) -> list[tuple[int, float]]:
+        """The k highest (post_id, decayed score) pairs."""
+        now = self._weight(time.time() if at is None else at)
+        best = heapq.nlargest(k, self._scores.items(), key=lambda kv: kv[1])
+        return [(post_id, score / now) for post_id, score in best]
+
+    def load(self, rows: list[tuple[int, float, float]]) -> None:
+        """Merge (post_id, decayed score, as-of timestamp) snapshots back into the ranking."""
+        for post_id, score, at in rows:
+            self._scores[post_id] = self._scores.get(post_id, 0.0) + score * self._weight(at)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+ranking = TrendingRanking(settings.trending_half_life_hours * 3600, settings.trending_capacity)
+
+
+def record_view(post_id: int, n: int = 1) -> None:
+    ranking.record(post_id, n)
+
+
+def discard(post_id: int) -> None:
+    ranking.discard(post_id)
+
+
+def top(k: int) -> list[tuple[int, float]]:
+    return ranking.top(k)
+
+
+async def persist() -> int:
+    """Replace the stored snapshot with the current ranking (a few hundred rows at most).
+
+    With several workers the last one to persist wins; each restores that snapshot and adds its own views.
+    """
+    now = time.time()
+    scored_at = datetime.fromtimestamp(now, timezone.utc)
+    rows = [
+        {"post_id": post_id, "score": score, "scored_at": scored_at}
+        for post_id, score in ranking.top(len(ranking), at=now)
+        if score >= 1e-6
+    ]
+    async with AsyncSessionLocal() as db:
+        if rows:
+            # Posts deleted meanwhile (possibly on another worker) would fail the foreign key; the shared lock
+            # keeps the surviving ones from being deleted before this transaction commits
+            existing = set(
+                (
+                    await db.execute(
+                        select(BlogPost.id)
+                        .where(BlogPost.id.in_([row["post_id"] for row in rows]))
+                        .with_for_update(read=True)
+                    )
+                ).scalars()
+            )
+            for row in rows:
+                if row["post_id"] not in existing:
+                    ranking.discard(row["post_id"])
+            rows = [row for row in rows if row["post_id"] in existing]
+        await db.execute(delete(BlogTrendingScore))
+        if rows:
+            await db.execute(insert(BlogTrendingScore), rows)
+        await db.commit()
+    metrics.set_gauge("trending.tracked", len(rows))
+    return len(rows)
+
+
+async def restore() -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(BlogTrendingScore.post_id, BlogTrendingScore.score, BlogTrendingScore.scored_at)
+        )
+        rows = [(r.post_id, r.score, _timestamp(r.scored_at)) for r in result]
+    ranking.load(rows)
+    return len(rows)
+
+
+def _timestamp(value: datetime) -> float:
+    # MySQL DATETIME comes back naive; stored values are UTC
+    return (value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value).timestamp()
@@ -0,0 +1,250 @@
+"""Bulk user import: streamed CSV/NDJSON records, created in chunks with set-based checks and multi-row INSERTs."""
+import asyncio
+import codecs
+import csv
+import json
+import time
+from collections.abc import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.email import send_invite_email
+from app.core.hashing import hasher
+from app.core.metrics import metrics
+from app.core.totals import totals
+from app.models.setting import UserSetting
+from app.models.user import User
+from app.models.verification_token import TokenType
+from app.schemas.user import UserImportResponse, UserImportResult, UserImportRow
+from app.services import token_service, user_search
+
+settings = get_settings()
+
+# A record is a dict of fields, or an error message for a line that could not be parsed
+Records = AsyncIterator[tuple[int, dict | str]]
+_invite_tasks: set[asyncio.Task] = set()
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole is unusable (e.g. a CSV without an email column)."""
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    number = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            number += 1
+            yield number, line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield number + 1, buffer.rstrip("\r")
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> Records:
+    """Header row first; one record per line (quoted fields may not contain line breaks)."""
+    header: list[str] | None = None
+    async for number, line in _lines(chunks):
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if "email" not in header:
+                raise ImportFormatError("CSV header must include an email column")
+            continue
+        yield number, dict(zip(header, values))
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> Records:
+    async for number, line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, "Invalid JSON"
+            continue
+        yield number, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def _validate(record: dict | str) -> tuple[UserImportRow | None, str | None]:
+    if isinstance(record, str):
+        return None, record
+    cleaned = {k: v.strip() if isinstance(v, str) else v for k, v in record.items()}
+    try:
+        return UserImportRow.model_validate({k: v for k, v in cleaned.items() if v not in ("", None)}), None
+    except ValidationError as exc:
+        return None, "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors())
+
+
+async def _existing(db: AsyncSession, emails: list[str]) -> set[str]:
+    result = await db.execute(select(User.email).where(User.email.in_(emails)))
+    return {email.lower() for email in result.scalars()}
+
+
+async def _hash_all(passwords: list[str | None]) -> list[str | None]:
+    # A few hashing slots at a time, so logins sharing the pool are not shed while an import runs
+    slots = asyncio.Semaphore(settings.user_import_hash_concurrency)
+
+    async def one(password: str | None) -> str | None:
+        if password is None:
+            return None
+        async with slots:
+            return await hasher.hash(password, wait=True)
+
+    return list(await asyncio.gather(*(one(p) for p in passwords)))
+
+
+async def _insert(
+    db: AsyncSession, rows: list[UserImportRow], hashes: list[str | None], send_invites: bool
+) -> tuple[dict[str, int], dict[str, str]]:
+    """Users, their default settings and (optionally) invite tokens: one multi-row statement each."""
+    emails = [row.email for row in rows]
+    await db.execute(
+        insert(User),
+        [
+            {
+                "email": row.email,
+                "hashed_password": hashed,
+                "full_name": row.full_name or row.email.split("@")[0],
+                "role": row.role,
+                "is_verified": False,
+                "is_active": True,
+            }
+            for row, hashed in zip(rows, hashes)
+        ],
+    )
+    await db.execute(
+        insert(UserSetting).from_select(["user_id"], select(User.id).where(User.email.in_(emails)))
+    )
+    result = await db.execute(select(User.email, User.id).where(User.email.in_(emails)))
+    ids = {email.lower(): user_id for email, user_id in result}
+    # Core inserts skip the ORM flush hook that maintains the search trigrams
+    await user_search.index_users(db, [(ids[row.email.lower()], row.email, row.full_name) for row in rows])
+    tokens = await token_service.issue_tokens(db, emails, TokenType.INVITE) if send_invites else {}
+    totals.after_commit(db, "users", adjust={("users", "all"): len(rows)})
+    await db.commit()
+    return ids, tokens
+
+
+def _queue_invites(tokens: dict[str, str], inviter_name: str) -> None:
+    async def send() -> None:
+        sent = 0
+        for email, token in tokens.items():
+            # SendGrid's client is synchronous
+            if await asyncio.to_thread(send_invite_email, email, token, inviter_name):
+                sent += 1
+        metrics.inc("user_import.invites_sent", sent)
+
+    task = asyncio.create_task(send(), name="user-import-invites")
+    _invite_tasks.add(task)
+    task.add_done_callback(_invite_tasks.discard)
+
+
+class _Report:
+    def __init__(self) -> None:
+        self.rows: list[UserImportResult] = []
+        self.invites = 0
+        self.hash_seconds = 0.0
+        self.insert_seconds = 0.0
+
+    def add(self, line: int, email: str | None, status: str, **extra) -> None:
+        self.rows.append(UserImportResult(line=line, email=email, status=status, **extra))
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.rows if r.status == status)
+
+
+async def _import_chunk(
+    db: AsyncSession, chunk: list[tuple[int, UserImportRow]], report: _Report, send_invites: bool, inviter: str
+) -> None:
+    taken = await _existing(db, [row.email for _, row in chunk])
+    # End the read transaction: hashing takes seconds and nothing should stay open across it
+    await db.commit()
+    fresh = [(line, row) for line, row in chunk if row.email.lower() not in taken]
+    for line, row in chunk:
+        if row.email.lower() in taken:
+            report.add(line, row.email, "exists")
+    if not fresh:
+        return
+    start = time.perf_counter()
+    hashes = await _hash_all([row.password for _, row in fresh])
+    report.hash_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        ids, tokens = await _insert(db, [row for _, row in fresh], hashes, send_invites)
+    except IntegrityError:
+        # Someone signed up with one of these emails after the check: recheck and retry once
+        await db.rollback()
+        taken = await _existing(db, [row.email for _, row in fresh])
+        keep = [i for i, (_, row) in enumerate(fresh) if row.email.lower() not in taken]
+        for line, row in fresh:
+            if row.email.lower() in taken:
+                report.add(line, row.email, "exists")
+        fresh, hashes = [fresh[i] for i in keep], [hashes[i] for i in keep]
+        ids, tokens = await _insert(db, [row for _, row in fresh], hashes, send_invites) if fresh else ({}, {})
+    report.insert_seconds += time.perf_counter() - start
+
+    for line, row in fresh:
+        report.add(line, row.email, "created", id=ids.get(row.email.lower()))
+    if tokens:
+        report.invites += len(tokens)
+        # Already committed by _insert
+        _queue_invites(tokens, inviter)
+    metrics.inc("user_import.created", len(fresh))
+
+
+async def import_users(
+    db: AsyncSession,
+    records: Records,
+    send_invites: bool = False,
+    inviter_name: str = "Admin",
+    batch_size: int | None = None,
+) -> UserImportResponse:
+    """Create accounts for every new email; each chunk commits on its own, so a failure keeps earlier chunks."""
+    batch_size = batch_size or settings.user_import_batch_size
+    start = time.perf_counter()
+    report = _Report()
+    seen: set[str] = set()
+    chunk: list[tuple[int, UserImportRow]] = []
+    async for line, record in records:
+        row, error = _validate(record)
+        if row is None:
+            email = record.get("email") if isinstance(record, dict) else None
+            report.add(line, email if isinstance(email, str) else None, "invalid", error=error)
+            continue
+        if row.email.lower() in seen:
+            report.add(line, row.email, "duplicate", error="Email appears earlier in the file")
+            continue
+        seen.add(row.email.lower())
+        chunk.append((line, row))
+        if len(chunk) >= batch_size:
+            await _import_chunk(db, chunk, report, send_invites, inviter_name)
+            chunk = []
+    if chunk:
+        await _import_chunk(db, chunk, report, send_invites, inviter_name)
+
+    elapsed = time.perf_counter() - start
+    report.rows.sort(key=lambda r: r.line)
+    metrics.observe("user_import.duration", elapsed)
+    return UserImportResponse(
+        created=report.count("created"),
+        existing=report.count("exists"),
+        duplicates=report.count("duplicate"),
+        invalid=report.count("invalid"),
+        invites_queued=report.invites,
+        rows=report.rows,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(len(report.rows) / elapsed, 1) if elapsed else 0.0,
+        hash_seconds=round(report.hash_seconds, 3),
+        insert_seconds=round(report.insert_seconds, 3),
+    )
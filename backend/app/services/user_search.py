@@ -0,0 +1,175 @@
+"""Admin user search: indexed prefix matches on email and normalized name, a trigram table for infix matches."""
+import asyncio
+import logging
+from collections.abc import Iterable
+
+from sqlalchemy import ColumnElement, Row, delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.text import normalize, trigrams
+from app.database import AsyncSessionLocal
+from app.models.user import User, UserSearchGram, normalized_name
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Shorter queries have no trigram, so they match prefixes only
+MIN_INFIX = 3
+BACKFILL_BATCH = 1000
+_backfill_task: asyncio.Task | None = None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix(column, value: str) -> ColumnElement[bool]:
+    # A literal prefix pattern, which MySQL turns into a range scan on the column's index
+    return column.like(_escape_like(value) + "%", escape="\\")
+
+
+def _contains(column, value: str) -> ColumnElement[bool]:
+    return column.like("%" + _escape_like(value) + "%", escape="\\")
+
+
+def user_grams(email: str, full_name: str | None) -> set[str]:
+    # Per field, so no gram spans the end of the email and the start of the name
+    return trigrams(normalize(email)) | trigrams(normalize(full_name or ""))
+
+
+def _prefix_match(query: str) -> ColumnElement[bool]:
+    return or_(_prefix(User.email, query.strip()), _prefix(User.name_normalized, normalize(query)))
+
+
+def _infix_match(query: str) -> ColumnElement[bool]:
+    """Users holding every trigram of the query (one grouped lookup on the gram key), confirmed by substring."""
+    grams = trigrams(normalize(query))
+    candidates = (
+        select(UserSearchGram.user_id)
+        .where(UserSearchGram.gram.in_(grams))
+        .group_by(UserSearchGram.user_id)
+        .having(func.count(UserSearchGram.gram.distinct()) == len(grams))
+    )
+    return User.id.in_(candidates) & or_(
+        _contains(User.email, query.strip()), _contains(User.name_normalized, normalize(query))
+    )
+
+
+def search_filter(query: str) -> ColumnElement[bool]:
+    """WHERE clause for the admin user list: substring match on email or name, index-backed either way."""
+    if len(normalize(query)) < MIN_INFIX:
+        return _prefix_match(query)
+    if settings.user_search_trigrams:
+        # Prefixes are substrings too, so the trigram lookup alone covers both
+        return _infix_match(query)
+    return or_(_contains(User.email, query.strip()), _contains(User.name_normalized, normalize(query)))
+
+
+async def typeahead(db: AsyncSession, query: str, limit: int = 10) -> list[Row]:
+    """(id, email, full_name): email prefixes, then name prefixes, then infix matches, until `limit` are found."""
+    if not normalize(query):
+        return []
+    columns = (User.id, User.email, User.full_name)
+    stages = [
+        (_prefix(User.email, query.strip()), User.email),
+        (_prefix(User.name_normalized, normalize(query)), User.name_normalized),
+    ]
+    if len(normalize(query)) >= MIN_INFIX and settings.user_search_trigrams:
+        stages.append((_infix_match(query), User.email))
+    found: dict[int, Row] = {}
+    for condition, order in stages:
+        q = select(*columns).where(condition)
+        if found:
+            q = q.where(User.id.notin_(list(found)))
+        for row in await db.execute(q.order_by(order).limit(limit - len(found))):
+            found[row.id] = row
+        if len(found) >= limit:
+            break
+    metrics.inc("user_search.typeahead")
+    return list(found.values())
+
+
+def _gram_rows(users: Iterable[tuple[int, str, str | None]]) -> list[dict]:
+    return [
+        {"gram": gram, "user_id": user_id}
+        for user_id, email, full_name in users
+        for gram in user_grams(email, full_name)
+    ]
+
+
+async def index_users(db: AsyncSession, users: list[tuple[int, str, str | None]]) -> None:
+    """(Re)write the trigrams of (id, email, full_name) rows; for writes that bypass the ORM (bulk import)."""
+    if not settings.user_search_trigrams or not users:
+        return
+    await db.execute(delete(UserSearchGram).where(UserSearchGram.user_id.in_([u[0] for u in users])))
+    await db.execute(insert(UserSearchGram), _gram_rows(users))
+
+
+@event.listens_for(Session, "after_flush")
+def _index_flushed_users(session: Session, flush_context) -> None:
+    """Keep the trigram table in step with ORM writes, in the same transaction."""
+    if not settings.user_search_trigrams:
+        return
+    changed = [
+        obj
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, User)
+        and (obj in session.new or any(inspect(obj).attrs[k].history.has_changes() for k in ("email", "full_name")))
+    ]
+    if not changed:
+        return
+    conn = session.connection()
+    conn.execute(delete(UserSearchGram).where(UserSearchGram.user_id.in_([u.id for u in changed])))
+    conn.execute(insert(UserSearchGram), _gram_rows((u.id, u.email, u.full_name) for u in changed))
+
+
+async def backfill() -> int:
+    """Normalized names and trigrams for users created before either existed, in keyset batches."""
+    done = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            missing = User.name_normalized.is_(None)
+            if settings.user_search_trigrams:
+                missing = missing | ~select(UserSearchGram.user_id).where(UserSearchGram.user_id == User.id).exists()
+            rows = (
+                await db.execute(
+                    select(User.id, User.email, User.full_name, User.name_normalized)
+                    .where(User.id > last_id, missing)
+                    .order_by(User.id)
+                    .limit(BACKFILL_BATCH)
+                )
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                if row.name_normalized is None:
+                    await db.execute(
+                        update(User)
+                        .where(User.id == row.id)
+                        .values(name_normalized=normalized_name(row.full_name), updated_at=User.updated_at)
+                    )
+            await index_users(db, [(row.id, row.email, row.full_name) for row in rows])
+            await db.commit()
+            done += len(rows)
+            last_id = rows[-1].id
+    return done
+
+
+async def _run_backfill() -> None:
+    try:
+        done = await backfill()
+    except Exception:
+        logger.exception("User search backfill failed")
+        return
+    if done:
+        logger.info("Indexed %d users for search", done)
+
+
+def start_backfill() -> None:
+    global _backfill_task
+    if _backfill_task is None or _backfill_task.done():
+        _backfill_task = asyncio.create_task(_run_backfill(), name="user-search-backfill")
@@ -2,8 +2,13 @@
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Page, keyset_page, offset_page
+from app.core.projection import load_columns
+from app.core.totals import totals
+from app.core.principals import invalidate_principal
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
+from app.services import user_search
 
 
 async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
@@ -16,26 +21,38 @@ async def list_users(
     skip: int = 0,
     limit: int = 20,
     search: str | None = None,
-) -> tuple[list[User], int]:
-    q = select(User)
-    count_q = select(func.count()).select_from(User)
+    after: str | None = None,
+    before: str | None = None,
+    total_mode: str = "exact",
+    fields: list[str] | None = None,
+) -> Page[User]:
+    filters = []
     if search:
-        like = f"%{search}%"
-        q = q.where(User.email.ilike(like) | User.full_name.ilike(like))
-        count_q = count_q.where(User.email.ilike(like) | User.full_name.ilike(like))
-    total = (await db.execute(count_q)).scalar() or 0
-    q = q.offset(skip).limit(limit).order_by(User.created_at.desc())
-    result = await db.execute(q)
-    return list(result.scalars().all()), total
+        filters.append(user_search.search_filter(search))
+    q = select(User).where(*filters)
+    if fields is not None:
+        q = q.options(load_columns(User, fields))
+    if skip and not (after or before):
+        page = await offset_page(db, q.order_by(User.created_at.desc(), User.id.desc()), skip, limit)
+    else:
+        page = await keyset_page(db, q, User.created_at, User.id, limit, after=after, before=before)
+    page.total = await totals.total(
+        db,
+        ("users", "search", search) if search else ("users", "all"),
+        select(func.count()).select_from(User).where(*filters),
+        total_mode,
+        incremental=not search,
+    )
+    return page
 
 
 async def create_user(db: AsyncSession, data: UserCreate) -> User:
-    from app.core.security import get_password_hash
+    from app.core.hashing import hasher
     from app.models.setting import UserSetting
 
     user = User(
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await hasher.hash(data.password),
         full_name=data.full_name or data.email.split("@")[0],
         role=data.role,
         is_verified=False,
@@ -44,6 +61,7 @@ async def create_user(db: AsyncSession, data: UserCreate) -> User:
     await db.flush()
     db.add(UserSetting(user_id=user.id))
     await db.refresh(user)
+    totals.after_commit(db, "users", adjust={("users", "all"): 1})
     return user
 
 
@@ -55,5 +73,7 @@ async def update_user(db: AsyncSession, user: User, data: UserUpdate) -> User:
     if data.is_active is not None:
         user.is_active = data.is_active
     await db.flush()
+    invalidate_principal(db, user.id)
+    totals.after_commit(db, "users")
     await db.refresh(user)
     return user
@@ -0,0 +1,65 @@
+"""Blog content at rest: stored bytes and table pages (what the buffer pool caches and the wire carries) vs. CPU.
+
+    python -m benchmarks.content_compression [posts]
+"""
+import random
+import sqlite3
+import sys
+import time
+
+from app.core import compression
+
+MIN_BYTES = 2048
+# Post lengths in paragraphs: mostly short posts, a tail of long-form ones
+LENGTHS = [2, 4, 8, 16, 32, 64, 128]
+LENGTH_WEIGHTS = [10, 20, 25, 20, 12, 8, 5]
+
+
+def post(rng: random.Random, words: list[str], weights: list[float]) -> str:
+    paragraphs = []
+    for _ in range(rng.choices(LENGTHS, LENGTH_WEIGHTS)[0]):
+        paragraphs.append(" ".join(rng.choices(words, weights, k=rng.randint(40, 120))).capitalize() + ".")
+    return "## Section\n\n" + "\n\n".join(paragraphs) + "\n"
+
+
+def table_pages(rows: list[str]) -> tuple[int, float]:
+    """Pages the table occupies, and the time to read every row back (decoding compressed ones)."""
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE blog_posts (id INTEGER PRIMARY KEY, content TEXT NOT NULL)")
+    db.executemany("INSERT INTO blog_posts (content) VALUES (?)", [(r,) for r in rows])
+    db.commit()
+    pages = db.execute("PRAGMA page_count").fetchone()[0]
+    start = time.perf_counter()
+    for (content,) in db.execute("SELECT content FROM blog_posts"):
+        compression.decode(content)
+    return pages, time.perf_counter() - start
+
+
+def main(n: int = 5000, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    words = [f"{rng.choice('bcdfghklmnprst')}{rng.choice('aeiou')}{rng.choice('lnrst')}{i % 97}" for i in range(20_000)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    posts = [post(rng, words, weights) for _ in range(n)]
+
+    start = time.perf_counter()
+    stored = [compression.encode(p, MIN_BYTES) for p in posts]
+    encode = time.perf_counter() - start
+
+    plain_bytes = sum(len(p.encode()) for p in posts)
+    stored_bytes = sum(len(s.encode()) for s in stored)
+    compressed = sum(compression.is_compressed(s) for s in stored)
+    plain_pages, plain_read = table_pages(posts)
+    stored_pages, stored_read = table_pages(stored)
+
+    print(f"posts:                  {n} ({compressed} compressed, threshold {MIN_BYTES} bytes)")
+    print(f"content bytes:          {plain_bytes:>12,} plain  {stored_bytes:>12,} stored "
+          f"({stored_bytes / plain_bytes:.0%})")
+    print(f"table pages (4 KiB):    {plain_pages:>12,} plain  {stored_pages:>12,} stored "
+          f"({stored_pages / plain_pages:.0%})")
+    print(f"encode on write:        {encode / n * 1e6:8.1f} us/post ({plain_bytes / encode / 1e6:.0f} MB/s)")
+    print(f"read all rows:          {plain_read * 1e3:8.1f} ms plain, {stored_read * 1e3:.1f} ms with decode "
+          f"({(stored_read - plain_read) / max(compressed, 1) * 1e6:+.1f} us per compressed post)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
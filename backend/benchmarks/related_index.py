@@ -0,0 +1,49 @@
+"""Related-posts index: full build time, single-post update and lookup on a synthetic corpus.
+
+    python -m benchmarks.related_index [posts ...]      (default: 10000 100000)
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.services.related import RelatedIndex
+
+VOCABULARY = 50_000
+WORDS_PER_POST = 300
+
+
+def corpus(n: int, seed: int = 0) -> list[tuple[int, str, str]]:
+    """Zipf-distributed words, so a few terms are everywhere and most are rare, as in real text."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(VOCABULARY)])
+    ranks = np.minimum(rng.zipf(1.2, size=(n, WORDS_PER_POST)), VOCABULARY) - 1
+    return [(i + 1, " ".join(words[r[:8]]), " ".join(words[r])) for i, r in enumerate(ranks)]
+
+
+def main(sizes: list[int]) -> None:
+    for n in sizes:
+        docs = corpus(n)
+        index = RelatedIndex()
+        start = time.perf_counter()
+        index.build(docs)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for post_id, title, content in docs[:100]:
+            index.upsert(post_id, title, content)
+        update = (time.perf_counter() - start) / 100
+
+        start = time.perf_counter()
+        for post_id in range(1, 10_001):
+            index.neighbours(post_id % n + 1)
+        lookup = (time.perf_counter() - start) / 10_000
+
+        print(f"posts:             {n}")
+        print(f"full build:        {build:8.2f} s")
+        print(f"update one post:   {update * 1e3:8.2f} ms")
+        print(f"lookup:            {lookup * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,60 @@
+"""Revision storage: compressed deltas with periodic snapshots vs. a full copy per edit.
+
+    python -m benchmarks.revision_storage [edits] [paragraphs]
+"""
+import random
+import sys
+import time
+import zlib
+
+from app.services.revision_service import COMPRESSION_LEVEL, apply_delta, make_delta, pack, unpack_delta
+
+SNAPSHOT_INTERVAL = 20
+
+
+def paragraph(rng: random.Random) -> str:
+    words = [rng.choice("lorem ipsum dolor sit amet consectetur adipiscing elit sed do".split()) for _ in range(60)]
+    return " ".join(words) + "\n"
+
+
+def main(edits: int = 100, paragraphs: int = 40) -> None:
+    rng = random.Random(0)
+    content = "".join(paragraph(rng) for _ in range(paragraphs))
+    full = raw = stored = 0
+    chain: list[bytes] = []
+    for number in range(1, edits + 1):
+        previous = content
+        # A typical edit rewrites one paragraph and sometimes appends another
+        lines = content.splitlines(keepends=True)
+        lines[rng.randrange(len(lines))] = paragraph(rng)
+        if rng.random() < 0.3:
+            lines.append(paragraph(rng))
+        content = "".join(lines)
+        raw += len(content.encode())
+        full += len(zlib.compress(content.encode(), COMPRESSION_LEVEL))
+        if (number - 1) % SNAPSHOT_INTERVAL == 0:
+            data = pack(content)
+            chain = [data]
+        else:
+            data = pack(make_delta(previous, content))
+            chain.append(data)
+        stored += len(data)
+
+    # Worst case reconstruction: a snapshot plus SNAPSHOT_INTERVAL - 1 deltas
+    start = time.perf_counter()
+    text = zlib.decompress(chain[0]).decode()
+    for data in chain[1:]:
+        text = apply_delta(text, unpack_delta(data))
+    rebuild = time.perf_counter() - start
+    assert text == content
+
+    print(f"edits:                     {edits} ({len(content.encode())} bytes final)")
+    print(f"full copies:               {raw:>10} bytes")
+    print(f"compressed full copies:    {full:>10} bytes")
+    print(f"deltas + snapshots:        {stored:>10} bytes ({stored / raw:.1%} of full copies)")
+    print(f"reconstruct ({len(chain)} revisions): {rebuild * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
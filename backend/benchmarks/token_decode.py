@@ -0,0 +1,27 @@
+"""Per-request access-token decode cost: full verification vs. the verified-payload cache.
+
+    python -m benchmarks.token_decode [iterations]
+"""
+import sys
+import timeit
+
+from app.core.security import access_token_cache, create_access_token, decode_access_token, decode_token
+
+
+def main(iterations: int = 20000) -> None:
+    token = create_access_token(1, extra={"email": "bench@example.com", "role": "user"})
+
+    uncached = timeit.timeit(lambda: decode_token(token), number=iterations)
+
+    access_token_cache.clear()
+    decode_access_token(token)  # first request pays the full decode
+    cached = timeit.timeit(lambda: decode_access_token(token), number=iterations)
+
+    print(f"iterations:        {iterations}")
+    print(f"full decode:       {uncached / iterations * 1e6:8.2f} us/request")
+    print(f"cached decode:     {cached / iterations * 1e6:8.2f} us/request")
+    print(f"speedup:           {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
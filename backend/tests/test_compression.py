@@ -0,0 +1,43 @@
+"""Compressed text at rest: threshold, round trip and unambiguous reads."""
+import pytest
+
+from app.core import compression
+
+LONG = "The quick brown fox jumps over the lazy dog. " * 200
+
+
+def test_round_trip_above_threshold():
+    stored = compression.encode(LONG, 2048)
+    assert compression.is_compressed(stored)
+    assert len(stored) < len(LONG)
+    assert compression.decode(stored) == LONG
+
+
+def test_short_or_disabled_values_stay_plain():
+    assert compression.encode("short", 2048) == "short"
+    assert compression.encode(LONG, None) == LONG
+    assert compression.decode("plain text") == "plain text"
+
+
+def test_incompressible_value_stays_plain():
+    noise = "".join(chr(0x4E00 + (i * 7919) % 20000) for i in range(3000))
+    stored = compression.encode(noise, 16)
+    assert stored == noise or compression.decode(stored) == noise
+    assert len(stored.encode()) <= len(noise.encode())
+
+
+def test_value_starting_with_marker_is_always_encoded():
+    value = compression.MARKER + "looks compressed"
+    stored = compression.encode(value, None)
+    assert stored != value
+    assert compression.decode(stored) == value
+
+
+def test_unicode_round_trip():
+    text = "Grüße, 世界 🌍 " * 500
+    assert compression.decode(compression.encode(text, 1)) == text
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        compression.decode(compression.MARKER + "x" + "AAAA")
@@ -0,0 +1,72 @@
+"""Conditional GET validators: ETag and Last-Modified matching, 304s without building the body."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from starlette.requests import Request
+
+from app.core.conditional import conditional_response, is_not_modified, make_etag, validator_headers
+
+MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 500000)
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_make_etag_is_stable_and_quoted():
+    etag = make_etag("blog_posts", 1, MODIFIED)
+    assert etag == make_etag("blog_posts", 1, MODIFIED)
+    assert etag != make_etag("blog_posts", 1, MODIFIED + timedelta(seconds=1))
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_if_none_match():
+    etag = make_etag("x", 1)
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request(if_none_match="*"), etag)
+    assert not is_not_modified(_request(if_none_match='"other"'), etag)
+    assert not is_not_modified(_request(), etag)
+
+
+def test_weak_etag_matches_either_form():
+    etag = make_etag("x", 1, weak=True)
+    assert etag.startswith('W/"')
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=etag.removeprefix("W/")), etag)
+    assert not is_not_modified(_request(if_none_match='W/"other"'), etag)
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    since = format_datetime(datetime(2030, 1, 1, tzinfo=timezone.utc), usegmt=True)
+    assert not is_not_modified(_request(if_none_match='"other"', if_modified_since=since), make_etag("x"), MODIFIED)
+
+
+def test_if_modified_since_has_second_precision():
+    # Naive datetimes are UTC; the header drops the fraction, so the same second still matches
+    same_second = format_datetime(MODIFIED.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+    earlier = format_datetime((MODIFIED - timedelta(seconds=1)).replace(tzinfo=timezone.utc), usegmt=True)
+    assert is_not_modified(_request(if_modified_since=same_second), make_etag("x"), MODIFIED)
+    assert not is_not_modified(_request(if_modified_since=earlier), make_etag("x"), MODIFIED)
+    assert not is_not_modified(_request(if_modified_since="garbage"), make_etag("x"), MODIFIED)
+
+
+def test_validator_headers():
+    headers = validator_headers('"abc"', MODIFIED, vary="Authorization")
+    assert headers["ETag"] == '"abc"'
+    assert headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert headers["Vary"] == "Authorization"
+
+
+def test_conditional_response_skips_body_on_match():
+    etag = make_etag("x", 1)
+
+    def body() -> bytes:
+        raise AssertionError("body built for a 304")
+
+    response = conditional_response(_request(if_none_match=etag), etag, body)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    fresh = conditional_response(_request(), etag, lambda: b"{}")
+    assert fresh.status_code == 200 and fresh.body == b"{}"
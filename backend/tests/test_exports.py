@@ -0,0 +1,19 @@
+"""CSV exports: user-controlled text cannot turn into spreadsheet formulas."""
+import csv
+import io
+from datetime import datetime
+
+from app.services.exports import _csv, _ndjson
+
+
+def test_formula_cells_are_escaped():
+    rows = [(1, '=HYPERLINK("http://evil")', "+1", "-2", "@SUM(A1)", "\tx", "plain", -3, None)]
+    parsed = next(csv.reader(io.StringIO(_csv(rows))))
+    assert parsed[1:6] == ["'=HYPERLINK(\"http://evil\")", "'+1", "'-2", "'@SUM(A1)", "'\tx"]
+    # Text that is not a formula and non-text values are written as they are
+    assert parsed[6:] == ["plain", "-3", ""]
+
+
+def test_ndjson_is_unchanged():
+    line = _ndjson(["name", "at"], [("=1+1", datetime(2024, 5, 1, 12, 0))])
+    assert line == '{"name": "=1+1", "at": "2024-05-01T12:00:00"}\n'
@@ -0,0 +1,242 @@
+"""Google id_token verification against a stand-in JWKS endpoint and locally signed RS256 tokens."""
+import asyncio
+import base64
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from app.core import google
+from app.core.google import GoogleIdTokenVerifier, GoogleTokenError, JWKSCache
+
+JWKS_URL = "https://jwks.test/certs"
+CLIENT_ID = "client-123.apps.googleusercontent.com"
+
+
+def _b64(n: int) -> str:
+    return base64.urlsafe_b64encode(n.to_bytes((n.bit_length() + 7) // 8, "big")).decode().rstrip("=")
+
+
+class SigningKey:
+    def __init__(self, kid: str) -> None:
+        self.kid = kid
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.pem = self._key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+
+    def jwk(self) -> dict:
+        numbers = self._key.public_key().public_numbers()
+        return {"kty": "RSA", "alg": "RS256", "use": "sig", "kid": self.kid, "n": _b64(numbers.n), "e": _b64(numbers.e)}
+
+    def sign(self, **overrides) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "10769150350006150715113082367",
+            "email": "jane@example.com",
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 3600,
+            **overrides,
+        }
+        return jwt.encode(claims, self.pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+class FakeJWKS:
+    """The key-set endpoint: serves whichever keys are currently published and counts fetches."""
+
+    def __init__(self, *keys: SigningKey, max_age: int = 3600) -> None:
+        self.keys = list(keys)
+        self.max_age = max_age
+        self.fetches = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert str(request.url) == JWKS_URL
+        self.fetches += 1
+        return httpx.Response(
+            200,
+            json={"keys": [k.jwk() for k in self.keys]},
+            headers={"Cache-Control": f"public, max-age={self.max_age}, must-revalidate"},
+        )
+
+
+@pytest.fixture(scope="module")
+def key_a() -> SigningKey:
+    return SigningKey("kid-a")
+
+
+@pytest.fixture(scope="module")
+def key_b() -> SigningKey:
+    return SigningKey("kid-b")
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    def install(endpoint: FakeJWKS) -> None:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint.handler))
+        monkeypatch.setattr(google, "get_http_client", lambda: client)
+
+    return install
+
+
+def _verifier(min_refetch_interval: float = 0) -> GoogleIdTokenVerifier:
+    return GoogleIdTokenVerifier(JWKSCache(JWKS_URL, min_refetch_interval=min_refetch_interval), CLIENT_ID)
+
+
+def test_valid_token(serve, key_a):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier()
+    claims = asyncio.run(verifier.verify(key_a.sign()))
+    assert claims["email"] == "jane@example.com"
+    assert endpoint.fetches == 1
+
+
+def test_key_set_is_cached(serve, key_a):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier()
+
+    async def twice():
+        await verifier.verify(key_a.sign())
+        await verifier.verify(key_a.sign(email="john@example.com"))
+
+    asyncio.run(twice())
+    assert endpoint.fetches == 1
+
+
+def test_refresh_honours_max_age(serve, key_a):
+    serve(FakeJWKS(key_a, max_age=1000))
+    assert asyncio.run(JWKSCache(JWKS_URL).refresh()) == pytest.approx(900)
+
+
+@pytest.mark.parametrize(
+    "overrides, message",
+    [
+        ({"exp": int(time.time()) - 60, "iat": int(time.time()) - 3660}, "Invalid token"),
+        ({"aud": "someone-else.apps.googleusercontent.com"}, "Invalid token"),
+        ({"iss": "https://evil.example.com"}, "Invalid issuer"),
+    ],
+    ids=["expired", "wrong-aud", "wrong-iss"],
+)
+def test_rejected_claims(serve, key_a, overrides, message):
+    serve(FakeJWKS(key_a))
+    with pytest.raises(GoogleTokenError, match=message):
+        asyncio.run(_verifier().verify(key_a.sign(**overrides)))
+
+
+def test_wrong_signature(serve, key_a):
+    serve(FakeJWKS(key_a))
+    forged = SigningKey("kid-a")
+    with pytest.raises(GoogleTokenError, match="Invalid token"):
+        asyncio.run(_verifier().verify(forged.sign()))
+
+
+def test_unknown_kid_refreshes_key_set(serve, key_a, key_b):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier()
+
+    async def rotate():
+        await verifier.verify(key_a.sign())
+        # Google publishes a new key; the cached set is still fresh but does not know it
+        endpoint.keys = [key_a, key_b]
+        return await verifier.verify(key_b.sign())
+
+    assert asyncio.run(rotate())["aud"] == CLIENT_ID
+    assert endpoint.fetches == 2
+
+
+def test_unknown_kid_after_refresh_is_rejected(serve, key_a, key_b):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    with pytest.raises(GoogleTokenError, match="Unknown signing key"):
+        asyncio.run(_verifier().verify(key_b.sign()))
+    assert endpoint.fetches == 1
+
+
+def test_unknown_kid_refetch_is_rate_limited(serve, key_a, key_b):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier(min_refetch_interval=60)
+
+    async def flood():
+        await verifier.verify(key_a.sign())
+        for _ in range(3):
+            with pytest.raises(GoogleTokenError):
+                await verifier.verify(key_b.sign())
+
+    asyncio.run(flood())
+    assert endpoint.fetches == 1
+
+
+def test_keeps_last_keys_when_refresh_fails(serve, key_a):
+    endpoint = FakeJWKS(key_a, max_age=0)
+    serve(endpoint)
+    verifier = _verifier()
+
+    async def outage():
+        await verifier.verify(key_a.sign())
+        endpoint.handler = lambda request: httpx.Response(503)
+        serve(endpoint)
+        return await verifier.verify(key_a.sign())
+
+    assert asyncio.run(outage())["sub"]
+
+
+def test_malformed_token(serve, key_a):
+    serve(FakeJWKS(key_a))
+    with pytest.raises(GoogleTokenError, match="Malformed token"):
+        asyncio.run(_verifier().verify("not-a-jwt"))
+
+
+def test_concurrent_requests_share_one_refresh(serve, key_a):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier(min_refetch_interval=60)
+
+    async def burst():
+        return await asyncio.gather(*(verifier.verify(key_a.sign()) for _ in range(20)))
+
+    assert len(asyncio.run(burst())) == 20
+    assert endpoint.fetches == 1
+
+
+def test_random_kids_cannot_force_refetches(serve, key_a):
+    endpoint = FakeJWKS(key_a)
+    serve(endpoint)
+    verifier = _verifier(min_refetch_interval=60)
+
+    async def flood():
+        tokens = [SigningKey(f"random-{i}").sign() for i in range(3)]
+        return await asyncio.gather(*(verifier.verify(t) for t in tokens * 5), return_exceptions=True)
+
+    assert all(isinstance(r, GoogleTokenError) for r in asyncio.run(flood()))
+    assert endpoint.fetches == 1
+
+
+def test_failed_refreshes_are_rate_limited(serve, key_a):
+    endpoint = FakeJWKS(key_a, max_age=0)
+    serve(endpoint)
+    verifier = _verifier(min_refetch_interval=60)
+
+    def down(request: httpx.Request) -> httpx.Response:
+        endpoint.fetches += 1
+        return httpx.Response(503)
+
+    async def outage():
+        await verifier.verify(key_a.sign())
+        verifier.jwks._attempted_at -= 60
+        endpoint.handler = down
+        serve(endpoint)
+        # Stale keys and Google down: one attempt, then the last keys are served without retrying per request
+        for _ in range(5):
+            await verifier.verify(key_a.sign())
+
+    asyncio.run(outage())
+    assert endpoint.fetches == 2
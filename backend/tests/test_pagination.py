@@ -0,0 +1,23 @@
+"""Keyset cursors: opaque round trip and rejection of tampered values."""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [datetime(2024, 5, 1, 12, 30, 15, 123456), datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)],
+    ids=["naive", "aware"],
+)
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm90IGpzb24", "WzFd", "WyJub3QgYSBkYXRlIiwgMV0"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
@@ -0,0 +1,82 @@
+"""Login throttling: lockouts follow the attacker's (email, IP) and IP, never the email alone."""
+from starlette.requests import Request
+
+from app.config import get_settings
+from app.core.rate_limit import LoginThrottle, MemoryRateLimitBackend, client_address
+
+settings = get_settings()
+VICTIM = "victim@example.com"
+
+
+def _fail(throttle: LoginThrottle, email: str, ip: str, times: int) -> None:
+    for _ in range(times):
+        throttle.record_failure(email, ip)
+
+
+def test_failures_lock_the_attacking_client():
+    throttle = LoginThrottle(MemoryRateLimitBackend())
+    _fail(throttle, VICTIM, "10.0.0.1", settings.login_failure_threshold)
+    assert throttle.check(VICTIM, "10.0.0.1") > 0
+
+
+def test_failures_from_elsewhere_do_not_lock_the_owner_out():
+    throttle = LoginThrottle(MemoryRateLimitBackend())
+    for i in range(10):
+        _fail(throttle, VICTIM, f"10.0.1.{i}", settings.login_failure_threshold)
+    assert throttle.check(VICTIM, "192.168.1.5") == 0
+
+
+def test_success_clears_the_clients_failures():
+    throttle = LoginThrottle(MemoryRateLimitBackend())
+    _fail(throttle, VICTIM, "10.0.0.1", settings.login_failure_threshold - 1)
+    throttle.record_success(VICTIM, "10.0.0.1")
+    _fail(throttle, VICTIM, "10.0.0.1", 1)
+    assert throttle.check(VICTIM, "10.0.0.1") == 0
+
+
+def test_pruning_keeps_active_locks():
+    backend = MemoryRateLimitBackend(max_keys=4)
+    for i in range(4):
+        backend.lock(f"active:{i}", until=100.0, now=0.0)
+    backend.lock("expired", until=1.0, now=0.0)
+    backend.lock("new", until=100.0, now=50.0)
+    assert all(backend.locked_for(f"active:{i}", 50.0) for i in range(4))
+    assert backend.locked_for("new", 50.0)
+    assert "expired" not in backend._locks
+
+
+def test_spraying_one_address_slows_the_sprayers_only():
+    throttle = LoginThrottle(MemoryRateLimitBackend())
+    for i in range(settings.login_email_any_ip_attempts_per_minute + 5):
+        throttle.record_failure(VICTIM, f"10.0.2.{i}")
+    # A sprayer that has failed before now waits for the address-wide budget; a clean caller does not
+    assert throttle.check(VICTIM, "10.0.2.1") > 0
+    assert throttle.check(VICTIM, "192.168.1.5") == 0
+
+
+def test_rejected_attempt_does_not_drain_other_buckets():
+    backend = MemoryRateLimitBackend()
+    throttle = LoginThrottle(backend)
+    for _ in range(settings.login_email_attempts_per_minute):
+        assert throttle.check(VICTIM, "10.0.0.1") == 0
+    assert throttle.check(VICTIM, "10.0.0.1") > 0
+    ip_key = "login:ip:10.0.0.1"
+    before = backend._buckets[ip_key][0]
+    for _ in range(20):
+        assert throttle.check(VICTIM, "10.0.0.1") > 0
+    assert backend._buckets[ip_key][0] == before
+
+
+def _http(peer: str, **headers: str) -> Request:
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": raw, "client": (peer, 1234)})
+
+
+def test_client_address(monkeypatch):
+    assert client_address(_http("10.1.1.1", x_forwarded_for="6.6.6.6")) == "10.1.1.1"
+    monkeypatch.setattr(settings, "trusted_proxy_header", "X-Forwarded-For")
+    # The client-supplied leftmost entry is ignored; the proxy's appended entry is the client
+    assert client_address(_http("10.1.1.1", x_forwarded_for="6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    monkeypatch.setattr(settings, "trusted_proxy_count", 2)
+    assert client_address(_http("10.1.1.1", x_forwarded_for="6.6.6.6, 203.0.113.7, 10.0.0.2")) == "203.0.113.7"
+    assert client_address(_http("10.1.1.1", x_forwarded_for="203.0.113.7")) == "10.1.1.1"
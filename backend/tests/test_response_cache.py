@@ -0,0 +1,32 @@
+"""Response cache: a body read before a write commits is not stored after the write's invalidation."""
+from app.core.response_cache import ResponseCache
+
+
+def test_set_after_invalidation_is_dropped():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+    generation = cache.generation()
+    # A write to post 1 commits while the request is still rendering the old row
+    cache.invalidate("blog:list", "blog:post:1")
+    entry = cache.set("/blog/1", b"old", {"blog:post:1"}, generation=generation)
+    assert entry.body == b"old"
+    assert cache.get("/blog/1") is None
+
+
+def test_unrelated_invalidation_keeps_entry():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("blog:post:2")
+    cache.set("/blog/1", b"body", {"blog:post:1"}, generation=generation)
+    assert cache.get("/blog/1").body == b"body"
+    # Later reads start from the new generation and are stored again
+    cache.invalidate("blog:post:1")
+    cache.set("/blog/1", b"new", {"blog:post:1"}, generation=cache.generation())
+    assert cache.get("/blog/1").body == b"new"
+
+
+def test_clear_drops_sets_from_earlier_reads():
+    cache = ResponseCache(max_bytes=1024, ttl=60)
+    generation = cache.generation()
+    cache.clear()
+    cache.set("/blog", b"body", {"blog:list"}, generation=generation)
+    assert cache.get("/blog") is None
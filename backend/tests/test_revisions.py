@@ -0,0 +1,43 @@
+"""Revision storage: line deltas and packed payloads reproduce every version exactly."""
+import pytest
+
+from app.services.revision_service import apply_delta, make_delta, pack, unpack_delta, unpack_snapshot
+
+BASE = "# Title\n\nFirst paragraph.\n\nSecond paragraph.\n\nThird paragraph.\n"
+
+
+@pytest.mark.parametrize(
+    "new",
+    [
+        BASE,
+        BASE.replace("Second", "Edited second"),
+        BASE + "\nAppended paragraph.\n",
+        "Prepended line\n" + BASE,
+        BASE.replace("\n\nThird paragraph.\n", ""),
+        BASE.rstrip("\n"),
+        "",
+        "entirely\nnew\ncontent",
+    ],
+    ids=["unchanged", "edit", "append", "prepend", "delete", "no-trailing-newline", "emptied", "rewrite"],
+)
+def test_delta_round_trip(new):
+    ops = make_delta(BASE, new)
+    assert apply_delta(BASE, ops) == new
+    assert apply_delta(BASE, unpack_delta(pack(ops))) == new
+
+
+def test_delta_from_empty():
+    assert apply_delta("", make_delta("", BASE)) == BASE
+
+
+def test_small_edit_copies_unchanged_lines():
+    ops = make_delta(BASE * 50, (BASE * 50).replace("First", "Changed", 1))
+    inserted = sum(len(op[1]) for op in ops if op[0] == 1)
+    assert inserted < 100
+
+
+def test_snapshot_round_trip():
+    text = "Grüße 🌍\r\nwindows line endings\r\n" * 100
+    packed = pack(text)
+    assert len(packed) < len(text.encode())
+    assert unpack_snapshot(packed) == text
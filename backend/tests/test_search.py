@@ -0,0 +1,30 @@
+"""Blog search queries: what goes to the FULLTEXT index and what InnoDB cannot answer from it."""
+from sqlalchemy.dialects import mysql
+
+from app.services.search_service import MySQLFullTextBackend, parse_query
+
+
+def test_indexed_words_are_required():
+    query = parse_query('fastapi deploy* "connection pool"')
+    assert query.to_boolean_mode() == '+fastapi +deploy* +"connection pool"'
+    assert query.unindexed() == []
+
+
+def test_short_words_and_stopwords_fall_back_to_like():
+    # "go" is below innodb_ft_min_token_size, "about" is a stopword and "v1*" a short prefix:
+    # required in boolean mode they would match no row at all
+    query = parse_query('go about python "state of the art" v1*')
+    assert query.to_boolean_mode() == "+python"
+    assert query.unindexed() == ["%go%", "%about%", "%v1%", "%state%of%the%art%"]
+
+
+def test_like_wildcards_are_escaped():
+    assert parse_query("a_b").unindexed() == []
+    assert parse_query("x_").unindexed() == ["%x\\_%"]
+
+
+def test_only_unindexed_words_skip_match():
+    relevance, filters = MySQLFullTextBackend()._filters(parse_query("go is"), public_only=False)
+    sql = " AND ".join(str(f.compile(dialect=mysql.dialect())) for f in filters)
+    assert "MATCH" not in sql
+    assert sql.count("LIKE") == 4
@@ -0,0 +1,115 @@
+"""Bulk user import: parsing, in-file dedupe, the duplicate-key retry and the report, with the database stubbed out."""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services import user_import
+from app.services.user_import import ImportFormatError, import_users, parse_csv, parse_ndjson
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+class FakeUsers:
+    """Stands in for the users table: existing emails, plus signups that land between check and insert."""
+
+    def __init__(self, *existing: str, racing: tuple[str, ...] = ()) -> None:
+        self.emails = {e.lower() for e in existing}
+        self.racing = {e.lower() for e in racing}
+        self.inserted: list[list[str]] = []
+
+    async def existing(self, db, emails):
+        return {e.lower() for e in emails} & self.emails
+
+    async def insert(self, db, rows, hashes, send_invites):
+        emails = [row.email.lower() for row in rows]
+        if self.racing & set(emails):
+            self.emails |= self.racing
+            self.racing = set()
+            raise IntegrityError("INSERT", {}, Exception("Duplicate entry"))
+        self.inserted.append(emails)
+        self.emails.update(emails)
+        return {e: 100 + i for i, e in enumerate(emails)}, {}
+
+
+@pytest.fixture
+def users(monkeypatch):
+    def install(*existing: str, racing: tuple[str, ...] = ()) -> FakeUsers:
+        fake = FakeUsers(*existing, racing=racing)
+        monkeypatch.setattr(user_import, "_existing", fake.existing)
+        monkeypatch.setattr(user_import, "_insert", fake.insert)
+
+        async def no_hashing(passwords):
+            return [None if p is None else f"hashed:{p}" for p in passwords]
+
+        monkeypatch.setattr(user_import, "_hash_all", no_hashing)
+        return fake
+
+    return install
+
+
+def test_parse_csv_across_chunk_boundaries():
+    chunks = _chunks(b"\xef\xbb\xbfEmail,full_name\r\na@x.io,A", b"nn\r\n\r\nb@x.io,\"B, Jr\"")
+    records = asyncio.run(_collect(parse_csv(chunks)))
+    assert records == [(2, {"email": "a@x.io", "full_name": "Ann"}), (4, {"email": "b@x.io", "full_name": "B, Jr"})]
+
+
+def test_parse_csv_requires_email_column():
+    with pytest.raises(ImportFormatError):
+        asyncio.run(_collect(parse_csv(_chunks(b"name\nann\n"))))
+
+
+def test_parse_ndjson_reports_bad_lines():
+    records = asyncio.run(_collect(parse_ndjson(_chunks(b'{"email": "a@x.io"}\nnot json\n[1]\n'))))
+    assert records == [(1, {"email": "a@x.io"}), (2, "Invalid JSON"), (3, "Expected a JSON object")]
+
+
+def test_report_counts_and_dedupe(users):
+    fake = users("taken@x.io")
+    db = FakeSession()
+    records = parse_ndjson(
+        _chunks(
+            b'{"email": "new@x.io", "password": "secret-123"}\n'
+            b'{"email": "TAKEN@x.io"}\n'
+            b'{"email": "New@X.io"}\n'
+            b'{"email": "not-an-email"}\n'
+            b'{"email": "other@x.io"}\n'
+        )
+    )
+    result = asyncio.run(import_users(db, records, batch_size=2))
+    assert (result.created, result.existing, result.duplicates, result.invalid) == (2, 1, 1, 1)
+    assert [(r.line, r.status) for r in result.rows] == [
+        (1, "created"), (2, "exists"), (3, "duplicate"), (4, "invalid"), (5, "created")
+    ]
+    assert fake.inserted == [["new@x.io"], ["other@x.io"]]
+    # The existence check's transaction is closed before hashing starts
+    assert db.commits == 2
+
+
+def test_signup_racing_the_import_is_retried(users):
+    fake = users(racing=("b@x.io",))
+    db = FakeSession()
+    records = parse_csv(_chunks(b"email\na@x.io\nb@x.io\nc@x.io\n"))
+    result = asyncio.run(import_users(db, records))
+    assert db.rollbacks == 1
+    assert fake.inserted == [["a@x.io", "c@x.io"]]
+    assert {r.email: r.status for r in result.rows} == {"a@x.io": "created", "b@x.io": "exists", "c@x.io": "created"}
@@ -0,0 +1,26 @@
+"""User model: the normalized name always fits its column, however far NFKD expands the name."""
+from app.models.user import NAME_LENGTH, User
+
+# One character that decomposes into 18 ("ﷺ"), repeated to the full_name limit
+LONG_NAME = "ﷺ" * NAME_LENGTH
+
+
+class _InsertContext:
+    def __init__(self, **params) -> None:
+        self.params = params
+
+    def get_current_parameters(self) -> dict:
+        return self.params
+
+
+def test_orm_assignment_truncates():
+    user = User(email="a@example.com", full_name=LONG_NAME)
+    assert len(user.name_normalized) == NAME_LENGTH
+    user.full_name = "  José  Núñez "
+    assert user.name_normalized == "jose nunez"
+
+
+def test_core_insert_default_truncates():
+    default = User.__table__.c.name_normalized.default.arg
+    assert len(default(_InsertContext(full_name=LONG_NAME))) == NAME_LENGTH
+    assert default(_InsertContext()) == ""
@@ -48,6 +48,7 @@ export default function BlogPostPage() {
       <h1 className="mt-4 text-3xl font-semibold text-[var(--foreground)]">{post.title}</h1>
       <p className="mt-2 text-sm text-[var(--muted)]">
         {new Date(post.created_at).toLocaleDateString()} · {post.view_count} views
+        {post.reading_time_minutes ? ` · ${post.reading_time_minutes} min read` : ""}
       </p>
       {post.cover_image_url && (
         <img
@@ -58,7 +59,7 @@ export default function BlogPostPage() {
       )}
       <div
         className="prose prose-invert mt-8 max-w-none text-[var(--foreground)]"
-        dangerouslySetInnerHTML={{ __html: post.content.replace(/\n/g, "<br />") }}
+        dangerouslySetInnerHTML={{ __html: post.content_html ?? post.content.replace(/\n/g, "<br />") }}
       />
     </article>
   );
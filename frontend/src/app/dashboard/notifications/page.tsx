@@ -22,6 +22,15 @@ export default function DashboardNotificationsPage() {
     load();
   }, [load]);
 
+  useEffect(
+    () =>
+      notificationsApi.subscribe(
+        (n) => setItems((prev) => (prev.some((p) => p.id === n.id) ? prev : [n, ...prev])),
+        load
+      ),
+    [load]
+  );
+
   async function markRead(id: number) {
     try {
       await notificationsApi.markRead(id);
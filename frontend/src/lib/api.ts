@@ -136,6 +136,10 @@ export const settingsApi = {
     api<unknown>("/settings", { method: "PATCH", body: JSON.stringify(body) }),
 };
 
+function streamTicket() {
+  return api<{ ticket: string; expires_in: number }>("/notifications/stream/ticket", { method: "POST" });
+}
+
 export const notificationsApi = {
   list: (params?: { skip?: number; limit?: number; unread_only?: boolean }) => {
     const sp = new URLSearchParams();
@@ -146,6 +150,51 @@ export const notificationsApi = {
   },
   markRead: (id: number) => api<Notification>(`/notifications/${id}`, { method: "PATCH", body: JSON.stringify({ is_read: true }) }),
   markAllRead: () => api<{ ok: boolean }>("/notifications/mark-all-read", { method: "POST" }),
+  streamTicket,
+  /** Live notifications over SSE. Returns a function that closes the stream. */
+  subscribe: (onNotification: (n: Notification) => void, onResync: () => void) => {
+    let source: EventSource | null = null;
+    let lastId: string | null = null;
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+
+    async function open() {
+      if (closed) return;
+      try {
+        const { ticket } = await streamTicket();
+        if (closed) return;
+        const sp = new URLSearchParams({ ticket });
+        if (lastId) sp.set("last_event_id", lastId);
+        source = new EventSource(`${API_BASE}/notifications/stream?${sp}`);
+      } catch {
+        retry = setTimeout(open, 5000);
+        return;
+      }
+      source.addEventListener("notification", (e) => {
+        const ev = e as MessageEvent;
+        lastId = ev.lastEventId || lastId;
+        onNotification(JSON.parse(ev.data));
+      });
+      source.addEventListener("resync", () => {
+        // Too much was missed to replay: reload, then follow from now on
+        source?.close();
+        lastId = null;
+        onResync();
+        open();
+      });
+      source.onerror = () => {
+        // The browser retries by itself unless the server refused (e.g. the ticket expired); then get a new one
+        if (source?.readyState === EventSource.CLOSED) retry = setTimeout(open, 1000);
+      };
+    }
+
+    open();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      source?.close();
+    };
+  },
 };
 
 export const usersApi = {
@@ -179,6 +228,10 @@ export type BlogPost = {
   title: string;
   slug: string;
   content: string;
+  content_html?: string | null;
+  toc?: { level: number; id: string; title: string }[] | null;
+  word_count?: number | null;
+  reading_time_minutes?: number | null;
   excerpt: string | null;
   cover_image_url: string | null;
   is_published: boolean;